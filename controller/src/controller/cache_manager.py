@@ -1,23 +1,71 @@
 # SPDX-FileCopyrightText: (C) 2024 - 2025 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
+import threading
+from http import HTTPStatus
+
 from controller.scene import Scene
 from controller.data_source import RestSceneDataSource, FileSceneDataSource
 
 from scene_common import log
+from scene_common.camera import Camera
 from scene_common.timestamp import get_epoch_time
 
 REFRESH_TIME = 60
 
+def parameterFingerprint(parameters):
+  """! Immutable copy of camera parameters as sent by a camera, dicts and
+  lists of numbers, which compares equal to that of equal parameters sent
+  in the same key order.
+  """
+  if isinstance(parameters, dict):
+    return (dict, tuple((key, parameterFingerprint(item)) for key, item in parameters.items()))
+  if isinstance(parameters, (list, tuple)):
+    return tuple(parameterFingerprint(item) for item in parameters)
+  return parameters
+
 class CacheManager:
+  """! Scenes of the controller, kept in sync with the data source.
+
+  Refreshes are requested with requestRefresh() and run on a background
+  thread, so that message handlers never wait on the REST server. Scenes are
+  fetched with conditional GETs and only the parts of a scene whose data
+  changed are rebuilt. Changes are applied while holding 'lock', which
+  message handlers hold while they work with the scenes.
+  """
+
   def __init__(self, data_source=None, rest_url=None, rest_auth=None,
-               root_cert=None, tracker_config_data={}):
+               root_cert=None, tracker_config_data={}, scene_filter=None,
+               scene_class=Scene):
+    """!
+    @param   scene_filter   Called with the data of each scene, scenes it
+                            returns False for are not built. None keeps all.
+    @param   scene_class    Class the scenes are built with, by its
+                            deserialize() and updateScene().
+    """
+    self.scene_filter = scene_filter
+    self.scene_class = scene_class
     self.cached_child_transforms_by_uid = {}
     self.camera_parameters = {}
+    # Fingerprint of the parameters each camera last sent, and the camera built from them
+    self._camera_fingerprints = {}
     self.tracker_config_data = tracker_config_data
     self.cached_scenes_by_uid = {}
-    self._cached_scenes_by_cameraID = {}
+    self._cached_cameras_by_ID = {}
     self._cached_scenes_by_sensorID = {}
+    # Scene data the cached scenes were last updated from, and its ETags
+    self.scene_data = {}
+    self.scene_etags = {}
+    self.scenes_etag = None
+
+    self.lock = threading.RLock()
+    self._fetch_lock = threading.Lock()
+    self._refresh_condition = threading.Condition()
+    self._refresh_all = False
+    self._refresh_uids = set()
+    self._refresh_callbacks = []
+    self._refreshing = False
+    self._refresh_thread = None
 
     if rest_url and rest_auth:
       self.data_source = RestSceneDataSource(rest_url, rest_auth, root_cert)
@@ -28,100 +76,279 @@ class CacheManager:
     self.refreshScenes()
     return
 
+  def requestRefresh(self, scene_uid=None, callback=None):
+    """! Queue a refresh of one scene, or of all scenes, on the refresh thread.
+    Requests made while a refresh is pending are combined.
+
+    @param   scene_uid   Scene to refresh, None to refresh all scenes
+    @param   callback    Called on the refresh thread once the scenes are refreshed
+    """
+    with self._refresh_condition:
+      if scene_uid is None:
+        self._refresh_all = True
+      else:
+        self._refresh_uids.add(scene_uid)
+      if callback is not None:
+        self._refresh_callbacks.append(callback)
+      if self._refresh_thread is None:
+        self._refresh_thread = threading.Thread(target=self._refreshLoop,
+                                                name="scene-refresh", daemon=True)
+        self._refresh_thread.start()
+      self._refresh_condition.notify_all()
+    return
+
+  def waitForRefresh(self, timeout=None):
+    """! Wait until all requested refreshes are done.
+
+    @return  False if they are still running after timeout seconds.
+    """
+    with self._refresh_condition:
+      return self._refresh_condition.wait_for(
+        lambda: not self._refreshPending() and not self._refreshing, timeout)
+
+  def _refreshPending(self):
+    return self._refresh_all or bool(self._refresh_uids) or bool(self._refresh_callbacks)
+
+  def _refreshLoop(self):
+    while True:
+      with self._refresh_condition:
+        self._refresh_condition.wait_for(self._refreshPending)
+        refresh_all, self._refresh_all = self._refresh_all, False
+        uids, self._refresh_uids = self._refresh_uids, set()
+        callbacks, self._refresh_callbacks = self._refresh_callbacks, []
+        self._refreshing = True
+      try:
+        if refresh_all:
+          self.refreshScenes()
+        else:
+          for uid in uids:
+            self.refreshScene(uid)
+        for callback in callbacks:
+          callback()
+      except Exception as e:
+        log.error("Failed to refresh scenes", e)
+      with self._refresh_condition:
+        self._refreshing = False
+        self._refresh_condition.notify_all()
+    return
+
   def refreshScenes(self):
-    if not hasattr(self, 'cached_scenes_by_uid') or self.cached_scenes_by_uid is None:
-      self.cached_scenes_by_uid = {}
-    self._cached_scenes_by_cameraID = {}
-    self._cached_scenes_by_sensorID = {}
+    """! Fetch all scenes if they changed, and update the cache. """
+    with self._fetch_lock:
+      result = self.data_source.getScenes(etag=self.scenes_etag)
+      not_modified = getattr(result, 'notModified', False)
+      if not_modified:
+        found = list(self.scene_data.values())
+      elif 'results' in result:
+        found = result['results']
+      else:
+        log.error("Failed to get results, error code: ", result.statusCode)
+        return
 
-    result = self.data_source.getScenes()
-    if 'results' not in result:
-      log.error("Failed to get results, error code: ", result.statusCode)
-      return
+      found = self._filterScenes(found)
+      if any([self._refreshCameras(scene_data) for scene_data in found]):
+        # Pull the camera parameters just written to the database
+        result = self.data_source.getScenes()
+        if 'results' not in result:
+          log.error("Failed to get results, error code: ", result.statusCode)
+          return
+        found = self._filterScenes(result['results'])
+      elif not_modified:
+        self._cache_refreshed = get_epoch_time()
+        return
 
-    found = result.get("results", [])
-    old = set(self.cached_scenes_by_uid.keys())
-    new = set(x['uid'] for x in found)
-    deleted = old - new
-    for uid in deleted:
-      self.cached_scenes_by_uid.pop(uid, None)
-
-    for scene_data in found:
-      self._refreshCameras(scene_data)
-      if self.tracker_config_data:
-        scene_data["tracker_config"] = [self.tracker_config_data["max_unreliable_time"],
-                                      self.tracker_config_data["non_measurement_time_dynamic"],
-                                      self.tracker_config_data["non_measurement_time_static"],
-                                      self.tracker_config_data["time_chunking_enabled"],
-                                      self.tracker_config_data["time_chunking_interval_milliseconds"]]
-        scene_data["persist_attributes"] = self.tracker_config_data.get("persist_attributes", {})
-
-      uid = scene_data['uid']
-      if uid not in self.cached_scenes_by_uid:
-        scene = Scene.deserialize(scene_data)
+      self.scenes_etag = getattr(result, 'etag', None)
+      with self.lock:
+        for uid in set(self.cached_scenes_by_uid.keys()) - set(x['uid'] for x in found):
+          self._removeScene(uid)
+        for scene_data in found:
+          if self.scene_data.get(scene_data['uid']) != scene_data:
+            # The ETag of the scene on its own no longer matches the cached data
+            self.scene_etags.pop(scene_data['uid'], None)
+            self._applySceneData(scene_data)
+        self._rebuildIndexes()
+      self._cache_refreshed = get_epoch_time()
+    return
+
+  def refreshScene(self, scene_uid):
+    """! Fetch one scene if it changed, and update the cache. """
+    with self._fetch_lock:
+      result = self.data_source.getScene(scene_uid, etag=self.scene_etags.get(scene_uid))
+      not_modified = getattr(result, 'notModified', False)
+      if not_modified and scene_uid in self.scene_data:
+        scene_data = self.scene_data[scene_uid]
+      elif 'uid' in result:
+        scene_data = dict(result)
+        if not self._filterScenes([scene_data]):
+          with self.lock:
+            self._removeScene(scene_uid)
+            self._rebuildIndexes()
+          return
+      elif getattr(result, 'statusCode', None) == HTTPStatus.NOT_FOUND:
+        with self.lock:
+          self._removeScene(scene_uid)
+          self._rebuildIndexes()
+        return
       else:
-        scene = self.cached_scenes_by_uid[uid]
-        scene.updateScene(scene_data)
+        log.error("Failed to get scene", scene_uid, getattr(result, 'errors', None))
+        return
+
+      if self._refreshCameras(scene_data):
+        # Pull the camera parameters just written to the database
+        result = self.data_source.getScene(scene_uid)
+        if 'uid' not in result:
+          log.error("Failed to get scene", scene_uid, getattr(result, 'errors', None))
+          return
+        scene_data = dict(result)
+      elif not_modified:
+        return
+
+      self.scene_etags[scene_uid] = getattr(result, 'etag', None)
+      if self.scene_data.get(scene_uid) == scene_data:
+        return
+      # The ETag of the scene list no longer matches the cached data
+      self.scenes_etag = None
+      with self.lock:
+        self._applySceneData(scene_data)
+        self._rebuildIndexes()
+    return
 
-      for cameraID in scene.cameras.keys():
-        self._cached_scenes_by_cameraID[cameraID] = scene
+  def _filterScenes(self, found):
+    if self.scene_filter is None:
+      return found
+    return [scene_data for scene_data in found if self.scene_filter(scene_data)]
+
+  def _applySceneData(self, scene_data):
+    uid = scene_data['uid']
+    self.scene_data[uid] = scene_data
+    scene_data = dict(scene_data)
+    if self.tracker_config_data:
+      scene_data["tracker_config"] = [self.tracker_config_data["max_unreliable_time"],
+                                    self.tracker_config_data["non_measurement_time_dynamic"],
+                                    self.tracker_config_data["non_measurement_time_static"],
+                                    self.tracker_config_data["time_chunking_enabled"],
+                                    self.tracker_config_data["time_chunking_interval_milliseconds"]]
+      scene_data["persist_attributes"] = self.tracker_config_data.get("persist_attributes", {})
+
+    if uid not in self.cached_scenes_by_uid:
+      self.cached_scenes_by_uid[uid] = self.scene_class.deserialize(scene_data)
+    else:
+      self.cached_scenes_by_uid[uid].updateScene(scene_data)
+    return
+
+  def _removeScene(self, uid):
+    self.cached_scenes_by_uid.pop(uid, None)
+    self.scene_data.pop(uid, None)
+    self.scene_etags.pop(uid, None)
+    return
+
+  def _rebuildIndexes(self):
+    by_camera = {}
+    by_sensor = {}
+    for scene in self.cached_scenes_by_uid.values():
+      for cameraID, camera in scene.cameras.items():
+        by_camera[cameraID] = (scene, camera)
       for sensorID in scene.sensors.keys():
-        self._cached_scenes_by_sensorID[sensorID] = scene
-      self.cached_scenes_by_uid[scene.uid] = scene
-    self._cache_refreshed = get_epoch_time()
+        by_sensor[sensorID] = scene
+    self._cached_cameras_by_ID = by_camera
+    self._cached_scenes_by_sensorID = by_sensor
     return
 
   def _refreshCameras(self, scene_data):
+    """! Write camera parameters received from the cameras to the database.
+
+    @return  True if any camera was updated, and the scene data is outdated.
+    """
+    updated = False
     for camera in scene_data.get('cameras', []):
       update_data = {}
       supported_distortion_values = ('k1','k2','p1','p2','k3')
 
       if camera['uid'] in self.camera_parameters:
-        intrinsics = self.camera_parameters[camera['uid']].get('intrinsics')
+        parameters = self.camera_parameters[camera['uid']]
+        intrinsics = parameters.get('intrinsics')
         if intrinsics and camera.get('intrinsics') != intrinsics:
           update_data['intrinsics'] = intrinsics
 
         # FIXME: Only use supported distortion values until more are supported by database
-        distortion_values = {
-          dist_coeff: self.camera_parameters[camera['uid']].get('distortion')[dist_coeff]
-          for dist_coeff in supported_distortion_values
-        }
-        if camera.get('distortion') != distortion_values:
-          update_data['distortion'] = self.camera_parameters[camera['uid']]['distortion']
+        distortion = parameters.get('distortion')
+        if distortion:
+          distortion_values = {dist_coeff: distortion.get(dist_coeff)
+                                for dist_coeff in supported_distortion_values}
+          if camera.get('distortion') != distortion_values:
+            update_data['distortion'] = distortion
+
+        resolution = parameters.get('resolution')
+        if resolution and camera.get('resolution') != resolution:
+          update_data['resolution'] = {'width': resolution[0], 'height': resolution[1]}
 
       if update_data:
         res = self.data_source.updateCamera(camera['uid'], update_data)
         if not res:
           log.warn(f"Failed to update camera {camera['uid']}")
-
-        # Make a get request to pull the updated camera information
-        # from db and store it to existing camera dictionary
-        camera = self.data_source.getCamera(camera['uid'])
-    return
+        updated = True
+    return updated
 
   def refreshScenesForCamParams(self, jdata):
-    intrinsics_changed = self.cameraParametersChanged(jdata, 'intrinsics')
-    distortion_changed = self.cameraParametersChanged(jdata, 'distortion')
+    """! Apply the intrinsics and distortion a camera sends with its detections.
 
-    for scene in self.cached_scenes_by_uid.values():
-      for camera in scene.cameras:
-        if jdata['id'] == camera:
-          intrinsics = jdata.get('intrinsics', {})
-          cx = intrinsics.get('cx')
-          cy = intrinsics.get('cy')
-
-          if cx is not None and cy is not None:
-            width = cx * 2
-            height = cy * 2
-            current_resolution = scene.cameras[camera].pose.resolution if hasattr(scene.cameras[camera].pose, 'resolution') else None
-            if current_resolution != [width, height]:
-              self.camera_parameters[camera]['resolution'] = [width, height]
-              self.updateCamera(scene.cameras[camera])
-
-    if intrinsics_changed or distortion_changed:
-      self.refreshScenes()
+    The parameters are compared by fingerprint, so a camera that sends the
+    same parameters with every message costs a comparison per message. When they
+    change only that camera is rebuilt, and its scene is refreshed in the
+    background to write them to the database.
+    """
+    cameraID = jdata['id']
+    intrinsics = jdata.get('intrinsics')
+    distortion = jdata.get('distortion')
+    if not intrinsics and not distortion:
+      return
+
+    scene, camera = self._cached_cameras_by_ID.get(cameraID, (None, None))
+    fingerprint = parameterFingerprint((intrinsics, distortion))
+    if self._camera_fingerprints.get(cameraID) == (fingerprint, camera):
+      return
+
+    parameters = dict(self.camera_parameters.get(cameraID, {}))
+    if intrinsics:
+      parameters['intrinsics'] = intrinsics
+      cx = intrinsics.get('cx') if isinstance(intrinsics, dict) else None
+      cy = intrinsics.get('cy') if isinstance(intrinsics, dict) else None
+      if cx is not None and cy is not None:
+        parameters['resolution'] = [cx * 2, cy * 2]
+    if distortion:
+      parameters['distortion'] = distortion
+    self.camera_parameters[cameraID] = parameters
+
+    if scene is not None:
+      camera = self._rebuildCamera(scene, cameraID) or camera
+      self.requestRefresh(scene.uid)
+    self._camera_fingerprints[cameraID] = (fingerprint, camera)
     return
 
+  def _rebuildCamera(self, scene, cameraID):
+    """! Rebuild one camera of a scene with the parameters it sent.
+
+    @return  The new camera, None if it could not be built.
+    """
+    camera_data = next((x for x in self.scene_data.get(scene.uid, {}).get('cameras', [])
+                        if x['uid'] == cameraID), None)
+    if camera_data is None:
+      return None
+    parameters = self.camera_parameters[cameraID]
+    info = dict(camera_data)
+    info.update({key: parameters[key] for key in ('intrinsics', 'distortion') if key in parameters})
+    try:
+      camera = Camera(cameraID, info, resolution=parameters.get('resolution', info.get('resolution')))
+    except (ValueError, TypeError) as e:
+      log.warn(f"Invalid parameters from camera {cameraID}", e)
+      return None
+
+    scene.cameras[cameraID] = camera
+    scene.camera_views.invalidate()
+    self._cached_cameras_by_ID = dict(self._cached_cameras_by_ID)
+    self._cached_cameras_by_ID[cameraID] = (scene, camera)
+    return camera
+
   def updateCamera(self, cam):
     if cam.cameraID not in self.camera_parameters:
       return
@@ -145,26 +372,15 @@ class CacheManager:
       log.warn(f"Failed to update camera {cam.cameraID}")
     return
 
-  def cameraParametersChanged(self, message, parameter_type):
-    message_parameters = message.get(parameter_type)
-    stored_parameters = self.camera_parameters.get(message['id'], {}).get(parameter_type)
-    if message_parameters and message_parameters != stored_parameters:
-      self.camera_parameters.setdefault(message['id'], {})[parameter_type] = message[parameter_type]
-      return True
-    return False
-
   def checkRefresh(self):
-    now = get_epoch_time()
-    if not hasattr(self, 'cached_scenes_by_uid') \
-       or self.cached_scenes_by_uid is None \
-       or not hasattr(self, '_cache_refreshed'):
-       #or now - self._cache_refreshed > REFRESH_TIME:
-      self.refreshScenes()
+    if not hasattr(self, '_cache_refreshed'):
+      # The scenes were never fetched, retry without holding up the caller
+      self.requestRefresh()
     return
 
   def allScenes(self):
     self.checkRefresh()
-    return self.cached_scenes_by_uid.values()
+    return list(self.cached_scenes_by_uid.values())
 
   def sceneWithID(self, sceneID):
     self.checkRefresh()
@@ -172,7 +388,8 @@ class CacheManager:
 
   def sceneWithCameraID(self, cameraID):
     self.checkRefresh()
-    return self._cached_scenes_by_cameraID.get(cameraID, None)
+    scene, _ = self._cached_cameras_by_ID.get(cameraID, (None, None))
+    return scene
 
   def sceneWithSensorID(self, sensorID):
     self.checkRefresh()
@@ -183,7 +400,6 @@ class CacheManager:
     return self.cached_child_transforms_by_uid.get(childID, None)
 
   def invalidate(self):
-    self.cached_scenes_by_uid = None
-    if not hasattr(self, 'cached_child_transforms_by_uid') or self.cached_child_transforms_by_uid is None:
-      self.cached_child_transforms_by_uid = {}
+    """! Refresh all scenes in the background, the cached scenes are used until then. """
+    self.requestRefresh()
     return
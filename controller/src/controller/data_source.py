@@ -2,14 +2,19 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from abc import ABC, abstractmethod
+from http import HTTPStatus
 from pathlib import Path
 import json
 from scene_common import log
-from scene_common.rest_client import RESTClient
+from scene_common.rest_client import RESTClient, RESTResult
 
 class SceneDataSource(ABC):
   @abstractmethod
-  def getScenes(self):
+  def getScenes(self, etag=None):
+    pass
+
+  @abstractmethod
+  def getScene(self, scene_uid, etag=None):
     pass
 
   @abstractmethod
@@ -34,8 +39,11 @@ class RestSceneDataSource(SceneDataSource):
     self.rest = RESTClient(rest_url, rootcert=root_cert, auth=rest_auth)
     return
 
-  def getScenes(self):
-    return self.rest.getScenes(None)
+  def getScenes(self, etag=None):
+    return self.rest.getScenes(None, etag)
+
+  def getScene(self, scene_uid, etag=None):
+    return self.rest.getScene(scene_uid, etag)
 
   def setTRSMatrix(self, scene_uid, matrix):
     return self.rest.updateScene(scene_uid, {'trs_matrix': matrix.tolist()})
@@ -77,9 +85,18 @@ class FileSceneDataSource(SceneDataSource):
         self.scenes.extend(data)
     return
 
-  def getScenes(self):
+  def getScenes(self, etag=None):
     return {"results": self.scenes}
 
+  def getScene(self, scene_uid, etag=None):
+    result = RESTResult(HTTPStatus.OK)
+    for scene in self.scenes:
+      if scene.get("uid") == scene_uid:
+        result.update(scene)
+        return result
+    result.statusCode = HTTPStatus.NOT_FOUND
+    return result
+
   def getChildScenes(self, scene_uid):
     results = []
 
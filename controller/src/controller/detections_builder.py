@@ -2,31 +2,154 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import numpy as np
+import orjson
 
 from controller.scene import TripwireEvent
-from scene_common.earth_lla import convertXYZToLLA, calculateHeading
-from scene_common.geometry import DEFAULTZ, Point, Size
+from scene_common.earth_lla import calculateHeadingBatch, convertXYZToLLABatch
+from scene_common.geometry import DEFAULTZ, Point
+from scene_common.reid_codec import encodeReIDVector
 from scene_common.timestamp import get_iso_time
 
 
-def buildDetectionsDict(objects, scene):
+OBJECTS_PLACEHOLDER = "__detections_objects__"
+SERIALIZE_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+
+class DetectionsCache:
+  """! Per-frame cache of the published form of each object.
+
+  A frame is one incoming message and everything published in response to
+  it. Within a frame the same object is published on the scene, regulated,
+  region and event topics; the cache builds its dict once, keyed on
+  (gid, frame), and keeps its serialized bytes so that payloads can be
+  composed with composeDetections() instead of being dumped again.
+  """
+
+  def __init__(self):
+    self.frame = 0
+    self._dicts = {}
+    self._fragments = {}
+    return
+
+  def nextFrame(self):
+    self.frame += 1
+    self._dicts.clear()
+    self._fragments.clear()
+    return
+
+  def objDict(self, gid):
+    return self._dicts.get((gid, self.frame), None)
+
+  def addObjDict(self, gid, obj_dict):
+    self._dicts[(gid, self.frame)] = obj_dict
+    return
+
+  def discardFragment(self, gid):
+    """! Must be called when a cached dict is modified after it may have
+    been serialized.
+    """
+    self._fragments.pop((gid, self.frame), None)
+    return
+
+  def fragments(self, obj_dicts):
+    """! Serialized form of each object dict, reused within the frame. """
+    result = []
+    for obj_dict in obj_dicts:
+      key = (obj_dict.get('id', None), self.frame)
+      if key[0] is None or self._dicts.get(key, None) is not obj_dict:
+        result.append(orjson.dumps(obj_dict, option=SERIALIZE_OPTIONS))
+        continue
+      fragment = self._fragments.get(key, None)
+      if fragment is None:
+        fragment = self._fragments[key] = orjson.dumps(obj_dict, option=SERIALIZE_OPTIONS)
+      result.append(fragment)
+    return result
+
+def splitDetections(jdata):
+  """! Serialize everything in jdata except 'objects'.
+
+  @return   (prefix, suffix) bytes to be joined around the serialized
+            objects list by composeDetections().
+  """
+  objects = jdata['objects']
+  jdata['objects'] = OBJECTS_PLACEHOLDER
+  try:
+    jstr = orjson.dumps(jdata, option=SERIALIZE_OPTIONS)
+  finally:
+    jdata['objects'] = objects
+  prefix, suffix = jstr.split(b'"' + OBJECTS_PLACEHOLDER.encode() + b'"', 1)
+  return prefix, suffix
+
+def composeDetections(envelope, fragments):
+  """! Payload with the same bytes as orjson.dumps(jdata) from the output of
+  splitDetections(jdata) and the serialized objects.
+  """
+  prefix, suffix = envelope
+  return b"".join((prefix, b"[", b",".join(fragments), b"]", suffix))
+
+def buildDetectionsDict(objects, scene, cache=None):
   result_dict = {}
+  geospatial = []
   for obj in objects:
-    obj_dict = prepareObjDict(scene, obj, False)
+    obj_dict = prepareObjDict(scene, obj, False, cache, geospatial)
     result_dict[obj_dict['id']] = obj_dict
+  addGeospatial(scene, geospatial)
   return result_dict
 
-def buildDetectionsList(objects, scene, update_visibility=False):
+def buildDetectionsList(objects, scene, update_visibility=False, cache=None):
   result_list = []
+  visible = []
+  geospatial = []
   for obj in objects:
-    obj_dict = prepareObjDict(scene, obj, update_visibility)
+    obj_dict = prepareObjDict(scene, obj, False, cache, geospatial)
     result_list.append(obj_dict)
+    aobj = obj.object if isinstance(obj, TripwireEvent) else obj
+    if update_visibility and hasattr(aobj, 'visibility'):
+      visible.append((aobj, obj_dict))
+  if visible:
+    computeCameraBoundsBatch(scene, visible)
+    if cache is not None:
+      for aobj, _ in visible:
+        cache.discardFragment(aobj.gid)
+  addGeospatial(scene, geospatial)
   return result_list
 
-def prepareObjDict(scene, obj, update_visibility):
+def prepareObjDict(scene, obj, update_visibility, cache=None, geospatial=None):
+  """! Published form of an object.
+
+  @param    geospatial    Optional list, newly built dicts that need the
+                          geospatial fields are appended to it instead of
+                          being converted one at a time. The caller must
+                          pass it to addGeospatial().
+  """
   aobj = obj
   if isinstance(obj, TripwireEvent):
     aobj = obj.object
+
+  obj_dict = None
+  if cache is not None and aobj.gid is not None:
+    obj_dict = cache.objDict(aobj.gid)
+  if obj_dict is None:
+    obj_dict = _buildObjDict(scene, aobj)
+    if cache is not None and aobj.gid is not None:
+      cache.addObjDict(aobj.gid, obj_dict)
+    if scene and scene.output_lla:
+      if geospatial is None:
+        addGeospatial(scene, [obj_dict])
+      else:
+        geospatial.append(obj_dict)
+
+  modified = False
+  if hasattr(aobj, 'visibility') and update_visibility:
+    computeCameraBounds(scene, aobj, obj_dict)
+    modified = True
+  if isinstance(obj, TripwireEvent):
+    obj_dict['direction'] = obj.direction
+    modified = True
+  if modified and cache is not None:
+    cache.discardFragment(aobj.gid)
+  return obj_dict
+
+def _buildObjDict(scene, aobj):
   otype = aobj.category
 
   scene_loc_vector = aobj.sceneLoc.asCartesianVector
@@ -50,27 +173,23 @@ def prepareObjDict(scene, obj, update_visibility):
   if rotation is not None:
     obj_dict['rotation'] = rotation
 
-  if scene and scene.output_lla:
-    lat_long_alt = convertXYZToLLA(scene.trs_xyz_to_lla, scene_loc_vector)
-    obj_dict['lat_long_alt'] = lat_long_alt.tolist()
-    heading = calculateHeading(scene.trs_xyz_to_lla, aobj.sceneLoc.asCartesianVector, velocity.asCartesianVector)
-    obj_dict['heading'] = heading.tolist()
-
   reid = aobj.reidVector
   if reid is not None:
-    if isinstance(reid, np.ndarray):
-      obj_dict['reid'] = reid.tolist()
+    if aobj.reidEncoded is not None:
+      obj_dict['reid'] = aobj.reidEncoded
+    elif isinstance(reid, np.ndarray):
+      obj_dict['reid'] = encodeReIDVector(reid)
     else:
       obj_dict['reid'] = reid
 
   if hasattr(aobj, 'visibility'):
     obj_dict['visibility'] = aobj.visibility
-    if update_visibility:
-      computeCameraBounds(scene, aobj, obj_dict)
 
   chain_data = aobj.chain_data
   if len(chain_data.regions):
-    obj_dict['regions'] = chain_data.regions
+    # Entry times are kept as epoch time and only formatted for publishing
+    obj_dict['regions'] = {key: {**region, 'entered': get_iso_time(region['entered'])}
+                           for key, region in chain_data.regions.items()}
   if len(chain_data.sensors):
     obj_dict['sensors'] = chain_data.sensors
   if hasattr(aobj, 'confidence'):
@@ -79,35 +198,69 @@ def prepareObjDict(scene, obj, update_visibility):
     obj_dict['similarity'] = aobj.similarity
   if hasattr(aobj, 'first_seen'):
     obj_dict['first_seen'] = get_iso_time(aobj.first_seen)
-  if isinstance(obj, TripwireEvent):
-    obj_dict['direction'] = obj.direction
   if hasattr(aobj, 'asset_scale'):
     obj_dict['asset_scale'] = aobj.asset_scale
   if len(aobj.chain_data.persist):
     obj_dict['persistent_data'] = aobj.chain_data.persist
   return obj_dict
 
+def addGeospatial(scene, obj_dicts):
+  """! Add 'lat_long_alt' and 'heading' to object dicts from their
+  'translation' and 'velocity', converting all of them at once.
+  """
+  if not obj_dicts:
+    return
+  trs_mat = scene.trs_xyz_to_lla
+  translations = np.array([obj_dict['translation'] for obj_dict in obj_dicts], dtype=np.float64)
+  velocities = np.array([obj_dict['velocity'] for obj_dict in obj_dicts], dtype=np.float64)
+  lat_long_alt = convertXYZToLLABatch(trs_mat, translations).tolist()
+  headings = calculateHeadingBatch(trs_mat, translations, velocities).tolist()
+  for obj_dict, lla, heading in zip(obj_dicts, lat_long_alt, headings):
+    obj_dict['lat_long_alt'] = lla
+    obj_dict['heading'] = heading
+  return
+
 def computeCameraBounds(scene, aobj, obj_dict):
-  camera_bounds = {}
-  for cameraID in obj_dict['visibility']:
-    bounds = None
-    if aobj and hasattr(aobj.vectors[0].camera, 'cameraID') \
-          and cameraID == aobj.vectors[0].camera.cameraID:
-      bounds = getattr(aobj, 'boundingBoxPixels', None)
-    elif scene:
-      camera = scene.cameraWithID(cameraID)
-      if camera is not None and 'bb_meters' in obj_dict:
-        obj_translation = None
-        obj_size = None
+  computeCameraBoundsBatch(scene, [(aobj, obj_dict)])
+  return
+
+def computeCameraBoundsBatch(scene, items):
+  """! Set 'camera_bounds' of each (aobj, obj_dict) in items.
+
+  The bounds in the cameras that did not detect an object are estimated
+  from its size, with one projection per camera for all of the objects.
+  """
+  estimated = {}
+  for aobj, obj_dict in items:
+    camera_bounds = {}
+    for cameraID in obj_dict['visibility']:
+      if aobj and hasattr(aobj.vectors[0].camera, 'cameraID') \
+            and cameraID == aobj.vectors[0].camera.cameraID:
+        camera_bounds[cameraID] = getattr(aobj, 'boundingBoxPixels', None)
+      elif scene and 'bb_meters' in obj_dict:
         if aobj:
-          obj_translation = aobj.sceneLoc
-          obj_size = aobj.bbMeters.size
+          location = aobj.sceneLoc
+          size = (aobj.bbMeters.size.width, aobj.bbMeters.size.height)
         else:
-          obj_translation = Point(obj_dict['translation'])
-          obj_size = Size(obj_dict['bb_meters']['width'], obj_dict['bb_meters']['height'])
-        bounds = camera.pose.projectEstimatedBoundsToCameraPixels(obj_translation,
-                                                                  obj_size)
-    if bounds:
-      camera_bounds[cameraID] = bounds.asDict
-  obj_dict['camera_bounds'] = camera_bounds
+          location = Point(obj_dict['translation'])
+          size = (obj_dict['bb_meters']['width'], obj_dict['bb_meters']['height'])
+        # Keeps the order of the cameras until the bounds are projected
+        camera_bounds[cameraID] = None
+        estimated.setdefault(cameraID, []).append(
+          (camera_bounds, (location.x, location.y, location.z), size))
+    obj_dict['camera_bounds'] = camera_bounds
+
+  for cameraID, objects in estimated.items():
+    camera = scene.cameraWithID(cameraID)
+    if camera is None:
+      continue
+    all_bounds = camera.pose.projectEstimatedBoundsToCameraPixelsBatch(
+      [location for _, location, _ in objects], [size for _, _, size in objects])
+    for (camera_bounds, _, _), bounds in zip(objects, all_bounds):
+      camera_bounds[cameraID] = bounds
+
+  for _, obj_dict in items:
+    obj_dict['camera_bounds'] = {cameraID: bounds.asDict
+                                 for cameraID, bounds in obj_dict['camera_bounds'].items()
+                                 if bounds}
   return
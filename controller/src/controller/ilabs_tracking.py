@@ -23,6 +23,8 @@ class IntelLabsTracking(Tracking):
     """Initialize the tracker with tracker configuration parameters"""
     super().__init__()
     self.name = name if name is not None else "IntelLabsTracking"
+    self._tracks_by_uuid = {}
+    self._tracks_by_rv_id = {}
     #ref_camera_frame_rate is used to determine the frame-based param values
     self.ref_camera_frame_rate = 30
     tracker_config = rv.tracking.TrackManagerConfig()
@@ -95,38 +97,50 @@ class IntelLabsTracking(Tracking):
     self.tracker.track(rv_objects, timestamp, distance_type=rv.tracking.DistanceType.Euclidean, distance_threshold=tracking_radius)
     return
 
-  def from_tracked_object(self, tracked_object, objects):
-    """Get associated sscape object from reliable tracked object"""
+  def from_tracked_object(self, tracked_object, detections):
+    """Get associated sscape object from reliable tracked object
+
+    detections maps the uuid of the objects of the current frame to the
+    object, the previous tracks are looked up in the indexes built by
+    _indexTrackerObjects().
+    """
     uuid = tracked_object.attributes['info']
-    sscape_object = None
-    for obj in objects:
-      if uuid == obj.uuid:
-        sscape_object = obj
-        break
+    sscape_object = detections.get(uuid)
     if not sscape_object:
-      for obj in self.all_tracker_objects:
-        if uuid == obj.uuid:
-          return obj
+      tracked = self._tracks_by_uuid.get(uuid)
+      if tracked is not None:
+        return tracked
 
     sscape_object.location[0].point = Point(tracked_object.x, tracked_object.y,
                                             tracked_object.z)
     sscape_object.velocity = Point((tracked_object.vx, tracked_object.vy, 0.0))
 
     sscape_object.rv_id = tracked_object.id
-    found = False
-    for obj in self.all_tracker_objects:
-      if hasattr(obj, 'rv_id') and sscape_object.rv_id == obj.rv_id:
-        found = True
-        sscape_object.setPrevious(obj)
-        sscape_object.inferRotationFromVelocity()
-        break
-    if not found:
+    previous = self._tracks_by_rv_id.get(sscape_object.rv_id)
+    if previous is not None:
+      sscape_object.setPrevious(previous)
+      sscape_object.inferRotationFromVelocity()
+    else:
       sscape_object.setGID(uuid)
 
     self.uuid_manager.assignID(sscape_object)
 
     return sscape_object
 
+  def _indexTrackerObjects(self):
+    """Index the tracks of the previous step by uuid and by rv_id, keeping
+    the first object for each key like a scan of all_tracker_objects would."""
+    self._tracks_by_uuid = {}
+    self._tracks_by_rv_id = {}
+    for obj in self.all_tracker_objects:
+      uuid = getattr(obj, 'uuid', None)
+      if uuid is not None:
+        self._tracks_by_uuid.setdefault(uuid, obj)
+      rv_id = getattr(obj, 'rv_id', None)
+      if rv_id is not None:
+        self._tracks_by_rv_id.setdefault(rv_id, obj)
+    return
+
   def mergeAlreadyTrackedObjects(self, tracks):
     """Merge already tracked objects with current objects"""
     now = get_epoch_time()
@@ -135,14 +149,14 @@ class IntelLabsTracking(Tracking):
     new_tracks = {}
     non_existing_tracks = {}
 
+    previous_tracks = {}
+    for existing_obj in self.already_tracked_objects:
+      previous_tracks.setdefault(existing_obj.oid, existing_obj)
+
     for new_obj in tracks:
-      found = False
-      for existing_obj in self.already_tracked_objects:
-        if new_obj.oid == existing_obj.oid:
-          found = True
-          existing_tracks[new_obj.oid] = (new_obj, existing_obj)
-          break
-      if not found:
+      if new_obj.oid in previous_tracks:
+        existing_tracks[new_obj.oid] = (new_obj, previous_tracks[new_obj.oid])
+      else:
         new_tracks[new_obj.oid] = new_obj
     for existing_obj in self.already_tracked_objects:
       if existing_obj.oid not in existing_tracks:
@@ -169,13 +183,8 @@ class IntelLabsTracking(Tracking):
     when = datetime.fromtimestamp(when)
     self.update_tracks(objects, when)
     tracked_objects = self.tracker.get_reliable_tracks()
-    self.uuid_manager.pruneInactiveTracks(tracked_objects)
-    tracks_from_detections = [self.from_tracked_object(tracked_object, objects)
-                     for tracked_object in tracked_objects]
-
-    # Already tracked objects include moving objects from tracks consumed directly
-    self.already_tracked_objects = self.mergeAlreadyTrackedObjects(already_tracked_objects)
-    self.all_tracker_objects = tracks_from_detections + self.already_tracked_objects
+    detections = {obj.uuid: obj for obj in objects}
+    self.associateTracks(tracked_objects, detections, already_tracked_objects)
     return
 
   def trackCategoryBatched(self, objects_per_camera, when, already_tracked_objects):
@@ -183,12 +192,17 @@ class IntelLabsTracking(Tracking):
     when = datetime.fromtimestamp(when)
     self.update_tracks_batched(objects_per_camera, when)
     tracked_objects = self.tracker.get_reliable_tracks()
-    self.uuid_manager.pruneInactiveTracks(tracked_objects)
-
-    # Flatten all objects for from_tracked_object lookup
-    all_objects = [obj for camera_objects in objects_per_camera for obj in camera_objects]
+    detections = {obj.uuid: obj for camera_objects in objects_per_camera
+                  for obj in camera_objects}
+    self.associateTracks(tracked_objects, detections, already_tracked_objects)
+    return
 
-    tracks_from_detections = [self.from_tracked_object(tracked_object, all_objects)
+  def associateTracks(self, tracked_objects, detections, already_tracked_objects):
+    """Associate the reliable tracks of this step with the detections, indexed
+    by uuid, and with the tracks of the previous step"""
+    self.uuid_manager.pruneInactiveTracks(tracked_objects)
+    self._indexTrackerObjects()
+    tracks_from_detections = [self.from_tracked_object(tracked_object, detections)
                      for tracked_object in tracked_objects]
 
     # Already tracked objects include moving objects from tracks consumed directly
@@ -1,9 +1,7 @@
 # SPDX-FileCopyrightText: (C) 2021 - 2025 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
-import base64
 import datetime
-import struct
 import warnings
 from dataclasses import dataclass
 from threading import Lock
@@ -11,11 +9,11 @@ from typing import Dict, List
 
 import cv2
 import numpy as np
-import open3d as o3d
 from scipy.spatial.transform import Rotation
 
 from scene_common.geometry import DEFAULTZ, Line, Point, Rectangle
 from scene_common.options import TYPE_1, TYPE_2
+from scene_common.reid_codec import decodeReIDVector, encodeReIDVector
 from scene_common.transform import normalize, rotationToTarget
 
 warnings.simplefilter('ignore', np.RankWarning)
@@ -26,7 +24,7 @@ DEFAULT_TRACKING_RADIUS = 2.0
 LOCATION_LIMIT = 20
 SPEED_THRESHOLD = 0.1
 
-@dataclass
+@dataclass(slots=True)
 class ChainData:
   regions: Dict
   publishedLocations: List[Point]
@@ -34,6 +32,8 @@ class ChainData:
   persist: Dict
 
 class Chronoloc:
+  __slots__ = ('point', 'when', 'bounds')
+
   def __init__(self, point: Point, when: datetime, bounds: Rectangle):
     if not point.is3D:
       point = Point(point.x, point.y, DEFAULTZ)
@@ -42,7 +42,99 @@ class Chronoloc:
     self.bounds = bounds
     return
 
+class _LocationRing:
+  """! Fixed-size ring of past locations shared by the objects of a chain.
+  One slot more than a history needs is kept so that the history of the
+  previous object stays intact while the next one is appended.
+  """
+  __slots__ = ('points', 'when', 'bounds', 'tip')
+
+  CAPACITY = LOCATION_LIMIT + 1
+
+  def __init__(self):
+    self.points = np.empty((self.CAPACITY, 3))
+    self.when = np.empty(self.CAPACITY)
+    self.bounds = [None] * self.CAPACITY
+    self.tip = 0
+    return
+
+  def push(self, chronoloc):
+    slot = self.tip % self.CAPACITY
+    point = chronoloc.point
+    self.points[slot] = (point.x, point.y, point.z)
+    self.when[slot] = chronoloc.when
+    self.bounds[slot] = chronoloc.bounds
+    self.tip += 1
+    return
+
+  def entry(self, tip, idx):
+    slot = (tip - 1 - idx) % self.CAPACITY
+    return Chronoloc(Point(*self.points[slot].tolist()), float(self.when[slot]), self.bounds[slot])
+
+class LocationHistory:
+  """! Locations of a tracked object, newest first and at most LOCATION_LIMIT
+  long. The newest entry is a Chronoloc which the tracker may update, older
+  entries are read-only and live in a ring of NumPy arrays shared along the
+  chain, so continuing a track does not copy its history.
+  """
+  __slots__ = ('latest', '_ring', '_tip', '_length')
+
+  def __init__(self, latest):
+    self.latest = latest
+    self._ring = None
+    self._tip = 0
+    self._length = 0
+    return
+
+  @classmethod
+  def fromList(cls, entries):
+    """! Create a history from Chronolocs ordered newest first. """
+    entries = entries[:LOCATION_LIMIT]
+    history = cls(entries[-1])
+    for entry in reversed(entries[:-1]):
+      previous, history = history, cls(entry)
+      history.follow(previous)
+    return history
+
+  def follow(self, previous):
+    """! Make the history of the previous object of the track the older
+    part of this history.
+    @param   previous   LocationHistory of the previous object.
+    """
+    ring = previous._ring
+    if ring is None or ring.tip != previous._tip:
+      # Start a new ring when the previous history was already continued
+      ring = _LocationRing()
+      for idx in reversed(range(previous._length)):
+        ring.push(previous[idx + 1])
+    ring.push(previous.latest)
+    self._ring = ring
+    self._tip = ring.tip
+    self._length = min(previous._length + 1, LOCATION_LIMIT - 1)
+    return
+
+  def __len__(self):
+    return self._length + 1
+
+  def __getitem__(self, idx):
+    if isinstance(idx, slice):
+      return [self[i] for i in range(*idx.indices(len(self)))]
+    if idx < 0:
+      idx += len(self)
+    if idx == 0:
+      return self.latest
+    if not 0 < idx <= self._length:
+      raise IndexError("location history index out of range")
+    return self._ring.entry(self._tip, idx - 1)
+
+  def __iter__(self):
+    for idx in range(len(self)):
+      yield self[idx]
+    return
+
 class Vector:
+  __slots__ = ('camera', 'point', 'last_seen')
+
   def __init__(self, camera, point, when):
     if not point.is3D:
       point = Point(point.x, point.y, DEFAULTZ)
@@ -61,7 +153,7 @@ class Vector:
 class MovingObject:
   ## Fields that are specific to a single detection:
   # 'tracking_radius', 'camera', 'boundingBox', 'boundingBoxPixels',
-  # 'confidence', 'oid', 'reidVector', 'visibility'
+  # 'confidence', 'oid', 'reidVector', 'reidEncoded', 'visibility'
 
   ## Fields that really are shared across the chain:
   # 'gid', 'frameCount', 'velocity', 'intersected',
@@ -70,6 +162,14 @@ class MovingObject:
   gid_counter = 0
   gid_lock = Lock()
 
+  # A new object is created for every detection, keep them lean
+  __slots__ = ('chain_data', 'size', 'buffer_size', 'tracking_radius', 'shift_type',
+               'project_to_map', 'map_raycaster', 'rotation_from_velocity', 'first_seen', 'last_seen', 'camera', 'info',
+               'category', 'boundingBox', 'boundingBoxPixels', 'confidence', 'oid', 'gid',
+               'frameCount', 'velocity', 'location', 'rotation', 'intersected', 'reidVector',
+               'reidEncoded', 'orig_point', 'vectors', 'bbMeters', 'bbShadow', 'baseAngle',
+               'adjusted', 'visibility', 'similarity', 'asset_scale', 'mesh', 'uuid', 'rv_id')
+
   def __init__(self, info, when, camera):
     self.chain_data = None
     self.size = None
@@ -77,9 +177,7 @@ class MovingObject:
     self.tracking_radius = DEFAULT_TRACKING_RADIUS
     self.shift_type = TYPE_1
     self.project_to_map = False
-    self.map_triangle_mesh = None
-    self.map_translation = None
-    self.map_rotation = None
+    self.map_raycaster = None
     self.rotation_from_velocity = False
 
     self.first_seen = when
@@ -105,18 +203,25 @@ class MovingObject:
     self.frameCount = 1
     self.velocity = None
     self.location = None
-    self.rotation = np.array([0, 0, 0, 1]).tolist()
+    self.rotation = [0, 0, 0, 1]
     self.intersected = False
     self.reidVector = None
+    self.reidEncoded = None
     reid = self.info.get('reid', None)
     if reid is not None:
       self._decodeReIDVector(reid)
     return
 
   def _decodeReIDVector(self, reid):
+    if isinstance(reid, np.ndarray):
+      # Decoded from binary camera data, encoded only if it is published
+      self.reidVector = reid
+      self.info.pop('reid')
+      return
     try:
-      vector = base64.b64decode(reid)
-      self.reidVector = np.array(struct.unpack("256f", vector)).reshape(1, -1)
+      self.reidVector = decodeReIDVector(reid)
+      # Kept so that the vector can be published without encoding it again
+      self.reidEncoded = reid
       self.info.pop('reid')
     except TypeError:
       if type(reid) == list:
@@ -150,7 +255,7 @@ class MovingObject:
     # log.debug("MATCHED", self.__class__.__name__,
     #     "id=%i/%i:%i" % (otherObj.gid, otherObj.oid, self.oid),
     #     otherObj.sceneLoc, self.sceneLoc)
-    self.location = [self.location[0]] + otherObj.location[:LOCATION_LIMIT - 1]
+    self.location.follow(otherObj.location)
 
     persistent_attributes = self.chain_data.persist if self.chain_data else {}
     for attr, new_value in persistent_attributes.items():
@@ -196,20 +301,24 @@ class MovingObject:
         pt = Point(pt.x, pt.y, bounds.origin.z)
     return pt
 
-  def mapObjectDetectionToWorld(self, info, when, camera):
-    """Maps detected object pose to world coordinate system"""
+  def mapObjectDetectionToWorld(self, info, when, camera, world_point=None, map_pose=None):
+    """Maps detected object pose to world coordinate system
+
+    @param    world_point    camLoc already projected to the world, see mapDetectionsToWorld()
+    @param    map_pose       (translation, rotation) already projected to the map,
+                             see mapDetectionsToWorld()
+    """
     if info is not None and 'size' in info:
       self.size = info['size']
     if info is not None and 'translation' in info:
       self.orig_point = Point(info['translation'])
       if camera and hasattr(camera, 'pose'):
         if 'rotation' in info:
-          if self.project_to_map:
-            info['translation'], info['rotation'] = camera.pose.projectToMap(info['translation'],
-                                                                        info['rotation'],
-                                                                        self.map_triangle_mesh.clone(),
-                                                                        o3d.core.Tensor(self.map_translation, dtype=o3d.core.Dtype.Float32),
-                                                                        o3d.geometry.get_rotation_matrix_from_xyz(self.map_rotation))
+          if self.project_to_map and self.map_raycaster is not None:
+            if map_pose is None:
+              map_pose = camera.pose.projectToMap(info['translation'], info['rotation'],
+                                                  self.map_raycaster)
+            info['translation'], info['rotation'] = map_pose
           rotation_as_matrix = Rotation.from_quat(np.array(info['rotation'])).as_matrix()
           info['rotation'] = list(Rotation.from_matrix(np.matmul(
                                       camera.pose.pose_mat[:3,:3],
@@ -218,12 +327,14 @@ class MovingObject:
         self.orig_point = camera.pose.cameraPointToWorldPoint(Point(info['translation']))
     else:
       if camera and hasattr(camera, 'pose'):
-        self.orig_point = camera.pose.cameraPointToWorldPoint(self.camLoc)
+        if world_point is None:
+          world_point = camera.pose.cameraPointToWorldPoint(self.camLoc)
+        self.orig_point = world_point
         if not self.camLoc.is3D:
           line1 = Line(camera.pose.translation, self.orig_point)
           line2 = Line(self.orig_point, Point(np.mean([self.size[0], self.size[1]]) / 2, line1.angle, 0, polar=True), relative=True)
           self.orig_point = line2.end
-    self.location = [Chronoloc(self.orig_point, when, self.boundingBox)]
+    self.location = LocationHistory(Chronoloc(self.orig_point, when, self.boundingBox))
     self.vectors = [Vector(camera, self.orig_point, when)]
     if hasattr(self, 'buffer_size') and self.buffer_size is not None:
       self.size = [x + y for x, y in zip(self.size, self.buffer_size)]
@@ -241,10 +352,13 @@ class MovingObject:
 
   def _projectBounds(self):
     if hasattr(self.camera, "pose") and self.boundingBox:
-      self.bbMeters, self.bbShadow, self.baseAngle = \
-        self.camera.pose.projectBounds(self.boundingBox)
-      if self.size is None:
-        self.size = [self.bbMeters.width, self.bbMeters.width, self.bbMeters.height]
+      self._setProjectedBounds(*self.camera.pose.projectBounds(self.boundingBox))
+    return
+
+  def _setProjectedBounds(self, bounds, shadow, base_angle):
+    self.bbMeters, self.bbShadow, self.baseAngle = bounds, shadow, base_angle
+    if self.size is None:
+      self.size = [self.bbMeters.width, self.bbMeters.width, self.bbMeters.height]
     return
 
   @property
@@ -268,7 +382,7 @@ class MovingObject:
     @returns  class                     The dynamically created subclass.
     """
 
-    classDict = {'baseClass': cls}
+    classDict = {'baseClass': cls, '__slots__': ()}
     classDict.update('')
     if methods:
       classDict.update(methods)
@@ -313,7 +427,7 @@ class MovingObject:
       'bounding_box': self.boundingBox.asDict,
       'gid': self.gid,
       'frame_count': self.frameCount,
-      'reid': self.reidVector,
+      'reid': self.reidEncoded or self.reidVector,
       'first_seen': self.first_seen,
       'location': [{'point': (v.point.x, v.point.y, v.point.z),
                     'timestamp': v.when,
@@ -325,10 +439,7 @@ class MovingObject:
       'scene_loc': self.sceneLoc.asNumpyCartesian.tolist(),
     }
     if 'reid' in dd and isinstance(dd['reid'], np.ndarray):
-      vector = dd['reid'].flatten().tolist()
-      vector = struct.pack("256f", *vector)
-      vector = base64.b64encode(vector).decode('utf-8')
-      dd['reid'] = vector
+      dd['reid'] = encodeReIDVector(dd['reid'])
     if self.intersected:
       dd['adjusted'] = {'gid': self.adjusted[0],
                         'point': (self.adjusted[1].x, self.adjusted[1].y, self.adjusted[1].z)}
@@ -340,12 +451,14 @@ class MovingObject:
     self.gid = info['gid']
     self.frameCount = info['frame_count']
     self.reidVector = info['reid']
+    self.reidEncoded = None
     if self.reidVector is not None:
-      vector = base64.b64decode(self.reidVector)
-      self.reidVector = np.array(struct.unpack("256f", vector)).reshape(1, -1)
+      self.reidEncoded = self.reidVector
+      self.reidVector = decodeReIDVector(self.reidVector)
     self.first_seen = info['first_seen']
-    self.location = [Chronoloc(Point(v['point']), v['timestamp'], Rectangle(v['bounding_box']))
-                     for v in info['location']]
+    self.location = LocationHistory.fromList(
+      [Chronoloc(Point(v['point']), v['timestamp'], Rectangle(v['bounding_box']))
+       for v in info['location']])
     self.vectors = [Vector(scene.cameras[v['camera']], Point(v['point']), v['timestamp'])
                     for v in info['vectors']]
     if 'intersected' in info:
@@ -357,14 +470,16 @@ class MovingObject:
     return
 
 class ATagObject(MovingObject):
+  __slots__ = ('tag_id',)
+
   def __init__(self, info, when, sensor):
     super().__init__(info, when, sensor)
 
     self.tag_id = "%s-%s-%s" % (info['category'], info['tag_family'], info['tag_id'])
     return
 
-  def mapObjectDetectionToWorld(self, info, when, sensor):
-    super().mapObjectDetectionToWorld(info, when, sensor)
+  def mapObjectDetectionToWorld(self, info, when, sensor, world_point=None, map_pose=None):
+    super().mapObjectDetectionToWorld(info, when, sensor, world_point, map_pose)
 
     if not hasattr(sensor, 'pose'):
       return
@@ -380,7 +495,7 @@ class ATagObject(MovingObject):
       self.orig_point = pt
 
     bbox = getattr(self, "boundingBox", None)
-    self.location = [Chronoloc(self.orig_point, when, bbox)]
+    self.location = LocationHistory(Chronoloc(self.orig_point, when, bbox))
     self.vectors = [Vector(sensor, self.orig_point, when)]
     return
 
@@ -388,3 +503,50 @@ class ATagObject(MovingObject):
     rep = super().__repr__()
     rep += " %s" % (self.tag_id)
     return rep
+
+def mapDetectionsToWorld(objects, camera):
+  """! Map the bounding boxes of all detections of a camera frame to the
+  world with batched projections, instead of one object at a time on the
+  first use of sceneLoc. Objects with a 3D translation are left to sceneLoc.
+
+  @param    objects    MovingObjects created from the frame
+  @param    camera     Camera the frame came from
+  """
+  if not hasattr(camera, 'pose'):
+    return
+  _projectDetectionsToMap(objects, camera)
+  pending = [obj for obj in objects if obj.location is None and obj.boundingBox
+             and 'translation' not in obj.info]
+  if not pending:
+    return
+
+  projected = camera.pose.projectBoundsBatch([obj.boundingBox for obj in pending])
+  for obj, bounds in zip(pending, projected):
+    obj._setProjectedBounds(*bounds)
+
+  cam_locs = [obj.camLoc for obj in pending]
+  if any(loc.is3D for loc in cam_locs):
+    return
+  world = camera.pose.cameraPointsToWorldPoints(np.array([(loc.x, loc.y) for loc in cam_locs],
+                                                         dtype=np.float64))
+  for obj, point in zip(pending, world):
+    obj.mapObjectDetectionToWorld(obj.info, obj.first_seen, camera, Point(point))
+  return
+
+def _projectDetectionsToMap(objects, camera):
+  """! Project the 3D detections of a frame that follow the map surface,
+  casting the rays towards all of them in a single call.
+  """
+  pending = [obj for obj in objects if obj.location is None and obj.project_to_map
+             and obj.map_raycaster is not None
+             and 'translation' in obj.info and 'rotation' in obj.info]
+  if not pending:
+    return
+
+  poses = camera.pose.projectToMapBatch([obj.info['translation'] for obj in pending],
+                                        [obj.info['rotation'] for obj in pending],
+                                        pending[0].map_raycaster)
+  for obj, pose in zip(pending, poses):
+    obj._projectBounds()
+    obj.mapObjectDetectionToWorld(obj.info, obj.first_seen, camera, map_pose=pose)
+  return
@@ -25,7 +25,10 @@ from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 from scene_common import log
 
 # Export simplified public API functions only
-__all__ = ['init', 'inc_messages', 'inc_dropped', 'record_object_count', 'time_mqtt_handler', 'time_tracking']
+__all__ = ['init', 'inc_messages', 'inc_dropped', 'record_object_count', 'time_mqtt_handler', 'time_tracking',
+           'record_queue_depth', 'inc_merged', 'record_queue_wait', 'record_reid_query',
+           'record_reid_write_batch', 'record_chunk_fill', 'record_chunk_lateness',
+           'inc_chunk_dropped']
 
 # OpenTelemetry metric name constants
 METRIC_MQTT_MESSAGES_COUNT = "scenescape_controller_mqtt_messages"
@@ -33,6 +36,14 @@ METRIC_MQTT_MESSAGES_DROPPED = "scenescape_controller_mqtt_messages_dropped"
 METRIC_MQTT_HANDLER_DURATION = "scenescape_controller_mqtt_handler_duration"
 METRIC_TRACKING_DURATION = "scenescape_controller_tracking_duration"
 METRIC_MQTT_MESSAGES_OBJECT_COUNT = "scenescape_controller_objects_in_mqtt_message"
+METRIC_TRACKER_QUEUE_DEPTH = "scenescape_controller_tracker_queue_depth"
+METRIC_TRACKER_MERGED_FRAMES = "scenescape_controller_tracker_merged_frames"
+METRIC_TRACKER_QUEUE_WAIT = "scenescape_controller_tracker_queue_wait"
+METRIC_REID_QUERY_DURATION = "scenescape_controller_reid_query_duration"
+METRIC_REID_WRITE_BATCH = "scenescape_controller_reid_write_batch"
+METRIC_CHUNK_FILL = "scenescape_controller_time_chunk_fill"
+METRIC_CHUNK_LATENESS = "scenescape_controller_time_chunk_lateness"
+METRIC_CHUNK_DROPPED_FRAMES = "scenescape_controller_time_chunk_dropped_frames"
 
 METRIC_INSTRUMENTS = [
     {
@@ -64,6 +75,54 @@ METRIC_INSTRUMENTS = [
         "description": "Object count per MQTT message",
         "unit": "1",
         "kind": "histogram"
+    },
+    {
+        "name": METRIC_TRACKER_QUEUE_DEPTH,
+        "description": "Frames pending in the tracker mailbox",
+        "unit": "1",
+        "kind": "histogram"
+    },
+    {
+        "name": METRIC_TRACKER_MERGED_FRAMES,
+        "description": "Pending frames replaced by a newer frame from the same camera",
+        "unit": "1",
+        "kind": "counter"
+    },
+    {
+        "name": METRIC_TRACKER_QUEUE_WAIT,
+        "description": "Time frames wait in the tracker mailbox",
+        "unit": "ms",
+        "kind": "histogram"
+    },
+    {
+        "name": METRIC_REID_QUERY_DURATION,
+        "description": "Re-ID database query latency",
+        "unit": "ms",
+        "kind": "histogram"
+    },
+    {
+        "name": METRIC_REID_WRITE_BATCH,
+        "description": "Re-ID descriptors added per database request",
+        "unit": "1",
+        "kind": "histogram"
+    },
+    {
+        "name": METRIC_CHUNK_FILL,
+        "description": "Fraction of the active cameras that delivered a frame in a time chunk",
+        "unit": "1",
+        "kind": "histogram"
+    },
+    {
+        "name": METRIC_CHUNK_LATENESS,
+        "description": "Time a time chunk was dispatched after its deadline",
+        "unit": "ms",
+        "kind": "histogram"
+    },
+    {
+        "name": METRIC_CHUNK_DROPPED_FRAMES,
+        "description": "Camera frames replaced by a newer frame before their time chunk was dispatched",
+        "unit": "1",
+        "kind": "counter"
     }
 ]
 
@@ -117,6 +176,54 @@ def record_object_count(count, attributes=None):
   if instance:
     instance.histogram_record(METRIC_MQTT_MESSAGES_OBJECT_COUNT, count, attributes)
 
+def record_queue_depth(depth, attributes=None):
+  """Record number of frames pending in a tracker mailbox."""
+  instance = _metrics_instance
+  if instance:
+    instance.histogram_record(METRIC_TRACKER_QUEUE_DEPTH, depth, attributes)
+
+def inc_merged(attributes=None):
+  """Increment merged tracker frames counter."""
+  instance = _metrics_instance
+  if instance:
+    instance.counter_add(METRIC_TRACKER_MERGED_FRAMES, 1, attributes)
+
+def record_queue_wait(duration, attributes=None):
+  """Record time in milliseconds a frame waited in a tracker mailbox."""
+  instance = _metrics_instance
+  if instance:
+    instance.histogram_record(METRIC_TRACKER_QUEUE_WAIT, duration, attributes)
+
+def record_reid_query(duration, attributes=None):
+  """Record latency in milliseconds of a Re-ID database query."""
+  instance = _metrics_instance
+  if instance:
+    instance.histogram_record(METRIC_REID_QUERY_DURATION, duration, attributes)
+
+def record_reid_write_batch(count, attributes=None):
+  """Record number of Re-ID descriptors added in one database request."""
+  instance = _metrics_instance
+  if instance:
+    instance.histogram_record(METRIC_REID_WRITE_BATCH, count, attributes)
+
+def record_chunk_fill(fill, attributes=None):
+  """Record fraction of the active cameras that delivered a frame in a time chunk."""
+  instance = _metrics_instance
+  if instance:
+    instance.histogram_record(METRIC_CHUNK_FILL, fill, attributes)
+
+def record_chunk_lateness(duration, attributes=None):
+  """Record time in milliseconds a time chunk was dispatched after its deadline."""
+  instance = _metrics_instance
+  if instance:
+    instance.histogram_record(METRIC_CHUNK_LATENESS, duration, attributes)
+
+def inc_chunk_dropped(count, attributes=None):
+  """Increment camera frames replaced before their time chunk was dispatched."""
+  instance = _metrics_instance
+  if instance:
+    instance.counter_add(METRIC_CHUNK_DROPPED_FRAMES, count, attributes)
+
 @contextmanager
 def time_mqtt_handler(attributes=None):
   """Time MQTT handler processing duration."""
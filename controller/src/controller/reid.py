@@ -40,6 +40,14 @@ class ReIDDatabase(ABC):
     """
     return
 
+  def close(self):
+    """
+    Write any entries still buffered by the database, once no more are added
+
+    @return  None
+    """
+    return
+
   @abstractmethod
   def findSchema(self, set_name):
     """
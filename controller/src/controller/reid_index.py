@@ -0,0 +1,487 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import re
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+import orjson
+
+from controller.reid import ReIDDatabase
+from scene_common import log
+from scene_common.timestamp import get_epoch_time
+
+DIMENSIONS = 256
+K_NEIGHBORS = 1
+SCHEMA_NAME = "reid_vector"
+SIMILARITY_METRIC = "L2"
+
+# Index types
+INDEX_FLAT = "flat"    # Exact search over all stored vectors
+INDEX_IVF = "ivf"      # Exact distances within the nearest k-means cells
+INDEX_IVFPQ = "ivfpq"  # Product quantized codes within the nearest k-means cells
+INDEX_TYPES = (INDEX_FLAT, INDEX_IVF, INDEX_IVFPQ)
+
+DEFAULT_INDEX = INDEX_FLAT
+DEFAULT_MAX_ENTRIES = 200000
+DEFAULT_TTL = 0
+DEFAULT_IVF_LISTS = 64
+DEFAULT_IVF_PROBES = 8
+DEFAULT_PQ_SUBQUANTIZERS = 32
+DEFAULT_SNAPSHOT_INTERVAL = 60
+PQ_CENTROIDS = 256
+KMEANS_ITERATIONS = 10
+# Vectors needed per k-means centroid before a partition is trained
+TRAINING_FACTOR = 16
+# Most vectors per k-means centroid sampled for training
+TRAINING_SAMPLE_FACTOR = 64
+SNAPSHOT_INDEX = "partitions.json"
+
+# Serializes updates of the partition list of the snapshot directories
+_snapshot_index_lock = threading.Lock()
+
+def kmeans(data, count, iterations=KMEANS_ITERATIONS, seed=0):
+  """! Lloyd's k-means on the rows of data.
+  @param   data        Training vectors, one per row.
+  @param   count       Number of centroids.
+  @param   iterations  Number of refinement iterations.
+  @param   seed        Seed of the initial centroid selection.
+  @return  Centroids as a (count, dimensions) float32 array.
+  """
+  rng = np.random.default_rng(seed)
+  centroids = data[rng.choice(len(data), count, replace=False)].astype(np.float32)
+  for _ in range(iterations):
+    assignment = nearestCentroids(data, centroids)
+    counts = np.bincount(assignment, minlength=count)
+    sums = np.zeros_like(centroids)
+    np.add.at(sums, assignment, data)
+    filled = counts > 0
+    centroids[filled] = sums[filled] / counts[filled, None]
+  return centroids
+
+def nearestCentroids(data, centroids, count=1):
+  """! Index of the nearest centroids of each row of data, by squared L2. """
+  distances = (centroids * centroids).sum(axis=1)[None, :] - 2 * (data @ centroids.T)
+  if count == 1:
+    return np.argmin(distances, axis=1)
+  count = min(count, len(centroids))
+  return np.argpartition(distances, count - 1, axis=1)[:, :count]
+
+class _ProductQuantizer:
+  """! Splits vectors into subvectors, each encoded as the index of the nearest
+  of PQ_CENTROIDS centroids trained for that subspace.
+  """
+
+  def __init__(self, codebooks):
+    self.codebooks = codebooks
+    return
+
+  @classmethod
+  def train(cls, data, subquantizers):
+    if data.shape[1] % subquantizers:
+      raise ValueError("Vector dimensions must be a multiple of the PQ subquantizers")
+    split = np.split(data, subquantizers, axis=1)
+    return cls(np.stack([kmeans(part, PQ_CENTROIDS, seed=idx) for idx, part in enumerate(split)]))
+
+  def decode(self, codes):
+    return np.concatenate([codebook[codes[:, idx]]
+                           for idx, codebook in enumerate(self.codebooks)], axis=1)
+
+  def encode(self, data):
+    split = np.split(data, len(self.codebooks), axis=1)
+    return np.stack([nearestCentroids(part, codebook)
+                     for part, codebook in zip(split, self.codebooks)], axis=1).astype(np.uint8)
+
+  def distanceTables(self, queries):
+    """! Squared distance of each query subvector to each centroid of its
+    subspace, shaped (queries, subquantizers, PQ_CENTROIDS)."""
+    split = queries.reshape(len(queries), len(self.codebooks), 1, -1)
+    return ((split - self.codebooks[None]) ** 2).sum(axis=-1)
+
+class _Partition:
+  """! Vectors of one object type in one descriptor set.
+
+  Entries are kept in insertion order in growable arrays, so evicting by age
+  or count drops a prefix. Arrays loaded from a snapshot stay memory mapped
+  until the partition is modified.
+  """
+
+  def __init__(self, dimensions, index, ivf_lists, pq_subquantizers):
+    self.dimensions = dimensions
+    self.index = index
+    self.ivf_lists = ivf_lists
+    self.pq_subquantizers = pq_subquantizers
+    self.count = 0
+    self.vectors = np.empty((0, dimensions), dtype=np.float32)
+    self.codes = None
+    self.norms = np.empty(0, dtype=np.float32)
+    self.added = np.empty(0)
+    self.lists = np.empty(0, dtype=np.int32)
+    self.uuids = []
+    self.rvids = []
+    self.centroids = None
+    self.quantizer = None
+    self.trained_count = 0
+    self._inverted = None
+    self.lock = threading.Lock()
+    self.dirty = False
+    return
+
+  @property
+  def trained(self):
+    return self.centroids is not None
+
+  def _reserve(self, count):
+    needed = self.count + count
+    stored = self.codes if self.codes is not None else self.vectors
+    arrays = (stored, self.norms, self.added, self.lists)
+    if all(needed <= len(array) and array.flags.writeable for array in arrays):
+      return
+    capacity = max(needed, 2 * self.count, 64)
+    def grow(array):
+      grown = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+      grown[:self.count] = array[:self.count]
+      return grown
+    if self.codes is not None:
+      self.codes = grow(self.codes)
+    else:
+      self.vectors = grow(self.vectors)
+    self.norms = grow(self.norms)
+    self.added = grow(self.added)
+    self.lists = grow(self.lists)
+    return
+
+  def add(self, uuid, rvid, vectors, now):
+    self._reserve(len(vectors))
+    end = self.count + len(vectors)
+    if self.trained:
+      self.lists[self.count:end] = nearestCentroids(vectors, self.centroids)
+    else:
+      self.lists[self.count:end] = -1
+    if self.quantizer is not None:
+      self.codes[self.count:end] = self.quantizer.encode(vectors)
+    else:
+      self.vectors[self.count:end] = vectors
+    self.norms[self.count:end] = np.einsum('ij,ij->i', vectors, vectors)
+    self.added[self.count:end] = now
+    self.uuids.extend([uuid] * len(vectors))
+    self.rvids.extend([rvid] * len(vectors))
+    self.count = end
+    self._inverted = None
+    self.dirty = True
+
+    if self.trained:
+      # Cells trained on the first entries only fit those, retrain as the partition grows
+      if self.count >= 2 * self.trained_count:
+        self._train()
+    elif self.index != INDEX_FLAT:
+      centroids = max(self.ivf_lists, PQ_CENTROIDS) if self.index == INDEX_IVFPQ else self.ivf_lists
+      if self.count >= TRAINING_FACTOR * centroids:
+        self._train()
+    return
+
+  def _train(self):
+    if self.codes is not None:
+      data = self.quantizer.decode(self.codes[:self.count])
+    else:
+      data = self.vectors[:self.count].copy()
+    rng = np.random.default_rng(self.count)
+    samples = min(self.count, TRAINING_SAMPLE_FACTOR * max(self.ivf_lists, PQ_CENTROIDS))
+    sample = data[np.sort(rng.choice(self.count, samples, replace=False))]
+    self.centroids = kmeans(sample, self.ivf_lists)
+    self.lists = nearestCentroids(data, self.centroids).astype(np.int32)
+    if self.index == INDEX_IVFPQ and self.quantizer is None:
+      self.quantizer = _ProductQuantizer.train(sample, self.pq_subquantizers)
+      self.codes = self.quantizer.encode(data)
+      self.vectors = np.empty((0, self.dimensions), dtype=np.float32)
+    elif self.codes is not None:
+      self.codes = self.codes[:self.count].copy()
+    else:
+      self.vectors = data
+    self.norms = self.norms[:self.count].copy()
+    self.added = self.added[:self.count].copy()
+    self.trained_count = self.count
+    self._inverted = None
+    return
+
+  def evict(self, max_entries, cutoff):
+    keep = np.ones(self.count, dtype=bool)
+    if cutoff is not None:
+      keep &= self.added[:self.count] >= cutoff
+    if max_entries and keep.sum() > max_entries:
+      keep[np.flatnonzero(keep)[:-max_entries]] = False
+    if keep.all():
+      return 0
+    evicted = self.count - int(keep.sum())
+    if self.codes is not None:
+      self.codes = self.codes[:self.count][keep]
+    else:
+      self.vectors = self.vectors[:self.count][keep]
+    self.norms = self.norms[:self.count][keep]
+    self.added = self.added[:self.count][keep]
+    self.lists = self.lists[:self.count][keep]
+    self.uuids = [uuid for uuid, kept in zip(self.uuids, keep) if kept]
+    self.rvids = [rvid for rvid, kept in zip(self.rvids, keep) if kept]
+    self.count -= evicted
+    self._inverted = None
+    self.dirty = True
+    return evicted
+
+  def _candidates(self, queries, probes):
+    """! Entries in the cells searched for a batch of queries.
+
+    The vectors of a track lie close together, so the whole batch searches
+    the cells nearest to its mean.
+    """
+    if self._inverted is None:
+      order = np.argsort(self.lists[:self.count], kind='stable')
+      bounds = np.searchsorted(self.lists[:self.count][order], np.arange(len(self.centroids) + 1))
+      self._inverted = (order, bounds)
+    order, bounds = self._inverted
+    mean = queries.mean(axis=0, keepdims=True)
+    cells = np.sort(nearestCentroids(mean, self.centroids, probes)[0])
+    return np.concatenate([order[bounds[cell]:bounds[cell + 1]] for cell in cells])
+
+  def search(self, queries, k_neighbors, probes):
+    """! Batched k nearest neighbors by squared L2 distance.
+    @return  Per query, a list of (distance, entry) sorted by distance.
+    """
+    if self.count == 0:
+      return [[] for _ in queries]
+    if self.trained:
+      candidates = self._candidates(queries, probes)
+      if not len(candidates):
+        return [[] for _ in queries]
+    else:
+      candidates = None
+
+    if self.quantizer is not None:
+      tables = self.quantizer.distanceTables(queries)
+      codes = self.codes[candidates] if candidates is not None else self.codes[:self.count]
+      distances = np.zeros((len(queries), len(codes)), dtype=tables.dtype)
+      for subspace in range(codes.shape[1]):
+        distances += tables[:, subspace, codes[:, subspace]]
+    else:
+      if candidates is None:
+        vectors, norms = self.vectors[:self.count], self.norms[:self.count]
+      else:
+        vectors, norms = self.vectors[candidates], self.norms[candidates]
+      distances = queries @ vectors.T
+      distances *= -2
+      distances += norms[None, :]
+      distances += np.einsum('ij,ij->i', queries, queries)[:, None]
+      np.maximum(distances, 0, out=distances)
+    if candidates is None:
+      candidates = np.arange(self.count)
+
+    k_neighbors = min(k_neighbors, len(candidates))
+    nearest = np.argpartition(distances, k_neighbors - 1, axis=1)[:, :k_neighbors]
+    results = []
+    for row, columns in zip(distances, nearest):
+      columns = columns[np.argsort(row[columns])]
+      results.append([(float(row[column]), candidates[column]) for column in columns])
+    return results
+
+  def save(self, path):
+    arrays = {'norms': self.norms[:self.count], 'added': self.added[:self.count],
+              'lists': self.lists[:self.count]}
+    if self.codes is not None:
+      arrays['codes'] = self.codes[:self.count]
+    else:
+      arrays['vectors'] = self.vectors[:self.count]
+    if self.trained:
+      arrays['centroids'] = self.centroids
+    if self.quantizer is not None:
+      arrays['codebooks'] = self.quantizer.codebooks
+
+    staging = tempfile.mkdtemp(prefix=f"{os.path.basename(path)}.", suffix=".tmp",
+                               dir=os.path.dirname(path))
+    for name, array in arrays.items():
+      np.save(os.path.join(staging, f"{name}.npy"), array)
+    with open(os.path.join(staging, "entries.json"), "wb") as entries:
+      entries.write(orjson.dumps({'uuids': self.uuids, 'rvids': self.rvids}))
+    if os.path.exists(path):
+      shutil.rmtree(path)
+    os.replace(staging, path)
+    self.dirty = False
+    return
+
+  def load(self, path):
+    def array(name):
+      filename = os.path.join(path, f"{name}.npy")
+      return np.load(filename, mmap_mode='r') if os.path.exists(filename) else None
+    with open(os.path.join(path, "entries.json"), "rb") as entries:
+      data = orjson.loads(entries.read())
+    self.uuids, self.rvids = data['uuids'], data['rvids']
+    self.count = len(self.uuids)
+    self.norms = array('norms')
+    self.added = array('added')
+    self.lists = array('lists')
+    self.codes = array('codes')
+    if self.codes is None:
+      self.vectors = array('vectors')
+    self.centroids = array('centroids')
+    codebooks = array('codebooks')
+    if codebooks is not None:
+      self.quantizer = _ProductQuantizer(np.asarray(codebooks))
+    self.trained_count = self.count if self.trained else 0
+    return
+
+class LocalReIDDatabase(ReIDDatabase):
+  """! In-process Re-ID vector index, a drop-in alternative to VDMSDatabase.
+
+  Vectors are partitioned by descriptor set and object type. Distances are
+  squared L2 like those returned by VDMS, so the same similarity threshold
+  applies. Entries can be bounded by count and age, and partitions can be
+  snapshotted to a directory from which they are memory mapped on connect.
+  """
+
+  def __init__(self, set_name=SCHEMA_NAME, similarity_metric=SIMILARITY_METRIC,
+               dimensions=DIMENSIONS, index=DEFAULT_INDEX, max_entries=DEFAULT_MAX_ENTRIES,
+               ttl=DEFAULT_TTL, ivf_lists=DEFAULT_IVF_LISTS, ivf_probes=DEFAULT_IVF_PROBES,
+               pq_subquantizers=DEFAULT_PQ_SUBQUANTIZERS, snapshot_path=None,
+               snapshot_interval=DEFAULT_SNAPSHOT_INTERVAL):
+    if index not in INDEX_TYPES:
+      raise ValueError(f"Unknown Re-ID index type: {index}")
+    self.set_name = set_name
+    self.similarity_metric = similarity_metric
+    self.dimensions = dimensions
+    self.index = index
+    self.max_entries = max_entries
+    self.ttl = ttl
+    self.ivf_lists = ivf_lists
+    self.ivf_probes = ivf_probes
+    self.pq_subquantizers = pq_subquantizers
+    self.snapshot_path = snapshot_path
+    self.snapshot_interval = snapshot_interval
+    self.schemas = {}
+    self.partitions = {}
+    self.lock = threading.Lock()
+    self.snapshot_lock = threading.Lock()
+    self.last_snapshot = get_epoch_time()
+    self.connected = False
+    return
+
+  def connect(self, hostname=None):
+    # The trackers of all scenes share the index, only the first one loads it
+    with self.snapshot_lock:
+      if self.connected:
+        return
+      if self.snapshot_path:
+        self.loadSnapshot(self.snapshot_path)
+      self.connected = True
+    if not self.findSchema(self.set_name):
+      self.addSchema(self.set_name, self.similarity_metric, self.dimensions)
+    log.info(f"Local Re-ID index ready ({self.index})")
+    return
+
+  def addSchema(self, set_name, similarity_metric, dimensions):
+    if similarity_metric != SIMILARITY_METRIC:
+      log.warn(f"Unsupported similarity metric {similarity_metric}, using {SIMILARITY_METRIC}")
+    with self.lock:
+      self.schemas[set_name] = dimensions
+    return
+
+  def findSchema(self, set_name):
+    return set_name in self.schemas
+
+  def _partition(self, set_name, object_type, create=False):
+    key = (set_name, object_type)
+    with self.lock:
+      partition = self.partitions.get(key)
+      if partition is None and create:
+        dimensions = self.schemas.get(set_name, self.dimensions)
+        partition = _Partition(dimensions, self.index, self.ivf_lists, self.pq_subquantizers)
+        self.partitions[key] = partition
+    return partition
+
+  def addEntry(self, uuid, rvid, object_type, reid_vectors, set_name=SCHEMA_NAME):
+    vectors = np.asarray(reid_vectors, dtype=np.float32).reshape(len(reid_vectors), -1)
+    partition = self._partition(set_name, object_type, create=True)
+    now = get_epoch_time()
+    with partition.lock:
+      partition.add(f"{uuid}", f"{rvid}", vectors, now)
+      partition.evict(self.max_entries, now - self.ttl if self.ttl else None)
+    if self.snapshot_path and now - self.last_snapshot >= self.snapshot_interval:
+      self.saveSnapshot(self.snapshot_path)
+    return
+
+  def findSimilarityScores(self, object_type, reid_vectors, set_name=SCHEMA_NAME,
+                           k_neighbors=K_NEIGHBORS):
+    """! Find the nearest entries of all vectors of a track in one batch.
+    @return  Per query vector, the entities in the format returned by VDMS.
+    """
+    partition = self._partition(set_name, object_type)
+    if partition is None:
+      return []
+    queries = np.asarray(reid_vectors, dtype=np.float32).reshape(len(reid_vectors), -1)
+    with partition.lock:
+      if self.ttl:
+        partition.evict(None, get_epoch_time() - self.ttl)
+      neighbors = partition.search(queries, k_neighbors, self.ivf_probes)
+      return [[{'uuid': partition.uuids[entry], 'rvid': partition.rvids[entry],
+                '_distance': distance} for distance, entry in entities]
+              for entities in neighbors if entities]
+
+  def close(self):
+    if self.snapshot_path:
+      self.saveSnapshot(self.snapshot_path)
+    return
+
+  def _partitionPath(self, path, set_name, object_type):
+    name = re.sub(r'[^A-Za-z0-9_.-]', '_', f"{set_name}-{object_type}")
+    return os.path.join(path, name)
+
+  def saveSnapshot(self, path):
+    """! Write the modified partitions to path, one directory per partition. """
+    with self.snapshot_lock:
+      os.makedirs(path, exist_ok=True)
+      with self.lock:
+        self.last_snapshot = get_epoch_time()
+        partitions = list(self.partitions.items())
+        schemas = dict(self.schemas)
+      for (set_name, object_type), partition in partitions:
+        with partition.lock:
+          if partition.dirty:
+            partition.save(self._partitionPath(path, set_name, object_type))
+      self._updateSnapshotIndex(path, schemas, [key for key, _ in partitions])
+    return
+
+  def _updateSnapshotIndex(self, path, schemas, keys):
+    """! Add the partitions to the list in path, keeping those saved there by
+    other databases sharing the directory. """
+    index_file = os.path.join(path, SNAPSHOT_INDEX)
+    with _snapshot_index_lock:
+      data = {'schemas': {}, 'partitions': []}
+      if os.path.exists(index_file):
+        with open(index_file, "rb") as index:
+          data = orjson.loads(index.read())
+      data['schemas'].update(schemas)
+      known = {tuple(key) for key in data['partitions']}
+      data['partitions'].extend([list(key) for key in keys if key not in known])
+      handle, staging = tempfile.mkstemp(prefix=f"{SNAPSHOT_INDEX}.", suffix=".tmp", dir=path)
+      with os.fdopen(handle, "wb") as index:
+        index.write(orjson.dumps(data))
+      os.replace(staging, index_file)
+    return
+
+  def loadSnapshot(self, path):
+    """! Memory map the partitions saved in path. """
+    index_file = os.path.join(path, SNAPSHOT_INDEX)
+    if not os.path.exists(index_file):
+      return
+    with open(index_file, "rb") as index:
+      data = orjson.loads(index.read())
+    self.schemas.update(data['schemas'])
+    for set_name, object_type in data['partitions']:
+      partition_path = self._partitionPath(path, set_name, object_type)
+      if not os.path.isdir(partition_path):
+        continue
+      partition = self._partition(set_name, object_type, create=True)
+      with partition.lock:
+        partition.load(partition_path)
+      log.info(f"Loaded {partition.count} Re-ID vectors for {object_type}")
+    return
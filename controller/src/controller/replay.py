@@ -0,0 +1,313 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+"""! Replay of recorded camera messages through the whole SceneController,
+in process and without an MQTT broker.
+
+Recorded detector messages, one JSON document per line such as the xREF_*
+references of the performance tests, are delivered to the callbacks the
+controller subscribed, as the broker would. What the controller publishes
+is captured and counted by CapturePubSub. Messages are replayed as fast as
+possible, or paced by their recorded timestamps, and the time spent in each
+stage of SceneController.handleMovingObjectMessage is measured.
+"""
+
+import io
+import math
+import time
+import zipfile
+from collections import defaultdict
+
+import numpy as np
+import orjson
+
+from controller import scene_controller
+from controller.scene_controller import SceneController
+from scene_common import log
+from scene_common.camera_codec import encodeCameraData
+from scene_common.mqtt import PubSub
+from scene_common.scenescape import SceneLoader
+from scene_common.timestamp import get_epoch_time, get_iso_time
+
+STAGES = ('validate', 'track', 'publish', 'total')
+PERCENTILES = (50, 90, 99)
+# Defaults of the scene model in the manager
+DEFAULT_REGULATED_RATE = 30
+DEFAULT_EXTERNAL_UPDATE_RATE = 30
+
+class ReplayMessage:
+  """! Stands in for an MQTT message in the subscribed callbacks. """
+  __slots__ = ('topic', 'payload')
+
+  def __init__(self, topic, payload):
+    self.topic = topic
+    self.payload = payload
+    return
+
+class CapturePubSub(PubSub):
+  """! PubSub without a broker. Replayed messages are delivered to the
+  callback subscribed for their topic, and published messages are counted
+  per kind of topic instead of being sent.
+  """
+
+  def __init__(self):
+    self.callbacks = {}
+    self.published = defaultdict(lambda: {'count': 0, 'bytes': 0})
+    self._on_connect = None
+    return
+
+  @property
+  def onConnect(self):
+    return self._on_connect
+
+  @onConnect.setter
+  def onConnect(self, value):
+    self._on_connect = value
+    return
+
+  def connect(self):
+    return
+
+  def addCallback(self, topic, callback, qos=0):
+    self.callbacks[topic] = callback
+    return
+
+  def removeCallback(self, topic):
+    self.callbacks.pop(topic, None)
+    return
+
+  def publish(self, topic, payload, qos=0, retain=False):
+    parsed = PubSub.parseTopic(topic)
+    published = self.published[parsed['_topic_id'].name if parsed else topic]
+    published['count'] += 1
+    published['bytes'] += len(payload)
+    return
+
+  def deliver(self, topic, payload):
+    """! Pass a message to the callback subscribed for its topic.
+
+    @return  False if nothing is subscribed to the topic.
+    """
+    callback = self.callbacks.get(topic, None)
+    if callback is None:
+      return False
+    callback(None, None, ReplayMessage(topic, payload))
+    return True
+
+  def loopForever(self):
+    return
+
+  def loopStart(self):
+    return
+
+  def loopStop(self):
+    return
+
+  def isConnected(self):
+    return True
+
+def _readLines(path):
+  if str(path).endswith(".zip"):
+    with zipfile.ZipFile(path) as archive:
+      for name in archive.namelist():
+        with archive.open(name) as member:
+          yield from io.TextIOWrapper(member, encoding="utf-8")
+    return
+  with open(path) as recording:
+    yield from recording
+  return
+
+def loadRecording(paths):
+  """! Read recorded detector messages, from JSONL files or zip archives of
+  them, and merge them in timestamp order.
+
+  Messages with a list of objects, as recorded by older detectors, have
+  their objects grouped by category.
+
+  @return  List of (epoch time, message) tuples.
+  """
+  messages = []
+  for path in paths:
+    for line in _readLines(path):
+      if not line.strip():
+        continue
+      jdata = orjson.loads(line)
+      if isinstance(jdata.get('objects'), list):
+        objects = defaultdict(list)
+        for obj in jdata['objects']:
+          objects[obj['category']].append(obj)
+        jdata['objects'] = dict(objects)
+      messages.append((get_epoch_time(jdata['timestamp']), jdata))
+  messages.sort(key=lambda message: message[0])
+  return messages
+
+def sceneFromConfig(path):
+  """! Scene data as served by the REST API from the config file of the
+  tracker tools, such as the one the xREF references are recorded for.
+  Map points given in pixels are converted to meters.
+  """
+  loader = SceneLoader(path)
+  config = SceneLoader.config
+  cameras = []
+  for name, info in config.get('sensors', {}).items():
+    camera = {key: value for key, value in info.items() if key not in ('model', 'pk', 'fields')}
+    camera.update(uid=name, name=name, resolution=[info['width'], info['height']])
+    cameras.append(camera)
+  regions = [{'uid': region['uuid'], 'name': region['name'], 'points': region['points']}
+             for region in config.get('regions', [])]
+  tripwires = [{'uid': tripwire['uuid'], 'name': tripwire['name'], 'points': tripwire['points']}
+               for tripwire in config.get('tripwires', [])]
+  return {
+    'uid': config['name'],
+    'name': config['name'],
+    'map': loader.scene.map_file,
+    'scale': loader.scene.scale,
+    'regulated_rate': DEFAULT_REGULATED_RATE,
+    'external_update_rate': DEFAULT_EXTERNAL_UPDATE_RATE,
+    'cameras': cameras,
+    'regions': regions,
+    'tripwires': tripwires,
+  }
+
+def percentiles(samples):
+  """! Percentiles and maximum of latencies, in milliseconds. """
+  if not samples:
+    return {}
+  samples = np.asarray(samples) * 1000
+  result = {f"p{pct}": float(np.percentile(samples, pct)) for pct in PERCENTILES}
+  result['max'] = float(samples.max())
+  return result
+
+class ControllerReplay:
+  """! A SceneController connected to a CapturePubSub, with the time spent
+  in each stage of handling a camera message recorded.
+
+  Stages are 'validate' (schema validation), 'track' (Scene.processCameraData,
+  including the tracker threads when wait_for_tracker is set), 'publish'
+  (publishing detections and events) and 'total' (the whole callback).
+  """
+
+  def __init__(self, scene_files, tracker_config_file, schema_file,
+               visibility_topic="regulated", wait_for_tracker=True):
+    self.pubsub = CapturePubSub()
+    self.wait_for_tracker = wait_for_tracker
+    self.timings = {stage: [] for stage in STAGES}
+    self._current = None
+
+    # SceneController creates its own PubSub
+    original = scene_controller.PubSub
+    scene_controller.PubSub = lambda *args, **kwargs: self.pubsub
+    try:
+      self.controller = SceneController(False, False, math.inf, None, None, None, None,
+                                        None, None, None, tracker_config_file, schema_file,
+                                        visibility_topic, scene_files)
+    finally:
+      scene_controller.PubSub = original
+    self.controller.onConnect(None, None, {}, 0)
+
+    controller = self.controller
+    controller.schema_val.validateMessage = self._timed('validate', controller.schema_val.validateMessage)
+    controller.publishDetections = self._timed('publish', controller.publishDetections)
+    controller.publishEvents = self._timed('publish', controller.publishEvents)
+    for scene in controller.cache_manager.allScenes():
+      scene.processCameraData = self._timed('track', self._tracked(scene))
+    return
+
+  def _timed(self, stage, function):
+    def timed(*args, **kwargs):
+      begin = time.perf_counter()
+      try:
+        return function(*args, **kwargs)
+      finally:
+        if self._current is not None:
+          self._current[stage] += time.perf_counter() - begin
+    return timed
+
+  def _tracked(self, scene):
+    process = scene.processCameraData
+    def tracked(*args, **kwargs):
+      result = process(*args, **kwargs)
+      if self.wait_for_tracker:
+        for tracker in list(scene.tracker.trackers.values()):
+          tracker.waitForComplete()
+      return result
+    return tracked
+
+  def run(self, messages, realtime=False, speed=1.0, binary=False):
+    """! Replay messages from loadRecording().
+
+    Timestamps are moved to the time of the replay, keeping the recorded
+    spacing. With realtime set each message is delivered at its recorded
+    time divided by speed, otherwise as soon as the previous one is done.
+    Messages are delivered as JSON on the camera data topic, or with binary
+    set in the format of scene_common.camera_codec on the binary one.
+
+    @return  Report of the replay, see formatReport().
+    """
+    if not messages:
+      raise ValueError("Nothing to replay")
+    first = messages[0][0]
+    base = get_epoch_time()
+    topic_id, encode = PubSub.DATA_CAMERA, orjson.dumps
+    if binary:
+      topic_id, encode = PubSub.DATA_CAMERA_BIN, encodeCameraData
+    payloads = []
+    for when, jdata in messages:
+      offset = when - first
+      jdata = dict(jdata, timestamp=get_iso_time(base + offset / speed))
+      topic = PubSub.formatTopic(topic_id, camera_id=jdata['id'])
+      payloads.append((offset / speed, topic, encode(jdata)))
+
+    delivered = skipped = 0
+    begin = time.monotonic()
+    for offset, topic, payload in payloads:
+      if realtime:
+        delay = begin + offset - time.monotonic()
+        if delay > 0:
+          time.sleep(delay)
+      self._current = dict.fromkeys(STAGES, 0.0)
+      started = time.perf_counter()
+      handled = self.pubsub.deliver(topic, payload)
+      self._current['total'] = time.perf_counter() - started
+      if not handled or not self._current['track']:
+        skipped += 1
+      else:
+        delivered += 1
+        for stage, duration in self._current.items():
+          self.timings[stage].append(duration)
+      self._current = None
+    elapsed = time.monotonic() - begin
+
+    published = {kind: dict(counts) for kind, counts in self.pubsub.published.items()}
+    return {
+      'messages': delivered,
+      'skipped': skipped,
+      'elapsed': elapsed,
+      'rate': delivered / elapsed if elapsed > 0 else 0.0,
+      'published': published,
+      'published_bytes': sum(counts['bytes'] for counts in published.values()),
+      'latency_ms': {stage: percentiles(samples) for stage, samples in self.timings.items()},
+    }
+
+  def close(self):
+    for scene in self.controller.cache_manager.allScenes():
+      scene.tracker.join()
+    return
+
+def formatReport(report):
+  """! Human readable lines of a report from ControllerReplay.run(). """
+  lines = ["Messages: %d skipped: %d elapsed: %.2f s msgs/sec: %.1f published: %d bytes"
+           % (report['messages'], report['skipped'], report['elapsed'], report['rate'],
+              report['published_bytes'])]
+  for stage, latency in report['latency_ms'].items():
+    if latency:
+      lines.append("  %-8s " % stage
+                   + " ".join("%s: %.2f ms" % (name, value) for name, value in latency.items()))
+  for kind, counts in sorted(report['published'].items()):
+    lines.append("  %-16s %6d messages %10d bytes" % (kind, counts['count'], counts['bytes']))
+  return lines
+
+def logReport(report):
+  for line in formatReport(report):
+    log.log(line)
+  return
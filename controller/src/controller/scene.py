@@ -8,15 +8,18 @@ import numpy as np
 
 import robot_vision as rv
 from scene_common import log
+from scene_common.batch_geometry import (RegionMembership, TripwireCrossings,
+                                         VolumetricIntersections, objectBoxes)
 from scene_common.camera import Camera
 from scene_common.earth_lla import convertLLAToECEF, calculateTRSLocal2LLAFromSurfacePoints
-from scene_common.geometry import Line, Point, Region, Tripwire
+from scene_common.geometry import Region, Tripwire
 from scene_common.scene_model import SceneModel
 from scene_common.timestamp import get_epoch_time, get_iso_time
 from scene_common.transform import CameraPose
-from scene_common.mesh_util import getMeshAxisAlignedProjectionToXY, createRegionMesh, createObjectMesh
+from scene_common.mesh_util import getMeshAxisAlignedProjectionToXY
 
 from controller.ilabs_tracking import IntelLabsTracking
+from controller.moving_object import mapDetectionsToWorld
 from controller.time_chunking import TimeChunkedIntelLabsTracking, DEFAULT_CHUNKING_INTERVAL_MS
 from controller.tracking import (MAX_UNRELIABLE_TIME,
                                  NON_MEASUREMENT_TIME_DYNAMIC,
@@ -57,6 +60,14 @@ class Scene(SceneModel):
     self._setTracker("time_chunked_intel_labs" if time_chunking_enabled else self.DEFAULT_TRACKER)
     self._trs_xyz_to_lla = None
     self.use_tracker = True
+    self.region_membership = RegionMembership()
+    self.sensor_membership = RegionMembership()
+    self.region_volumes = VolumetricIntersections()
+    self.sensor_volumes = VolumetricIntersections()
+    self.tripwire_crossings = TripwireCrossings()
+    self.camera_views = RegionMembership()
+    # Scene data each part of the scene was last built from, keyed by part
+    self.applied_data = {}
 
     # FIXME - only for backwards compatibility
     self.scale = scale
@@ -79,13 +90,23 @@ class Scene(SceneModel):
     return
 
   def updateScene(self, scene_data):
+    """! Updates the scene from changed scene data. Cameras, regions,
+    tripwires, sensors and the map are only rebuilt if their own data changed.
+    """
     self.parent = scene_data.get('parent', None)
-    self.cameraPose = None
-    if 'transform' in scene_data:
-      self.cameraPose = CameraPose(scene_data['transform'], None)
+    if self._dataChanged('transform', scene_data.get('transform', None)):
+      self.cameraPose = None
+      if 'transform' in scene_data:
+        self.cameraPose = CameraPose(scene_data['transform'], None)
+    map_changed = self._dataChanged('map', self._mapData(scene_data))
+    if map_changed:
+      self.loadMap(scene_data.get('map', None), scene_data.get('scale', None))
+      self.mesh_translation = scene_data.get('mesh_translation', None)
+      self.mesh_rotation = scene_data.get('mesh_rotation', None)
     self.use_tracker = scene_data.get('use_tracker', True)
     self.output_lla = scene_data.get('output_lla', False)
     self.map_corners_lla = scene_data.get('map_corners_lla', None)
+    lla_changed = self._dataChanged('lla', (self.output_lla, self.map_corners_lla))
     self._updateChildren(scene_data.get('children', []))
     self.updateCameras(scene_data.get('cameras', []))
     self._updateRegions(self.regions, scene_data.get('regions', []))
@@ -101,11 +122,29 @@ class Scene(SceneModel):
       self.regulated_rate = scene_data['regulated_rate']
     if 'external_update_rate' in scene_data:
       self.external_update_rate = scene_data['external_update_rate']
-    self._invalidate_trs_xyz_to_lla()
+    if map_changed or lla_changed:
+      self._invalidate_trs_xyz_to_lla()
     # Access the property to trigger initialization
     _ = self.trs_xyz_to_lla
     return
 
+  def _dataChanged(self, key, data):
+    """! Records the data a part of the scene is built from.
+
+    @param   key    Part of the scene, e.g. ('region', uid)
+    @param   data   Scene data of that part
+    @return  True if it differs from the data previously recorded for key.
+    """
+    if key in self.applied_data and self.applied_data[key] == data:
+      return False
+    self.applied_data[key] = data
+    return True
+
+  @staticmethod
+  def _mapData(data):
+    return (data.get('map', None), data.get('scale', None),
+            data.get('mesh_translation', None), data.get('mesh_rotation', None))
+
   def updateTracker(self, max_unreliable_time, non_measurement_time_dynamic,
                     non_measurement_time_static):
     # Only update tracker if the values have changed to avoid losing tracking data
@@ -120,16 +159,14 @@ class Scene(SceneModel):
 
   def _createMovingObjectsForDetection(self, detectionType, detections, when, camera):
     objects = []
-    scene_map_triangle_mesh = self.map_triangle_mesh
-    scene_map_translation = self.mesh_translation
-    scene_map_rotation = self.mesh_rotation
 
     for info in detections:
       mobj = self.tracker.createObject(detectionType, info, when, camera, self.persist_attributes.get(detectionType, {}))
-      mobj.map_triangle_mesh = scene_map_triangle_mesh
-      mobj.map_translation = scene_map_translation
-      mobj.map_rotation = scene_map_rotation
+      if mobj.project_to_map:
+        # Built on first use, then shared by all objects of the scene
+        mobj.map_raycaster = self.map_raycaster
       objects.append(mobj)
+    mapDetectionsToWorld(objects, camera)
     return objects
 
   def processCameraData(self, jdata, when=None, ignoreTimeFlag=False):
@@ -157,7 +194,7 @@ class Scene(SceneModel):
       if "intrinsics" not in jdata:
         self._convertPixelBoundingBoxesToMeters(detections, camera.pose.intrinsics.intrinsics, camera.pose.intrinsics.distortion)
       objects = self._createMovingObjectsForDetection(detection_type, detections, when, camera)
-      self._finishProcessing(detection_type, when, objects)
+      self._finishProcessing(detection_type, when, objects, source=camera_id)
     return True
 
   def _convertPixelBoundingBoxesToMeters(self, objects: list[dict], intrinsics_matrix: np.ndarray, distortion_matrix: np.ndarray) -> None:
@@ -222,15 +259,15 @@ class Scene(SceneModel):
           log.warn("Input data must have only one of 'lat_long_alt' and 'translation'")
           return True
         info['translation'] = convertLLAToECEF(info.pop('lat_long_alt'))
-      translation = Point(info['translation'])
-      translation = np.hstack([translation.asNumpyCartesian, [1]])
-      translation = np.matmul(cameraPose.pose_mat, translation)
-      info['translation'] = translation[:3]
 
       # Remove reid vector from the object info as tracker does not support reid from scene hierarchy
       if 'reid' in info:
         info.pop('reid')
 
+    # All objects of the message are moved into this scene at once
+    cameraPose.childTransform.transformObjects(new)
+
+    for info in new:
       mobj = self.tracker.createObject(detectionType, info, when, child, self.persist_attributes.get(detectionType, {}))
       log.debug("RX SCENE OBJECT",
               "id=%s" % (mobj.oid), mobj.sceneLoc)
@@ -239,17 +276,18 @@ class Scene(SceneModel):
       else:
         child_objects.append(mobj)
 
-    self._finishProcessing(detectionType, when, objects, child_objects)
+    self._finishProcessing(detectionType, when, objects, child_objects, source=child.uid)
     return True
 
-  def _finishProcessing(self, detectionType, when, objects, already_tracked_objects=[]):
+  def _finishProcessing(self, detectionType, when, objects, already_tracked_objects=[],
+                        source=None):
     self._updateVisible(objects)
     self.tracker.trackObjects(objects, already_tracked_objects, when, [detectionType],
                               self.ref_camera_frame_rate,
                               self.max_unreliable_time,
                               self.non_measurement_time_dynamic,
                               self.non_measurement_time_static,
-                              self.use_tracker)
+                              self.use_tracker, source=source)
     self._updateEvents(detectionType, when)
     return
 
@@ -260,10 +298,10 @@ class Scene(SceneModel):
     if objects is None:
       objects = itertools.chain.from_iterable(sensor.objects.values())
 
+    ts_str = get_iso_time(sensor.lastWhen)
     for obj in objects:
       if name not in obj.chain_data.sensors:
         obj.chain_data.sensors[name] = []
-      ts_str = get_iso_time(sensor.lastWhen)
       existing = [x[0] for x in obj.chain_data.sensors[name]]
       if ts_str not in existing:
         obj.chain_data.sensors[name].append((ts_str, sensor.value))
@@ -308,19 +346,19 @@ class Scene(SceneModel):
     return
 
   def _updateTripwireEvents(self, detectionType, now, curObjects):
-    for key in self.tripwires:
+    moving = [obj for obj in curObjects
+              if obj.frameCount > 3 and len(obj.chain_data.publishedLocations) > 1]
+    lines = np.array([((loc[0].x, loc[0].y), (loc[1].x, loc[1].y))
+                      for loc in (obj.chain_data.publishedLocations for obj in moving)],
+                     dtype=np.float64).reshape(-1, 2, 2)
+    self.tripwire_crossings.update(self.tripwires)
+    directions = self.tripwire_crossings.directions(lines)
+
+    for column, key in enumerate(self.tripwire_crossings.keys):
       tripwire = self.tripwires[key]
       tripwireObjects = tripwire.objects.get(detectionType, [])
-      objects = []
-      for obj in curObjects:
-        age = now - obj.when
-        if obj.frameCount > 3 \
-           and len(obj.chain_data.publishedLocations) > 1:
-          d = tripwire.lineCrosses(Line(obj.chain_data.publishedLocations[0].as2Dxy,
-                                        obj.chain_data.publishedLocations[1].as2Dxy))
-          if d != 0:
-            event = TripwireEvent(obj, -d)
-            objects.append(event)
+      objects = [TripwireEvent(obj, -d)
+                 for obj, d in zip(moving, directions[:, column].tolist()) if d != 0]
 
       if len(tripwireObjects) != len(objects) \
          and now - tripwire.when > DEBOUNCE_DELAY:
@@ -334,16 +372,25 @@ class Scene(SceneModel):
 
   def _updateRegionEvents(self, detectionType, regions, now, now_str, curObjects):
     updated = set()
-    for key in regions:
+    # When tracker is disabled, skip the frameCount check and consider all objects;
+    # otherwise, only consider objects with frameCount > 3 as reliable.
+    candidates = [obj for obj in curObjects if obj.frameCount > 3 or not self.use_tracker]
+    membership = self._membershipFor(regions)
+    membership.update(regions)
+    locations = np.array([(loc.x, loc.y) for loc in (obj.sceneLoc for obj in candidates)],
+                         dtype=np.float64).reshape(-1, 2)
+    within = membership.pointsWithin(locations)
+    volumes = self._volumesFor(regions)
+    volumes.update(regions)
+    if volumes.active:
+      bottoms, sizes, rotations, valid = objectBoxes(candidates)
+      within |= volumes.boxesIntersecting(bottoms, sizes, rotations,
+                                          exclude=within | ~valid[:, None])
+
+    for column, key in enumerate(membership.keys):
       region = regions[key]
       regionObjects = region.objects.get(detectionType, [])
-      objects = []
-      for obj in curObjects:
-        # When tracker is disabled, skip the frameCount check and consider all objects;
-        # otherwise, only consider objects with frameCount > 3 as reliable.
-        if (obj.frameCount > 3 or not self.use_tracker) \
-           and (region.isPointWithin(obj.sceneLoc) or self.isIntersecting(obj, region)):
-          objects.append(obj)
+      objects = [obj for obj, inside in zip(candidates, within[:, column]) if inside]
 
       cur = set(x.gid for x in objects)
       prev = set(x.gid for x in regionObjects)
@@ -352,7 +399,7 @@ class Scene(SceneModel):
       newObjects = [x for x in objects if x.gid in new]
       for obj in newObjects:
         if key not in obj.chain_data.regions:
-          obj.chain_data.regions[key] = {'entered': now_str}
+          obj.chain_data.regions[key] = {'entered': now}
           updated.add(key)
 
       # For sensors add the current sensor value to any new objects
@@ -375,8 +422,7 @@ class Scene(SceneModel):
         for obj in regionObjects:
           if obj.gid in old:
             if key in obj.chain_data.regions:
-              entered = get_epoch_time(obj.chain_data.regions[key]['entered'])
-              dwell = now - entered
+              dwell = now - obj.chain_data.regions[key]['entered']
               exited.append((obj, dwell))
             obj.chain_data.regions.pop(key, None)
         if not hasattr(region, 'exited'):
@@ -396,33 +442,57 @@ class Scene(SceneModel):
 
     return updated
 
+  def _membershipFor(self, regions):
+    if regions is self.sensors:
+      return self.sensor_membership
+    return self.region_membership
+
+  def _volumesFor(self, regions):
+    if regions is self.sensors:
+      return self.sensor_volumes
+    return self.region_volumes
+
   def isIntersecting(self, obj, region):
+    """! Test the box of a single object against a volumetric region.
+    _updateRegionEvents() tests all objects of a frame at once instead, the
+    prisms it built are reused for the regions and sensors of the scene.
+    """
     if not region.compute_intersection:
       return False
 
-    if region.mesh is None:
-      createRegionMesh(region)
-
-    try:
-      createObjectMesh(obj)
-    except ValueError as e:
-      log.info(f"Error creating object mesh for intersection check: {e}")
+    bottoms, sizes, rotations, valid = objectBoxes([obj])
+    if not valid[0]:
+      log.info("Object has no valid box for intersection check", getattr(obj, 'gid', None))
       return False
 
-    return obj.mesh.is_intersecting(region.mesh)
+    for regions in (self.regions, self.sensors):
+      if regions.get(region.uuid) is region:
+        volumes = self._volumesFor(regions)
+        volumes.update(regions)
+        column = volumes.keys.index(region.uuid)
+        break
+    else:
+      volumes = VolumetricIntersections()
+      volumes.update({region.uuid: region})
+      column = 0
+    return bool(volumes.boxesIntersecting(bottoms, sizes, rotations)[0, column])
 
   def _updateVisible(self, curObjects):
     """! Update the visibility of objects from cameras in the scene."""
-    for obj in curObjects:
-      vis = []
-
-      for sname in self.cameras:
-        camera = self.cameras[sname]
-        if hasattr(camera, 'pose') and hasattr(camera.pose, 'regionOfView') \
-           and camera.pose.regionOfView.isPointWithin(obj.sceneLoc):
-          vis.append(camera.cameraID)
-
-      obj.visibility = vis
+    views = {}
+    camera_ids = []
+    for sname, camera in self.cameras.items():
+      if hasattr(camera, 'pose') and hasattr(camera.pose, 'regionOfView'):
+        views[sname] = camera.pose.regionOfView
+        camera_ids.append(camera.cameraID)
+    # Only rebuilt when a regionOfView changed, see updateCameras()
+    self.camera_views.update(views)
+
+    locations = np.array([(loc.x, loc.y) for loc in (obj.sceneLoc for obj in curObjects)],
+                         dtype=np.float64).reshape(-1, 2)
+    visible = self.camera_views.pointsWithin(locations)
+    for obj, row in zip(curObjects, visible):
+      obj.visibility = [camera_ids[column] for column in np.flatnonzero(row)]
     return
 
   @classmethod
@@ -454,6 +524,9 @@ class Scene(SceneModel):
       scene.parent = data['parent']
     if 'transform' in data:
       scene.cameraPose = CameraPose(data['transform'], None)
+    scene._dataChanged('transform', data.get('transform', None))
+    scene._dataChanged('map', cls._mapData(data))
+    scene._dataChanged('lla', (scene.output_lla, scene.map_corners_lla))
     if 'tracker_config' in data:
       tracker_config = data['tracker_config']
       scene.updateTracker(tracker_config[0], tracker_config[1], tracker_config[2])
@@ -468,20 +541,33 @@ class Scene(SceneModel):
   def updateCameras(self, newCameras):
     old = set(self.cameras.keys())
     new = set([x['uid'] for x in newCameras])
+    changed = False
     for cameraData in newCameras:
       camID = cameraData['uid']
+      if not self._dataChanged(('camera', camID), cameraData) and camID in self.cameras:
+        continue
       self.cameras[camID] = Camera(camID, cameraData, resolution=cameraData['resolution'])
+      changed = True
     deleted = old - new
     for camID in deleted:
       self.cameras.pop(camID)
+      self.applied_data.pop(('camera', camID), None)
+    if changed or deleted:
+      self.camera_views.invalidate()
     return
 
   def _updateRegions(self, existingRegions, newRegions):
+    kind = 'sensor' if existingRegions is self.sensors else 'region'
     old = set(existingRegions.keys())
     new = set([x['uid'] for x in newRegions])
+    changed = False
     for regionData in newRegions:
       region_uuid = regionData['uid']
       region_name = regionData['name']
+      if not self._dataChanged((kind, region_uuid), regionData) \
+         and region_uuid in existingRegions:
+        continue
+      changed = True
       if region_uuid in existingRegions:
         existingRegions[region_uuid].updatePoints(regionData)
         existingRegions[region_uuid].updateSingletonType(regionData)
@@ -492,18 +578,32 @@ class Scene(SceneModel):
     deleted = old - new
     for region_uuid in deleted:
       existingRegions.pop(region_uuid)
+      self.applied_data.pop((kind, region_uuid), None)
+    if changed or deleted:
+      membership = self._membershipFor(existingRegions)
+      membership.invalidate()
+      membership.update(existingRegions)
+      self._volumesFor(existingRegions).invalidate()
     return
 
   def _updateTripwires(self, newTripwires):
     old = set(self.tripwires.keys())
     new = set([x['uid'] for x in newTripwires])
+    changed = False
     for tripwireData in newTripwires:
       tripwire_uuid = tripwireData["uid"]
       tripwire_name = tripwireData['name']
+      if not self._dataChanged(('tripwire', tripwire_uuid), tripwireData) \
+         and tripwire_uuid in self.tripwires:
+        continue
       self.tripwires[tripwire_uuid] = Tripwire(tripwire_uuid, tripwire_name, tripwireData)
+      changed = True
     deleted = old - new
     for tripwireID in deleted:
       self.tripwires.pop(tripwireID)
+      self.applied_data.pop(('tripwire', tripwireID), None)
+    if changed or deleted:
+      self.tripwire_crossings.update(self.tripwires)
     return
 
   @property
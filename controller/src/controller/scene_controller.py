@@ -9,21 +9,33 @@ import ntplib
 
 from controller.cache_manager import CacheManager
 from controller.child_scene_controller import ChildSceneController
-from controller.detections_builder import (buildDetectionsDict,
+from controller.detections_builder import (DetectionsCache,
+                                           buildDetectionsDict,
                                            buildDetectionsList,
-                                           computeCameraBounds)
+                                           composeDetections,
+                                           computeCameraBoundsBatch,
+                                           splitDetections)
 from controller.scene import Scene
 from scene_common import log
+from scene_common.camera_codec import cameraDataToMessage, decodeCameraData
 from scene_common.geometry import Point, Region, Tripwire
 from scene_common.mqtt import PubSub
 from scene_common.schema import SchemaValidation
 from scene_common.timestamp import adjust_time, get_epoch_time, get_iso_time
 from scene_common.transform import applyChildTransform
 from controller.observability import metrics
-from controller.time_chunking import DEFAULT_CHUNKING_INTERVAL_MS
+from controller import time_chunking
+from controller.time_chunking import CHUNKING_MODES, DEFAULT_CHUNKING_INTERVAL_MS
+from controller.reid_index import INDEX_TYPES
+from controller.tracker_mailbox import MAILBOX_POLICIES
+from controller import tracking, uuid_manager
 AVG_FRAMES = 100
+# Seconds between refreshes of all scenes requested by messages of unknown cameras
+UNKNOWN_SENDER_REFRESH_TIME = 10
 
 class SceneController:
+  # Class the CacheManager builds the scenes with
+  scene_class = Scene
 
   def __init__(self, rewrite_bad_time, rewrite_all_time, max_lag, mqtt_broker,
                mqtt_auth, rest_url, rest_auth, client_cert, root_cert, ntp_server,
@@ -34,6 +46,7 @@ class SceneController:
     self.rewrite_all_time = rewrite_all_time
     self.max_lag = max_lag
     self.regulate_cache = {}
+    self.detections_cache = DetectionsCache()
     self.broker = mqtt_broker
     self.mqtt_auth = mqtt_auth
     self.tracker_config_data = {}
@@ -42,6 +55,7 @@ class SceneController:
       self.extractTrackerConfigData(tracker_config_file)
 
     self.last_time_sync = None
+    self.last_unknown_sender_refresh = None
     self.ntp_server = ntp_server
     self.ntp_client = ntplib.NTPClient()
     self.time_offset = 0
@@ -52,12 +66,20 @@ class SceneController:
     self.pubsub.onConnect = self.onConnect
     self.pubsub.connect()
 
-    self.cache_manager = CacheManager(data_source, rest_url, rest_auth, root_cert, self.tracker_config_data)
+    self.cache_manager = CacheManager(data_source, rest_url, rest_auth, root_cert,
+                                      self.tracker_config_data, scene_filter=self.wantsScene,
+                                      scene_class=self.scene_class)
 
     self.visibility_topic = visibility_topic
     log.info(f"Publishing camera visibility info on {self.visibility_topic} topic.")
     return
 
+  def wantsScene(self, scene_data):
+    """! Whether the scene described by scene_data is built and tracked by
+    this controller. The regular controller handles every scene.
+    """
+    return True
+
   def extractTrackerConfigData(self, tracker_config_file):
     if not os.path.exists(tracker_config_file) and not os.path.isabs(tracker_config_file):
       script = os.path.realpath(__file__)
@@ -69,6 +91,9 @@ class SceneController:
       self.tracker_config_data["non_measurement_time_static"] = tracker_config["non_measurement_frames_static"]/tracker_config["baseline_frame_rate"]
       self._extractTimeChunkingEnabled(tracker_config)
       self._extractTimeChunkingInterval(tracker_config)
+      self._extractTimeChunkingMode(tracker_config)
+      self._extractTrackerQueue(tracker_config)
+      self._extractReIDDatabase(tracker_config)
 
       if "persist_attributes" in tracker_config:
         if isinstance(tracker_config["persist_attributes"], dict):
@@ -109,6 +134,90 @@ class SceneController:
       raise ValueError(f"Invalid value for time_chunking_interval_milliseconds in tracker config file")
     return
 
+  def _extractTimeChunkingMode(self, tracker_config):
+    """Extract and validate the adaptive time chunking options."""
+    mode = tracker_config.get("time_chunking_mode", time_chunking.chunking_config['mode'])
+    if mode not in CHUNKING_MODES:
+      raise ValueError(f"Invalid value for time_chunking_mode in tracker config file, expected one of {CHUNKING_MODES}")
+
+    try:
+      max_latency_ms = int(tracker_config.get("time_chunking_max_latency_milliseconds",
+                                              time_chunking.chunking_config['max_latency_ms']))
+      if max_latency_ms <= 0:
+        raise ValueError("Time chunking max latency must be positive.")
+    except (ValueError, TypeError):
+      raise ValueError("Invalid value for time_chunking_max_latency_milliseconds in tracker config file")
+
+    time_chunking.chunking_config.update(mode=mode, max_latency_ms=max_latency_ms)
+    log.info(f"Time chunking mode: {mode} max latency (ms): {max_latency_ms}")
+    return
+
+  def _extractTrackerQueue(self, tracker_config):
+    """Extract and validate the scheduling of frames for busy trackers."""
+    policy = tracker_config.get("tracker_queue_policy", tracking.mailbox_config['policy'])
+    if policy not in MAILBOX_POLICIES:
+      raise ValueError(f"Invalid value for tracker_queue_policy in tracker config file, expected one of {MAILBOX_POLICIES}")
+
+    try:
+      size = int(tracker_config.get("tracker_queue_size", tracking.mailbox_config['maxsize']))
+      timeout_ms = int(tracker_config.get("tracker_queue_timeout_milliseconds",
+                                          tracking.mailbox_config['timeout_ms']))
+      if size <= 0 or timeout_ms < 0:
+        raise ValueError("Tracker queue size must be positive and timeout non-negative.")
+    except (ValueError, TypeError):
+      raise ValueError("Invalid value for tracker_queue_size or tracker_queue_timeout_milliseconds in tracker config file")
+
+    tracking.mailbox_config.update(policy=policy, maxsize=size, timeout_ms=timeout_ms)
+    log.info(f"Tracker queue policy: {policy} size: {size} timeout (ms): {timeout_ms}")
+    return
+
+  def _extractReIDDatabase(self, tracker_config):
+    """Extract and validate the Re-ID database and its options."""
+    database = str(tracker_config.get("reid_database", uuid_manager.DEFAULT_DATABASE)).upper()
+    if database not in uuid_manager.available_databases:
+      raise ValueError(f"Invalid value for reid_database in tracker config file, expected one of {list(uuid_manager.available_databases)}")
+
+    options = {}
+    if database == "LOCAL":
+      index_config = tracker_config.get("reid_index", {})
+      keys = {
+        "type": ("index", str),
+        "max_entries": ("max_entries", int),
+        "ttl_seconds": ("ttl", float),
+        "ivf_lists": ("ivf_lists", int),
+        "ivf_probes": ("ivf_probes", int),
+        "pq_subquantizers": ("pq_subquantizers", int),
+        "snapshot_path": ("snapshot_path", str),
+        "snapshot_interval_seconds": ("snapshot_interval", float),
+      }
+      try:
+        for key, value in index_config.items():
+          name, convert = keys[key]
+          options[name] = convert(value)
+      except (KeyError, ValueError, TypeError, AttributeError):
+        raise ValueError(f"Invalid reid_index in tracker config file, expected keys {list(keys)}")
+      if options.get("index", INDEX_TYPES[0]) not in INDEX_TYPES:
+        raise ValueError(f"Invalid reid_index type in tracker config file, expected one of {INDEX_TYPES}")
+    elif database == "VDMS":
+      vdms_config = tracker_config.get("vdms", {})
+      keys = {
+        "connections": ("connections", int),
+        "write_batch_size": ("write_batch_size", int),
+        "write_flush_interval_seconds": ("write_flush_interval", float),
+      }
+      try:
+        for key, value in vdms_config.items():
+          name, convert = keys[key]
+          options[name] = convert(value)
+      except (KeyError, ValueError, TypeError, AttributeError):
+        raise ValueError(f"Invalid vdms in tracker config file, expected keys {list(keys)}")
+      if any(value <= 0 for value in options.values()):
+        raise ValueError("Invalid vdms in tracker config file, expected positive values")
+
+    uuid_manager.database_config.update(database=database, options=options)
+    log.info(f"Re-ID database: {database} {options}")
+    return
+
   def loopForever(self):
     return self.pubsub.loopForever()
 
@@ -133,14 +242,16 @@ class SceneController:
     return last is None or now - last >= max_delay
 
   def publishSceneDetections(self, scene, objects, otype, jdata):
-    jdata['objects'] = buildDetectionsList(objects, scene, self.visibility_topic == 'unregulated')
+    jdata['objects'] = buildDetectionsList(objects, scene, self.visibility_topic == 'unregulated',
+                                           self.detections_cache)
     olen = len(jdata['objects'])
     cid = scene.name + "/" + otype
     if olen > 0 or cid not in scene.lastPubCount or scene.lastPubCount[cid] > 0:
       if 'debug_hmo_start_time' in jdata:
         jdata['debug_hmo_processing_time'] = get_epoch_time() - jdata['debug_hmo_start_time']
-      # Convert numpy types to native Python types for JSON serialization
-      jstr = orjson.dumps(jdata, option=orjson.OPT_SERIALIZE_NUMPY)
+      # Numpy types are converted to native Python types by OPT_SERIALIZE_NUMPY
+      jstr = composeDetections(splitDetections(jdata),
+                               self.detections_cache.fragments(jdata['objects']))
       new_topic = PubSub.formatTopic(PubSub.DATA_SCENE, scene_id=scene.uid,
                                      thing_type=otype)
       self.pubsub.publish(new_topic, jstr)
@@ -184,13 +295,17 @@ class SceneController:
         for obj in msg_objects:
           msg_objects_lookup[obj.gid] = obj
 
+      visible = []
       for key in scene['objects']:
         for obj in scene['objects'][key]:
           if is_regulated:
             aobj = msg_objects_lookup.get(obj['id'], None)
             if aobj is not None:
-              computeCameraBounds(scene_obj, aobj, obj)
+              visible.append((aobj, obj))
+              self.detections_cache.discardFragment(obj['id'])
           objects.append(obj)
+      # Bounds in all cameras are projected with one call per camera
+      computeCameraBoundsBatch(scene_obj, visible)
       new_jdata = {
         'timestamp': jdata['timestamp'],
         'objects': objects,
@@ -207,16 +322,20 @@ class SceneController:
     return
 
   def publishRegionDetections(self, scene, objects, otype, jdata):
+    envelope = None
     for rname in scene.regions:
       robjects = []
       for obj in objects:
         if rname in obj.chain_data.regions:
           robjects.append(obj)
-      jdata['objects'] = buildDetectionsList(robjects, scene)
+      jdata['objects'] = buildDetectionsList(robjects, scene, cache=self.detections_cache)
       olen = len(jdata['objects'])
       rid = scene.name + "/" + rname + "/" + otype
       if olen > 0 or rid not in scene.lastPubCount or scene.lastPubCount[rid] > 0:
-        jstr = orjson.dumps(jdata, option=orjson.OPT_SERIALIZE_NUMPY)
+        # Only the objects differ between regions
+        if envelope is None:
+          envelope = splitDetections(jdata)
+        jstr = composeDetections(envelope, self.detections_cache.fragments(jdata['objects']))
         new_topic = PubSub.formatTopic(PubSub.DATA_REGION, scene_id=scene.uid,
                                        region_id=rname, thing_type=otype)
         self.pubsub.publish(new_topic, jstr)
@@ -272,7 +391,7 @@ class SceneController:
       num_objects += counts[otype]
       all_objects += objects
     event_data['counts'] = counts
-    detections_dict = buildDetectionsDict(all_objects, scene)
+    detections_dict = buildDetectionsDict(all_objects, scene, self.detections_cache)
     event_data['objects'] = list(detections_dict.values())
     return detections_dict, num_objects
 
@@ -293,7 +412,7 @@ class SceneController:
       for exited_obj, dwell in exited_list:
         exited_dict[exited_obj.gid] = dwell
         exited_objs.extend([exited_obj])
-      exited_objs = buildDetectionsList(exited_objs, scene)
+      exited_objs = buildDetectionsList(exited_objs, scene, cache=self.detections_cache)
       exited_data = [{'object': exited_obj, 'dwell': exited_dict[exited_obj['id']]} for exited_obj in exited_objs]
       event_data['exited'].extend(exited_data)
     return
@@ -340,29 +459,39 @@ class SceneController:
     else:
       ts = get_epoch_time(jdata['timestamp'])
 
-    if not scene.processSensorData(jdata, when=ts):
-      log.error("Sensor fail", sensor_id)
-      self.cache_manager.invalidate()
-      return
+    with self.cache_manager.lock:
+      if not scene.processSensorData(jdata, when=ts):
+        log.error("Sensor fail", sensor_id)
+        self.cache_manager.requestRefresh(scene.uid)
+        return
 
-    jdata['scene_id'] = scene.uid
-    jdata['scene_name'] = scene.name
+      jdata['scene_id'] = scene.uid
+      jdata['scene_name'] = scene.name
 
-    self.publishEvents(scene, jdata['timestamp'])
+      self.detections_cache.nextFrame()
+      self.publishEvents(scene, jdata['timestamp'])
     return
 
   def handleMovingObjectMessage(self, client, userdata, message):
     topic = PubSub.parseTopic(message.topic)
-    jdata = orjson.loads(message.payload.decode('utf-8'))
-
+    decoded = None
+    if topic['_topic_id'] == PubSub.DATA_CAMERA_BIN:
+      try:
+        decoded = decodeCameraData(message.payload)
+        jdata = cameraDataToMessage(decoded)
+      except ValueError as e:
+        log.error("Invalid camera data on", message.topic, e)
+        return
+    else:
+      jdata = orjson.loads(message.payload.decode('utf-8'))
 
     metric_attributes = {
         "topic": message.topic,
         "camera": jdata.get("id", "unknown"),
     }
     metrics.inc_messages(metric_attributes)
-    with metrics.time_mqtt_handler(metric_attributes):
-      if 'camera_id' in topic and not self.schema_val.validateMessage("detector", jdata):
+    with metrics.time_mqtt_handler(metric_attributes), self.cache_manager.lock:
+      if 'camera_id' in topic and not self._validateDetections(jdata, decoded):
         return
 
       now = get_epoch_time()
@@ -402,17 +531,19 @@ class SceneController:
         sender = self.cache_manager.sceneWithCameraID(sender_id)
         if sender is None:
           log.error("UNKNOWN SENDER", sender_id)
+          self.refreshForUnknownSender()
           return
         scene = sender
         success = scene.processCameraData(jdata, when=msg_when)
 
       if not success:
         log.error("Camera fail", sender_id, scene.name)
-        self.cache_manager.invalidate()
+        self.cache_manager.requestRefresh(scene.uid)
         return
 
       jdata['id'] = scene.uid
       jdata['name'] = scene.name
+      self.detections_cache.nextFrame()
       for detection_type in detection_types:
         jdata['unique_detection_count'] = scene.tracker.getUniqueIDCount(detection_type)
         self.publishDetections(scene, scene.tracker.currentObjects(detection_type),
@@ -420,6 +551,36 @@ class SceneController:
         self.publishEvents(scene, jdata['timestamp'])
       return
 
+  def refreshForUnknownSender(self):
+    """! A camera added to a scene, or moved to another one, is only found
+    after the scene it is in now is refreshed. As that scene is not known,
+    all scenes are refreshed, at most once per UNKNOWN_SENDER_REFRESH_TIME
+    as a camera in no scene keeps sending.
+    """
+    now = get_epoch_time()
+    if self.shouldPublish(self.last_unknown_sender_refresh, now, UNKNOWN_SENDER_REFRESH_TIME):
+      self.last_unknown_sender_refresh = now
+      self.cache_manager.requestRefresh()
+    return
+
+  def _validateDetections(self, jdata, decoded=None):
+    """! Validates a detector message against the schema. Of a message
+    built from binary camera data, whose arrays are checked by camera_codec,
+    only the frame level fields and the objects with fields that travel as
+    JSON are validated, without the Re-ID vectors kept as arrays.
+
+    @param   decoded   Camera data from decodeCameraData(), None for JSON.
+    """
+    if decoded is not None:
+      objects = {}
+      for category, detections in jdata['objects'].items():
+        extra = decoded['objects'][category]['extra']
+        objects[category] = [{key: value for key, value in obj.items()
+                              if key != 'reid' or key in rest}
+                             for obj, rest in zip(detections, extra) if rest]
+      jdata = dict(jdata, objects=objects)
+    return self.schema_val.validateMessage("detector", jdata)
+
   def _handleChildSceneObject(self, sender_id, jdata, detection_type, msg_when):
     sender = self.cache_manager.sceneWithID(sender_id)
     if sender is None:
@@ -460,14 +621,29 @@ class SceneController:
   def handleDatabaseMessage(self, client, userdata, message):
     command = str(message.payload.decode("utf-8"))
     if command == "update":
-      try:
-        self.updateSubscriptions()
-        self.updateObjectClasses()
-        self.updateCameras()
+      self.cache_manager.requestRefresh(callback=self.updateFromDatabase)
+    return
+
+  def handleSceneUpdateMessage(self, client, userdata, message):
+    """
+    Refreshes the scene named in the topic. Subscriptions are updated by the
+    database update that follows every scene update.
+    """
+    topic = PubSub.parseTopic(message.topic)
+    self.cache_manager.requestRefresh(topic['scene_id'])
+    return
+
+  def updateFromDatabase(self):
+    """Runs on the refresh thread once the scenes are refreshed after a database update."""
+    try:
+      self.updateSubscriptions()
+      self.updateObjectClasses()
+      self.updateCameras()
+      with self.cache_manager.lock:
         self.updateRegulateCache()
-        self.updateTRSMatrix()
-      except Exception as e:
-        log.warn("Failed to update database: %s", e)
+      self.updateTRSMatrix()
+    except Exception as e:
+      log.warn("Failed to update database: %s", e)
     return
 
   def calculateRate(self):
@@ -488,24 +664,31 @@ class SceneController:
     if rc != 0:
       exit(1)
     self.subscribed = set()
+    self.cache_manager.refreshScenes()
     self.updateSubscriptions()
     self.updateObjectClasses()
     self.updateTRSMatrix()
     topic = PubSub.formatTopic(PubSub.CMD_DATABASE)
     self.pubsub.addCallback(topic, self.handleDatabaseMessage)
     log.info("Subscribed to", topic)
+    topic = PubSub.formatTopic(PubSub.CMD_SCENE_UPDATE, scene_id="+")
+    self.pubsub.addCallback(topic, self.handleSceneUpdateMessage)
+    log.info("Subscribed to", topic)
     # FIXME - update subscriptions when scenes/sensors/children added/deleted/renamed
     return
 
   def updateObjectClasses(self):
     results = self.cache_manager.data_source.getAssets()
     if results and 'results' in results:
-      for scene in self.scenes:
-        scene.tracker.updateObjectClasses(results['results'])
+      with self.cache_manager.lock:
+        for scene in self.scenes:
+          scene.tracker.updateObjectClasses(results['results'])
     return
 
-  def updateTRSMatrix(self):
-    for scene in self.cache_manager.allScenes():
+  def updateTRSMatrix(self, scenes=None):
+    if scenes is None:
+      scenes = self.cache_manager.allScenes()
+    for scene in scenes:
       if scene.trs_xyz_to_lla is not None:
         res = self.cache_manager.data_source.setTRSMatrix(scene.uid, scene.trs_xyz_to_lla)
         if res.errors:
@@ -555,20 +738,25 @@ class SceneController:
 
   def transformObjectsinEvent(self, event, sender):
     keys = ['objects', 'entered', 'exited']
+    objects = []
     for k in keys:
       if k == 'exited':
-        for i, obj in enumerate(event[k]):
-          event[k][i]['object']['translation'] = sender.cameraPose.cameraPointToWorldPoint(
-                                                            Point(obj['object']['translation'])).asNumpyCartesian.tolist()
+        objects.extend(obj['object'] for obj in event[k])
       else:
-        for i, obj in enumerate(event[k]):
-          event[k][i]['translation'] = sender.cameraPose.cameraPointToWorldPoint(
-                                                            Point(obj['translation'])).asNumpyCartesian.tolist()
+        objects.extend(event[k])
+    if not objects:
+      return
+
+    if all(len(obj['translation']) == 3 for obj in objects):
+      sender.cameraPose.childTransform.transformObjects(objects)
+    else:
+      for obj in objects:
+        obj['translation'] = sender.cameraPose.cameraPointToWorldPoint(
+                                                Point(obj['translation'])).asNumpyCartesian.tolist()
     return
 
   def updateSubscriptions(self):
     log.debug("UPDATE SUBSCRIPTIONS")
-    self.cache_manager.invalidate()
     if not hasattr(self, 'subscribed'):
       self.subscribed = set()
     need_subscribe = set()
@@ -582,6 +770,8 @@ class SceneController:
       for camera in scene.cameras:
         need_subscribe.add((PubSub.formatTopic(PubSub.DATA_CAMERA, camera_id=camera),
                             self.handleMovingObjectMessage))
+        need_subscribe.add((PubSub.formatTopic(PubSub.DATA_CAMERA_BIN, camera_id=camera),
+                            self.handleMovingObjectMessage))
       for sensor in scene.sensors:
         need_subscribe.add((PubSub.formatTopic(PubSub.DATA_SENSOR, sensor_id=sensor),
                             self.handleSensorMessage))
@@ -603,7 +793,7 @@ class SceneController:
                                 self.republishEvents))
           else:
             child_obj = ChildSceneController(self.root_cert, info, self)
-            self.cache_manager.cached_child_transforms_by_uid[info['remote_child_id']] = Scene.deserialize(info)
+            self.cache_manager.cached_child_transforms_by_uid[info['remote_child_id']] = self.scene_class.deserialize(info)
             need_subscribe_child[info['remote_child_id']] = child_obj
             need_subscribe.add((PubSub.formatTopic(PubSub.SYS_CHILDSCENE_STATUS, scene_id=info['remote_child_id']), child_obj.publishStatus))
 
@@ -0,0 +1,256 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import multiprocessing
+import queue
+import signal
+import zlib
+
+from controller.observability import metrics, tracing
+from controller.scene import Scene
+from controller.scene_controller import SceneController
+from controller.uuid_manager import closeDatabases, closeDatabasesOnSignal
+from scene_common import log
+from scene_common.mqtt import PubSub
+
+SHARD_MOVING_OBJECT = "moving_object"
+SHARD_SENSOR = "sensor"
+SHARD_CHILD_EVENT = "child_event"
+SHARD_DATABASE = "database"
+SHARD_SCENE_UPDATE = "scene_update"
+SHARD_QUEUE_SIZE = 256
+
+def shardForScene(scene_uid, shard_count):
+  """! Stable partition of scenes across shards. Python's hash() is salted
+  per process, so a checksum is used to get the same answer in every worker.
+  """
+  return zlib.crc32(str(scene_uid).encode()) % shard_count
+
+class SceneRoute:
+  """! What the dispatcher keeps of a scene: the cameras, sensors and
+  children of the scene it routes messages by. Stands in for Scene in the
+  dispatcher CacheManager, so that no map, region or tracker is built there.
+  """
+
+  def __init__(self, uid, name):
+    self.uid = uid
+    self.name = name
+    self.parent = None
+    self.retrack = True
+    self.cameras = {}
+    self.sensors = {}
+    self.children = []
+    return
+
+  @classmethod
+  def deserialize(cls, data):
+    route = cls(data['uid'], data['name'])
+    route.retrack = data.get('retrack', True)
+    route.updateScene(data)
+    return route
+
+  def updateScene(self, scene_data):
+    self.name = scene_data['name']
+    self.parent = scene_data.get('parent', None)
+    self.cameras = {camera['uid']: camera for camera in scene_data.get('cameras', [])}
+    self.sensors = {sensor['uid']: sensor for sensor in scene_data.get('sensors', [])}
+    self.children = [child['name'] for child in scene_data.get('children', [])]
+    return
+
+class ForwardedMessage:
+  """! Stand-in for the paho message handed to the SceneController
+  callbacks, carries the parts of it that are sent to a worker.
+  """
+  __slots__ = ('topic', 'payload')
+
+  def __init__(self, topic, payload):
+    self.topic = topic
+    self.payload = payload
+    return
+
+def serveShard(controller, inbox):
+  """! Deliver forwarded messages to the controller callbacks until a None
+  sentinel is received. All scene and tracker state of a shard is only
+  touched from this loop.
+  """
+  handlers = {
+    SHARD_MOVING_OBJECT: controller.handleMovingObjectMessage,
+    SHARD_SENSOR: controller.handleSensorMessage,
+    SHARD_CHILD_EVENT: controller.republishEvents,
+    SHARD_DATABASE: controller.handleDatabaseMessage,
+    SHARD_SCENE_UPDATE: controller.handleSceneUpdateMessage,
+  }
+  while True:
+    item = inbox.get()
+    if item is None:
+      break
+    kind, topic, payload = item
+    try:
+      handlers[kind](None, None, ForwardedMessage(topic, payload))
+    except Exception as e:
+      log.error("Shard failed to handle", topic, e)
+  return
+
+def runShardWorker(shard, shard_count, inbox, controller_args):
+  """! Entry point of a worker process. """
+  metrics.init()
+  tracing.init()
+  closeDatabasesOnSignal(signal.SIGTERM)
+  worker = SceneShardWorker(shard, shard_count, *controller_args)
+  worker.updateSubscriptions()
+  worker.updateObjectClasses()
+  worker.updateTRSMatrix()
+  worker.pubsub.loopStart()
+  serveShard(worker, inbox)
+  worker.pubsub.loopStop()
+  # Worker processes exit without running the atexit handlers
+  closeDatabases()
+  return
+
+class SceneShardWorker(SceneController):
+  """! SceneController for the scenes of one shard, running in a worker
+  process with its own Scene and tracker state. It does not subscribe to
+  anything, the dispatcher forwards the messages for its scenes through a
+  queue. The MQTT connection is only used for publishing.
+  """
+
+  def __init__(self, shard, shard_count, *args):
+    self.shard = shard
+    self.shard_count = shard_count
+    super().__init__(*args)
+    return
+
+  def ownsScene(self, scene):
+    return shardForScene(scene.uid, self.shard_count) == self.shard
+
+  def wantsScene(self, scene_data):
+    # Local children are needed too, their objects are moved into the owned parent here
+    return any(uid is not None and shardForScene(uid, self.shard_count) == self.shard
+               for uid in (scene_data['uid'], scene_data.get('parent')))
+
+  def onConnect(self, client, userdata, flags, rc):
+    log.info("Shard", self.shard, "connected with result code", rc)
+    if rc != 0:
+      exit(1)
+    return
+
+  def updateSubscriptions(self):
+    self.scenes = [scene for scene in self.cache_manager.allScenes() if self.ownsScene(scene)]
+    for scene in self.scenes:
+      if hasattr(scene, 'children'):
+        child_scenes = self.cache_manager.data_source.getChildScenes(scene.uid)
+        for info in child_scenes.get('results', []):
+          if info['child_type'] == 'local':
+            self.cache_manager.sceneWithID(info['child']).retrack = info['retrack']
+          else:
+            self.cache_manager.cached_child_transforms_by_uid[info['remote_child_id']] = Scene.deserialize(info)
+    log.info("Shard", self.shard, "owns", [scene.name for scene in self.scenes])
+    return
+
+  def updateTRSMatrix(self, scenes=None):
+    # Local children of the owned scenes are written by the shard owning them
+    super().updateTRSMatrix(self.scenes if scenes is None else scenes)
+    return
+
+class ShardedSceneController(SceneController):
+  """! Dispatcher for the sharded mode. Scenes are partitioned across
+  worker processes by uid. The dispatcher keeps the MQTT subscriptions of
+  the regular SceneController, looks up the scene a message belongs to in
+  the CacheManager camera/sensor/child maps and forwards the raw message to
+  the worker owning that scene. Parsing, tracking and publishing happen in
+  the workers, the dispatcher only keeps a SceneRoute of each scene.
+  """
+  scene_class = SceneRoute
+
+  def __init__(self, shard_count, *args):
+    self.shard_count = shard_count
+    self.inboxes = []
+    self.workers = []
+    # Workers are started before any MQTT or tracker threads exist here
+    context = multiprocessing.get_context('spawn')
+    for shard in range(shard_count):
+      inbox = context.Queue(SHARD_QUEUE_SIZE)
+      worker = context.Process(target=runShardWorker, args=(shard, shard_count, inbox, args),
+                               name=f"scene-shard-{shard}", daemon=True)
+      worker.start()
+      self.inboxes.append(inbox)
+      self.workers.append(worker)
+    super().__init__(*args)
+    return
+
+  def updateFromDatabase(self):
+    try:
+      self.updateSubscriptions()
+    except Exception as e:
+      log.warn("Failed to update database: %s", e)
+    return
+
+  def updateObjectClasses(self):
+    # Object classes are only used by the trackers, in the workers
+    return
+
+  def updateTRSMatrix(self, scenes=None):
+    # Written by the workers, which build the scene maps
+    return
+
+  def handleMovingObjectMessage(self, client, userdata, message):
+    topic = PubSub.parseTopic(message.topic)
+    if topic['_topic_id'] == PubSub.DATA_EXTERNAL:
+      scene = self._parentScene(topic['scene_id'])
+    else:
+      scene = self.cache_manager.sceneWithCameraID(topic['camera_id'])
+    self._forward(SHARD_MOVING_OBJECT, scene, message)
+    return
+
+  def handleSensorMessage(self, client, userdata, message):
+    topic = PubSub.parseTopic(message.topic)
+    scene = self.cache_manager.sceneWithSensorID(topic['sensor_id'])
+    self._forward(SHARD_SENSOR, scene, message)
+    return
+
+  def republishEvents(self, client, userdata, message):
+    topic = PubSub.parseTopic(message.topic)
+    scene = self._parentScene(topic['scene_id'])
+    self._forward(SHARD_CHILD_EVENT, scene, message)
+    return
+
+  def handleDatabaseMessage(self, client, userdata, message):
+    super().handleDatabaseMessage(client, userdata, message)
+    for inbox in self.inboxes:
+      inbox.put((SHARD_DATABASE, message.topic, message.payload))
+    return
+
+  def handleSceneUpdateMessage(self, client, userdata, message):
+    super().handleSceneUpdateMessage(client, userdata, message)
+    scene_uid = PubSub.parseTopic(message.topic)['scene_id']
+    self.inboxes[shardForScene(scene_uid, self.shard_count)].put(
+      (SHARD_SCENE_UPDATE, message.topic, message.payload))
+    return
+
+  def _parentScene(self, sender_id):
+    sender = self.cache_manager.sceneWithID(sender_id)
+    if sender is None:
+      sender = self.cache_manager.sceneWithRemoteChildID(sender_id)
+    if sender is None or getattr(sender, 'parent', None) is None:
+      return None
+    return self.cache_manager.sceneWithID(sender.parent)
+
+  def _forward(self, kind, scene, message):
+    if scene is None:
+      log.error("UNKNOWN SENDER", message.topic)
+      self.refreshForUnknownSender()
+      return
+    shard = shardForScene(scene.uid, self.shard_count)
+    try:
+      self.inboxes[shard].put_nowait((kind, message.topic, message.payload))
+    except queue.Full:
+      metrics.inc_dropped({"topic": message.topic, "reason": "shard_busy"})
+      log.warn("Shard", shard, "is busy, dropping", message.topic)
+    return
+
+  def join(self):
+    for inbox in self.inboxes:
+      inbox.put(None)
+    for worker in self.workers:
+      worker.join()
+    return
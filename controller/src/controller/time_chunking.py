@@ -14,6 +14,7 @@ IMPLEMENTATION:
 - TimeChunkedIntelLabsTracking: Inherits from IntelLabsTracking, overrides trackObjects()
 - TimeChunkProcessor: Timer thread that manages buffering and periodic dispatch
 - TimeChunkBuffer: Thread-safe storage that keeps only latest frame per camera+category
+- ChunkWindow: Sizes the chunk window in adaptive mode
 
 FEATURES:
 - Object Batching: Currently disabled (ENABLE_OBJECT_BATCHING=False). When enabled,
@@ -23,6 +24,10 @@ USAGE:
 TimeChunkedIntelLabsTracking is configurable via tracker-config.json:
 - Set "time_chunking_enabled": true to enable time-chunked tracking
 - Set "time_chunking_interval_milliseconds": 50 to set processing interval (optional, defaults to 50ms if not present)
+- Set "time_chunking_mode": "adaptive" to size the window from the camera frame rates and
+  the measured tracker latency instead (optional, defaults to "fixed"). The interval is then
+  the shortest window, and "time_chunking_max_latency_milliseconds" bounds the window plus
+  the tracker latency (optional, defaults to 200ms)
 The Scene class will automatically select TimeChunkedIntelLabsTracking when enabled, otherwise uses standard IntelLabsTracking.
 
 Example tracker-config.json:
@@ -47,6 +52,23 @@ from controller.observability import metrics
 
 DEFAULT_CHUNKING_INTERVAL_MS = 50  # Default interval in milliseconds
 
+CHUNKING_FIXED = "fixed"        # Dispatch every time_chunking_interval_milliseconds
+CHUNKING_ADAPTIVE = "adaptive"  # Size the window from camera frame rates and tracker latency
+CHUNKING_MODES = (CHUNKING_FIXED, CHUNKING_ADAPTIVE)
+DEFAULT_CHUNKING_MODE = CHUNKING_FIXED
+DEFAULT_CHUNKING_MAX_LATENCY_MS = 200
+
+# Weight of a new sample in the moving averages of ChunkWindow
+RATE_SMOOTHING = 0.2
+# Cameras that sent nothing for this many of their frame periods no longer size the window
+STALE_CAMERA_PERIODS = 4
+
+# Chunking mode of the time-chunked trackers, set from the tracker config file
+chunking_config = {
+  'mode': DEFAULT_CHUNKING_MODE,
+  'max_latency_ms': DEFAULT_CHUNKING_MAX_LATENCY_MS,
+}
+
 # TODO: object batching is not working yet, needs fixing tracker matching logic first
 ENABLE_OBJECT_BATCHING = True  # Hardcoded to False - batch objects from all cameras per category for single tracker call
 
@@ -58,14 +80,25 @@ class TimeChunkBuffer:
     self._lock = threading.Lock()
 
   def add(self, camera_id: str, category: str, objects: Any, when: float, already_tracked: List[Any]):
-    """Store latest message per category->camera - overwrites previous for performance optimization"""
+    """Store latest message per category->camera - overwrites previous for performance optimization
+
+    Returns True if a frame of the camera that was not dispatched yet was overwritten."""
     with self._lock:
       # Initialize category if not exists
       if category not in self._data:
         self._data[category] = {}
 
       # Store latest frame for this camera in this category
+      replaced = camera_id in self._data[category]
       self._data[category][camera_id] = (objects, when, already_tracked)
+      return replaced
+
+  def restore(self, category: str, camera_dict):
+    """Put back frames that could not be dispatched, unless newer frames arrived meanwhile"""
+    with self._lock:
+      pending = self._data.setdefault(category, {})
+      for camera_id, frame in camera_dict.items():
+        pending.setdefault(camera_id, frame)
 
   def pop_all(self):
     """Get all data organized by category->camera and clear buffer"""
@@ -75,64 +108,195 @@ class TimeChunkBuffer:
       return result
 
 
+class ChunkWindow:
+  """Sizes the chunk window of the adaptive mode.
+
+  The window is long enough for the slowest active camera to deliver a
+  frame, and for the tracker to finish the previous chunk, so that the
+  trackers are kept busy with full chunks. It is capped so that the window
+  plus the tracker latency stays within the latency budget. Times are
+  monotonic seconds.
+  """
+
+  def __init__(self, min_interval, max_latency):
+    self.min_interval = min_interval
+    self.max_latency = max_latency
+    self.tracker_latency = 0.0
+    self._periods = {}  # {camera_id: smoothed frame period}
+    self._last_seen = {}
+
+  def observeFrame(self, camera_id, now):
+    """Update the frame period of a camera with a frame arriving now"""
+    last = self._last_seen.get(camera_id)
+    self._last_seen[camera_id] = now
+    if last is None:
+      return
+    period = self._periods.get(camera_id)
+    sample = now - last
+    self._periods[camera_id] = sample if period is None \
+      else period + RATE_SMOOTHING * (sample - period)
+
+  def observeTracking(self, duration):
+    """Update the tracker latency with the duration of a tracker call"""
+    self.tracker_latency += RATE_SMOOTHING * (duration - self.tracker_latency)
+
+  def activeCameras(self, now):
+    """Cameras that sent a frame within a few of their frame periods"""
+    active = set()
+    for camera_id, last in self._last_seen.items():
+      period = self._periods.get(camera_id, self.min_interval)
+      if now - last <= STALE_CAMERA_PERIODS * max(period, self.min_interval):
+        active.add(camera_id)
+    return active
+
+  def window(self, now):
+    """Length of the next chunk window in seconds"""
+    active = self.activeCameras(now)
+    frame_period = max((self._periods[camera_id] for camera_id in active
+                        if camera_id in self._periods), default=0.0)
+    window = max(self.min_interval, frame_period, self.tracker_latency)
+    return min(window, max(self.min_interval, self.max_latency - self.tracker_latency))
+
+
 class TimeChunkProcessor(threading.Thread):
-  """Timer thread that processes buffered messages at configurable intervals"""
+  """Timer thread that processes buffered messages at configurable intervals
+
+  In the adaptive mode the window is sized by a ChunkWindow, and the thread
+  waits until the end of the window or until every active camera delivered
+  a frame, whichever is first. Categories whose tracker is busy are kept
+  for the next chunk instead of being dropped. The fill, lateness and
+  overwritten camera frames of each chunk are reported as metrics.
+  """
 
-  def __init__(self, tracker_manager, interval_ms=DEFAULT_CHUNKING_INTERVAL_MS):  # Default interval, configurable
+  def __init__(self, tracker_manager, interval_ms=DEFAULT_CHUNKING_INTERVAL_MS,  # Default interval, configurable
+               mode=DEFAULT_CHUNKING_MODE, max_latency_ms=DEFAULT_CHUNKING_MAX_LATENCY_MS):
     super().__init__(daemon=True)
+    if mode not in CHUNKING_MODES:
+      raise ValueError(f"Unknown time chunking mode: {mode}")
     self.buffer = TimeChunkBuffer()
     self.tracker_manager = tracker_manager
     self.interval = interval_ms / 1000.0  # Convert to seconds
+    self.window = None
+    if mode == CHUNKING_ADAPTIVE:
+      self.window = ChunkWindow(self.interval, max_latency_ms / 1000.0)
     self._stop = False
+    self._cond = threading.Condition()
+    self._expected = set()  # Active cameras when the chunk started
+    self._missing = 0       # Expected cameras that did not deliver a frame yet
+    self._arrived = set()
+    self._dropped = 0
+    self._frame_when = {}
 
   def add_message(self, camera_id: str, category: str, objects: Any, when: float, already_tracked: List[Any]):
     """Buffer latest frame only - overwrites previous frames per camera+category for performance"""
-    self.buffer.add(camera_id, category, objects, when, already_tracked)
+    replaced = self.buffer.add(camera_id, category, objects, when, already_tracked)
+    if self.window is None:
+      return
+    with self._cond:
+      # The same frame is added once per category
+      if self._frame_when.get(camera_id) != when:
+        self._frame_when[camera_id] = when
+        self.window.observeFrame(camera_id, time.monotonic())
+      if replaced:
+        self._dropped += 1
+      if camera_id not in self._arrived:
+        self._arrived.add(camera_id)
+        if camera_id in self._expected:
+          self._missing -= 1
+          if self._missing == 0:
+            # Every active camera delivered a frame, the chunk is full
+            self._cond.notify()
 
   def run(self):
     """Process buffer at configured interval - organized by category with camera data"""
+    if self.window is not None:
+      self._runAdaptive()
+      return
     while not self._stop:
       time.sleep(self.interval)
       # {category: {camera_id: (objects, when, already_tracked)}}
-      category_data = self.buffer.pop_all()
-
-      # Iterate per category and process each camera separately
-      for category, camera_dict in category_data.items():
-        if category in self.tracker_manager.trackers:
-          tracker = self.tracker_manager.trackers[category]
-
-          # Skip the category if tracker is still processing previous batch
-          if not tracker.queue.empty():
-            log.warn(
-                f"Tracker work queue is not empty ({tracker.queue.qsize()}). Dropping {len(camera_dict)} messages for category: {category}")
-            metrics_attributes = {
-                "category": category,
-                "reason": "tracker_busy"
-            }
-            metrics.inc_dropped(metrics_attributes)
-            continue
-
-          if ENABLE_OBJECT_BATCHING:
-            # Create aggregated lists: list of lists where each inner list contains objects from one camera
-            objects_per_camera = []
-            latest_when = 0
-            all_already_tracked = []
+      self._dispatch(self.buffer.pop_all())
 
-            # Sort camera data by timestamp (when) to ensure earliest detections come first
-            sorted_camera_items = sorted(camera_dict.items(), key=lambda x: x[1][1])  # Sort by 'when' (index 1 in tuple)
-
-            for camera_id, (objects, when, already_tracked) in sorted_camera_items:
-              objects_per_camera.append(objects)  # Keep objects from each camera in separate list
-              latest_when = max(latest_when, when)
-              all_already_tracked.extend(already_tracked)
-
-            # Single enqueue for aggregated camera data in this category
-            if objects_per_camera:
-              tracker.queue.put((objects_per_camera, latest_when, all_already_tracked, BATCHED_MODE))
-          else:
-            # Process each camera's data for this category separately (default behavior)
-            for camera_id, (objects, when, already_tracked) in camera_dict.items():
-              tracker.queue.put((objects, when, already_tracked, STREAMING_MODE))
+  def _runAdaptive(self):
+    """Dispatch a chunk at its deadline, or once it is full but not before the interval"""
+    metrics_attributes = {"mode": CHUNKING_ADAPTIVE}
+    start = time.monotonic()
+    deadline = self._startChunk(start)
+    while not self._stop:
+      with self._cond:
+        self._cond.wait_for(lambda: self._stop, start + self.interval - time.monotonic())
+        self._cond.wait_for(lambda: self._stop or self._missing <= 0, deadline - time.monotonic())
+        now = time.monotonic()
+        fill = 1.0 - self._missing / len(self._expected) if self._expected else 0.0
+        dropped = self._dropped
+        self._arrived = set()
+        self._dropped = 0
+
+      self._dispatch(self.buffer.pop_all(), keep_busy=True)
+
+      metrics.record_chunk_fill(fill, metrics_attributes)
+      metrics.record_chunk_lateness(max(0.0, now - deadline) * 1000, metrics_attributes)
+      if dropped:
+        metrics.inc_chunk_dropped(dropped, metrics_attributes)
+
+      durations = [tracker.last_duration for tracker in list(self.tracker_manager.trackers.values())]
+      if durations:
+        self.window.observeTracking(max(durations))
+      start = now
+      deadline = self._startChunk(now)
+
+  def _startChunk(self, now):
+    """Start a chunk window at now and return its deadline"""
+    with self._cond:
+      self._expected = self.window.activeCameras(now)
+      self._missing = len(self._expected - self._arrived)
+    return now + self.window.window(now)
+
+  def _dispatch(self, category_data, keep_busy=False):
+    """Enqueue the buffered frames to the category trackers
+
+    Categories whose tracker is still busy are dropped, or kept for the next
+    chunk if keep_busy is set."""
+    # Iterate per category and process each camera separately
+    for category, camera_dict in category_data.items():
+      if category in self.tracker_manager.trackers:
+        tracker = self.tracker_manager.trackers[category]
+
+        # Skip the category if tracker is still processing previous batch
+        if not tracker.queue.empty():
+          if keep_busy:
+            self.buffer.restore(category, camera_dict)
+            continue
+          log.warn(
+              f"Tracker work queue is not empty ({tracker.queue.qsize()}). Dropping {len(camera_dict)} messages for category: {category}")
+          metrics_attributes = {
+              "category": category,
+              "reason": "tracker_busy"
+          }
+          metrics.inc_dropped(metrics_attributes)
+          continue
+
+        if ENABLE_OBJECT_BATCHING:
+          # Create aggregated lists: list of lists where each inner list contains objects from one camera
+          objects_per_camera = []
+          latest_when = 0
+          all_already_tracked = []
+
+          # Sort camera data by timestamp (when) to ensure earliest detections come first
+          sorted_camera_items = sorted(camera_dict.items(), key=lambda x: x[1][1])  # Sort by 'when' (index 1 in tuple)
+
+          for camera_id, (objects, when, already_tracked) in sorted_camera_items:
+            objects_per_camera.append(objects)  # Keep objects from each camera in separate list
+            latest_when = max(latest_when, when)
+            all_already_tracked.extend(already_tracked)
+
+          # Single enqueue for aggregated camera data in this category
+          if objects_per_camera:
+            tracker.queue.put((objects_per_camera, latest_when, all_already_tracked, BATCHED_MODE))
+        else:
+          # Process each camera's data for this category separately (default behavior)
+          for camera_id, (objects, when, already_tracked) in camera_dict.items():
+            tracker.queue.put((objects, when, already_tracked, STREAMING_MODE))
 
 
 class TimeChunkedIntelLabsTracking(IntelLabsTracking):
@@ -146,7 +310,7 @@ class TimeChunkedIntelLabsTracking(IntelLabsTracking):
   def trackObjects(self, objects, already_tracked_objects, when, categories,
                    ref_camera_frame_rate, max_unreliable_time,
                    non_measurement_time_dynamic, non_measurement_time_static,
-                   use_tracker=True):
+                   use_tracker=True, source=None):
     """Override trackObjects to use time chunking"""
 
     if not use_tracker:
@@ -159,11 +323,10 @@ class TimeChunkedIntelLabsTracking(IntelLabsTracking):
     if not categories:
       categories = self.trackers.keys()
 
-    # Extract camera_id from objects - required for time chunking
-    try:
-      camera_id = objects[0].camera.cameraID
-    except (AttributeError, IndexError):
-      log.warning("No camera ID found in objects, skipping time chunking processing")
+    # Camera id is required for time chunking
+    camera_id = source
+    if camera_id is None:
+      log.warning("No camera ID given, skipping time chunking processing")
       return
 
     for category in categories:
@@ -178,7 +341,9 @@ class TimeChunkedIntelLabsTracking(IntelLabsTracking):
 
     # create time chunk processor for frames buffering
     if not hasattr(self, 'time_chunk_processor'):
-      self.time_chunk_processor = TimeChunkProcessor(self, self.time_chunking_interval_milliseconds)
+      self.time_chunk_processor = TimeChunkProcessor(self, self.time_chunking_interval_milliseconds,
+                                                     chunking_config['mode'],
+                                                     chunking_config['max_latency_ms'])
       self.time_chunk_processor.start()
 
     # delegate tracking to IntelLabsTracking
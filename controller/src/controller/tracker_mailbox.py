@@ -0,0 +1,117 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import itertools
+import time
+from collections import OrderedDict
+from threading import Condition
+
+# Scheduling policies when a frame arrives while the tracker is busy
+POLICY_MERGE = "merge"              # Keep only the latest pending frame per camera
+POLICY_DROP_OLDEST = "drop_oldest"  # Keep every frame, discard the oldest when full
+POLICY_BLOCK = "block"              # Wait for room up to a timeout, then discard the new frame
+MAILBOX_POLICIES = (POLICY_MERGE, POLICY_DROP_OLDEST, POLICY_BLOCK)
+
+DEFAULT_MAILBOX_POLICY = POLICY_MERGE
+DEFAULT_MAILBOX_SIZE = 8
+DEFAULT_MAILBOX_TIMEOUT_MS = 50
+
+# Result of TrackerMailbox.put()
+PUT_QUEUED = "queued"
+PUT_MERGED = "merged"
+PUT_DROPPED_OLDEST = "dropped_oldest"
+PUT_DROPPED = "dropped"
+
+class TrackerMailbox:
+  """! Bounded work queue between the scene and a category tracker thread.
+
+  Frames are tagged with their source (camera) so that, with the merge
+  policy, a newer frame replaces the one still pending from the same camera
+  instead of the whole frame being dropped. Provides the subset of the
+  queue.Queue interface used by the tracker threads.
+  """
+
+  def __init__(self, policy=DEFAULT_MAILBOX_POLICY, maxsize=DEFAULT_MAILBOX_SIZE,
+               timeout_ms=DEFAULT_MAILBOX_TIMEOUT_MS):
+    if policy not in MAILBOX_POLICIES:
+      raise ValueError(f"Unknown tracker mailbox policy: {policy}")
+    if maxsize <= 0:
+      raise ValueError("Tracker mailbox size must be positive.")
+    self.policy = policy
+    self.maxsize = maxsize
+    self.timeout = timeout_ms / 1000
+    self.last_wait = 0.0
+    self._pending = OrderedDict()
+    self._sequence = itertools.count()
+    self._unfinished = 0
+    self._cond = Condition()
+    return
+
+  def put(self, item, source=None, force=False):
+    """! Add a frame to the mailbox according to the policy.
+    @param   item     Work item for the tracker thread.
+    @param   source   Camera the frame came from, None if unknown.
+    @param   force    Bypass the size limit, used for the stop request.
+    @return  One of PUT_QUEUED, PUT_MERGED, PUT_DROPPED_OLDEST or PUT_DROPPED.
+    """
+    with self._cond:
+      status = PUT_QUEUED
+      key = (None, next(self._sequence))
+      if force:
+        pass
+      elif self.policy == POLICY_MERGE and source is not None:
+        key = (source, None)
+        if key in self._pending:
+          self._pending.move_to_end(key)
+          self._pending[key] = (item, time.monotonic())
+          return PUT_MERGED
+        status = self._dropOldestIfFull()
+      elif self.policy == POLICY_BLOCK:
+        if not self._cond.wait_for(lambda: len(self._pending) < self.maxsize, self.timeout):
+          return PUT_DROPPED
+      else:
+        status = self._dropOldestIfFull()
+
+      self._pending[key] = (item, time.monotonic())
+      self._unfinished += 1
+      self._cond.notify_all()
+    return status
+
+  def _dropOldestIfFull(self):
+    if len(self._pending) < self.maxsize:
+      return PUT_QUEUED
+    self._pending.popitem(last=False)
+    self._unfinished -= 1
+    return PUT_DROPPED_OLDEST
+
+  def get(self):
+    """! Remove and return the oldest pending frame, waiting for one if
+    necessary. The time the frame spent in the mailbox is kept in last_wait.
+    """
+    with self._cond:
+      self._cond.wait_for(lambda: self._pending)
+      _, (item, enqueued) = self._pending.popitem(last=False)
+      self.last_wait = time.monotonic() - enqueued
+      self._cond.notify_all()
+    return item
+
+  def task_done(self):
+    with self._cond:
+      if self._unfinished <= 0:
+        raise ValueError("task_done() called too many times")
+      self._unfinished -= 1
+      self._cond.notify_all()
+    return
+
+  def join(self):
+    with self._cond:
+      self._cond.wait_for(lambda: self._unfinished == 0)
+    return
+
+  def empty(self):
+    with self._cond:
+      return not self._pending
+
+  def qsize(self):
+    with self._cond:
+      return len(self._pending)
@@ -1,12 +1,17 @@
 # SPDX-FileCopyrightText: (C) 2022 - 2025 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
-from queue import Queue
+import time
 from threading import Thread
 
 from controller.moving_object import (DEFAULT_EDGE_LENGTH,
                                       DEFAULT_TRACKING_RADIUS, ATagObject,
                                       MovingObject)
+from controller.tracker_mailbox import (DEFAULT_MAILBOX_POLICY,
+                                       DEFAULT_MAILBOX_SIZE,
+                                       DEFAULT_MAILBOX_TIMEOUT_MS,
+                                       PUT_DROPPED, PUT_DROPPED_OLDEST,
+                                       PUT_MERGED, TrackerMailbox)
 from controller.uuid_manager import UUIDManager
 from scene_common import log
 from scene_common.options import TYPE_1
@@ -18,6 +23,13 @@ object_classes = {
   'apriltag': {'class': ATagObject}
 }
 
+# Scheduling of frames waiting for a busy category tracker, see TrackerMailbox
+mailbox_config = {
+  'policy': DEFAULT_MAILBOX_POLICY,
+  'maxsize': DEFAULT_MAILBOX_SIZE,
+  'timeout_ms': DEFAULT_MAILBOX_TIMEOUT_MS,
+}
+
 MAX_UNRELIABLE_TIME = 0.3333
 NON_MEASUREMENT_TIME_DYNAMIC = 0.2666
 NON_MEASUREMENT_TIME_STATIC = 0.5333
@@ -32,7 +44,9 @@ class Tracking(Thread):
     self.trackers = {}
     self.all_tracker_objects = self.curObjects = []
     self.already_tracked_objects = []
-    self.queue = Queue()
+    self.queue = TrackerMailbox(**mailbox_config)
+    # Seconds the last frame took to track, used to size time chunks
+    self.last_duration = 0.0
     self.uuid_manager = UUIDManager()
     return
 
@@ -48,7 +62,12 @@ class Tracking(Thread):
                    max_unreliable_time, \
                    non_measurement_time_dynamic, \
                    non_measurement_time_static, \
-                   use_tracker=True):
+                   use_tracker=True, source=None):
+    """! Hand the objects of a frame to the category trackers.
+
+    @param   source   Camera or child scene the frame came from, frames of
+                      the same source can be merged by the tracker mailbox.
+    """
 
     self._createTrackers(categories, max_unreliable_time, non_measurement_time_dynamic, non_measurement_time_static)
 
@@ -64,19 +83,28 @@ class Tracking(Thread):
         # No threading when tracker is not used. Thus creating a copy is not required.
         self.trackers[category].all_tracker_objects = self.trackers[category].curObjects = new_objects
       else:
-        queue = self.trackers[category].queue
-        if not queue.empty():
-          # Tracker specific to this category is still processing. Skip tracking objects for this category.
-          log.info("Tracker work queue is not empty", category, queue.qsize())
-          metrics_attributes = {
-            "category": category,
-            "reason": "tracker_busy"
-          }
-          metrics.inc_dropped(metrics_attributes)
-          continue
-        queue.put((new_objects, when, already_tracked_objects, STREAMING_MODE))
+        self._enqueue(category, (new_objects, when, already_tracked_objects, STREAMING_MODE),
+                      source)
     return
 
+  def _enqueue(self, category, queue_item, source):
+    """! Hand a frame to the tracker of a category. While the tracker is busy
+    the mailbox policy decides whether pending frames are merged or dropped.
+    """
+    queue = self.trackers[category].queue
+    status = queue.put(queue_item, source)
+    metrics_attributes = {
+      "category": category,
+    }
+    metrics.record_queue_depth(queue.qsize(), metrics_attributes)
+    if status == PUT_MERGED:
+      metrics.inc_merged(metrics_attributes)
+    elif status in (PUT_DROPPED, PUT_DROPPED_OLDEST):
+      log.info("Tracker work queue is full", category, queue.qsize())
+      metrics_attributes["reason"] = "tracker_busy"
+      metrics.inc_dropped(metrics_attributes)
+    return status
+
   def _updateRefCameraFrameRate(self, ref_camera_frame_rate, category):
     if ref_camera_frame_rate is not None and \
         self.trackers[category].ref_camera_frame_rate != ref_camera_frame_rate:
@@ -169,11 +197,14 @@ class Tracking(Thread):
       metrics_attributes = {
         "category": category,
       }
+      metrics.record_queue_wait(self.queue.last_wait * 1000, metrics_attributes)
       with metrics.time_tracking(metrics_attributes):
+        started = time.monotonic()
         if mode == BATCHED_MODE:
           self.trackCategoryBatched(objects, when, already_tracked_objects)
         else:
           self.trackCategory(objects, when, already_tracked_objects)
+        self.last_duration = time.monotonic() - started
         # curObjects are the results while all_tracker_objects
         # is used as a working collection inside the thread
         self.curObjects = (self.all_tracker_objects).copy()
@@ -188,7 +219,7 @@ class Tracking(Thread):
   def join(self):
     for category in self.trackers:
       tracker = self.trackers[category]
-      tracker.queue.put((None, None, None, STREAMING_MODE))
+      tracker.queue.put((None, None, None, STREAMING_MODE), force=True)
       tracker.waitForComplete()
       tracker.join()
     return
@@ -1,10 +1,15 @@
 # SPDX-FileCopyrightText: (C) 2024 - 2025 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
+import atexit
 import collections
 import concurrent.futures
+import os
+import signal
 import threading
+import weakref
 
+from controller.reid_index import LocalReIDDatabase
 from controller.vdms_adapter import VDMSDatabase
 from scene_common import log
 from scene_common.timestamp import get_epoch_time
@@ -19,17 +24,80 @@ DEFAULT_MAX_SIMILARITY_QUERIES_TRACKED = 10
 
 available_databases = {
   "VDMS": VDMSDatabase,
+  "LOCAL": LocalReIDDatabase,
 }
 
+# Re-ID database of new trackers and the keyword arguments it is created with
+database_config = {
+  'database': DEFAULT_DATABASE,
+  'options': {},
+}
+
+# Databases held in the process, one instance is shared by all trackers so
+# that every scene matches against, and snapshots, the same vectors
+shared_databases = {"LOCAL"}
+_database_instances = {}
+_database_instances_lock = threading.Lock()
+# Every database created, closed when the process exits
+_open_databases = weakref.WeakSet()
+
+def createDatabase(database, options):
+  """! Create the Re-ID database of a tracker.
+
+  @param   database  Name of the database in available_databases.
+  @param   options   Keyword arguments the database is created with.
+  @return  The process wide instance for databases in shared_databases,
+           otherwise a new instance.
+  """
+  key = (database, tuple(sorted(options.items())))
+  with _database_instances_lock:
+    if database not in shared_databases:
+      instance = available_databases[database](**options)
+    elif key in _database_instances:
+      return _database_instances[key]
+    else:
+      instance = _database_instances[key] = available_databases[database](**options)
+    _open_databases.add(instance)
+  return instance
+
+@atexit.register
+def closeDatabases():
+  """! Write what the Re-ID databases still buffer, trackers stop adding
+  entries when the process exits.
+  """
+  with _database_instances_lock:
+    databases = list(_open_databases)
+  for database in databases:
+    try:
+      database.close()
+    except Exception as e:
+      log.warn(f"Failed to close the Re-ID database: {e}")
+  return
+
+def closeDatabasesOnSignal(signum):
+  """! Close the Re-ID databases when the process is terminated by signum,
+  which skips the atexit handlers, and then let it terminate.
+  """
+  def terminate(signum, frame):
+    closeDatabases()
+    signal.signal(signum, signal.SIG_DFL)
+    os.kill(os.getpid(), signum)
+  signal.signal(signum, terminate)
+  return
+
 class UUIDManager:
-  def __init__(self, database=DEFAULT_DATABASE):
+  def __init__(self, database=None):
+    options = {}
+    if database is None:
+      database = database_config['database']
+      options = database_config['options']
     self.active_ids = {}
     self.active_ids_lock = threading.Lock()
     self.active_query = {}
     self.features_for_database = {}
     self.quality_features = {}
     self.unique_id_count = 0
-    self.reid_database = available_databases[database]()
+    self.reid_database = createDatabase(database, options)
     self.pool = concurrent.futures.ThreadPoolExecutor()
     self.similarity_query_times = collections.deque(
       maxlen=DEFAULT_MAX_SIMILARITY_QUERIES_TRACKED)
@@ -46,7 +114,7 @@ class UUIDManager:
 
     @param  tracked_objects  The objects currently tracked by the tracker
     """
-    active_tracks = [tracked_object.id for tracked_object in tracked_objects]
+    active_tracks = {tracked_object.id for tracked_object in tracked_objects}
     inactive_tracks = []
     new_active_ids = {}
     with self.active_ids_lock:
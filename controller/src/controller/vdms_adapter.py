@@ -2,37 +2,105 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import os
+import queue
 import socket
 import threading
+import time
 
 import numpy as np
 import vdms
 
+from controller.observability import metrics
 from controller.reid import ReIDDatabase
 from scene_common import log
 
 DEFAULT_HOSTNAME = os.getenv("VDMS_HOSTNAME", "vdms.scenescape.intel.com")
+DEFAULT_PORT = 55555
 DIMENSIONS = 256
 K_NEIGHBORS = 1
 SCHEMA_NAME = "reid_vector"
 SIMILARITY_METRIC = "L2"
+DEFAULT_CONNECTIONS = 4
+DEFAULT_WRITE_BATCH_SIZE = 256
+DEFAULT_WRITE_FLUSH_INTERVAL = 1.0
+
+class _ConnectionPool:
+  """! Connections to one VDMS server, handed out one query at a time. """
+
+  def __init__(self, connections):
+    self.connections = connections
+    self.idle = queue.LifoQueue()
+    for connection in connections:
+      self.idle.put(connection)
+    self.lock = threading.Lock()
+    self.connected = False
+    return
+
+  def connect(self, hostname, port):
+    with self.lock:
+      if not self.connected:
+        for connection in self.connections:
+          connection.connect(hostname, port)
+        self.connected = True
+    return
+
+# Pools by server, shared by the databases of all trackers of the process
+_pools = {}
+_pools_lock = threading.Lock()
 
 class VDMSDatabase(ReIDDatabase):
+  """! Re-ID database backed by VDMS.
+
+  Queries are spread over a pool of connections so that the concurrent
+  queries of the UUIDManager thread pool do not wait for each other. All
+  databases connecting to the same server share one pool, the size of which
+  is set by the first of them. The
+  descriptors of finished tracks are buffered and added to the database
+  together, in a single request, once write_batch_size descriptors are
+  pending or write_flush_interval seconds after the first one.
+  """
+
   def __init__(self, set_name=SCHEMA_NAME,
-               similarity_metric=SIMILARITY_METRIC, dimensions=DIMENSIONS):
-    self.db = vdms.vdms(
+               similarity_metric=SIMILARITY_METRIC, dimensions=DIMENSIONS,
+               connections=DEFAULT_CONNECTIONS, use_tls=True,
+               write_batch_size=DEFAULT_WRITE_BATCH_SIZE,
+               write_flush_interval=DEFAULT_WRITE_FLUSH_INTERVAL):
+    self.use_tls = use_tls
+    self.connection_count = max(connections, 1)
+    self.pool = None
+    self.set_name = set_name
+    self.similarity_metric = similarity_metric
+    self.dimensions = dimensions
+    self.write_batch_size = write_batch_size
+    self.write_flush_interval = write_flush_interval
+    self.pending_queries = []
+    self.pending_blobs = []
+    self.pending_lock = threading.Lock()
+    self.flush_timer = None
+    return
+
+  def _createClient(self):
+    if not self.use_tls:
+      return vdms.vdms(use_tls=False)
+    return vdms.vdms(
       use_tls=True,
       ca_cert_file="/run/secrets/certs/scenescape-ca.pem",
       client_cert_file="/run/secrets/certs/scenescape-vdms-c.crt",
       client_key_file="/run/secrets/certs/scenescape-vdms-c.key"
     )
-    self.set_name = set_name
-    self.similarity_metric = similarity_metric
-    self.dimensions = dimensions
-    self.lock = threading.Lock()
+
+  @property
+  def db(self):
+    """! First connection of the pool, replacing it gives the database a
+    pool of its own with that connection only. """
+    return self.pool.connections[0]
+
+  @db.setter
+  def db(self, value):
+    self.pool = _ConnectionPool([value])
     return
 
-  def sendQuery(self, query, blob=None):
+  def sendQuery(self, query, blob=None, operation="query"):
     """
     Helper function for handling the responses from sending queries to VDMS. There are three
     possible responses from VDMS when sending the query.
@@ -42,15 +110,25 @@ class VDMSDatabase(ReIDDatabase):
 
     @param   query      The list of queries to send to VDMS
     @param   blob       Blobs of data to send with queries (optional)
+    @param   operation  Name of the operation recorded with the query latency
     @return  responses  The response dict from VDMS
     """
     responses = []
     response_blob = []
-    with self.lock:
+    if self.pool is None:
+      log.warn(f"Not connected to VDMS container: {query}")
+      return responses, response_blob
+    connection = self.pool.idle.get()
+    start_time = time.perf_counter()
+    try:
       if blob:
-        query_response = self.db.query(query, blob)
+        query_response = connection.query(query, blob)
       else:
-        query_response = self.db.query(query)
+        query_response = connection.query(query)
+    finally:
+      self.pool.idle.put(connection)
+      metrics.record_reid_query((time.perf_counter() - start_time) * 1000,
+                                {"operation": operation})
     if query_response and query_response != "NOT CONNECTED":
       response_blob = query_response[1]
       for (item, response) in zip(query, query_response[0]):
@@ -61,9 +139,15 @@ class VDMSDatabase(ReIDDatabase):
       log.warn(f"Failed to send query to VDMS container: {query}")
     return responses, response_blob
 
-  def connect(self, hostname=DEFAULT_HOSTNAME):
+  def connect(self, hostname=DEFAULT_HOSTNAME, port=DEFAULT_PORT):
+    if self.pool is None:
+      with _pools_lock:
+        if (hostname, port) not in _pools:
+          _pools[(hostname, port)] = _ConnectionPool(
+            [self._createClient() for _ in range(self.connection_count)])
+        self.pool = _pools[(hostname, port)]
     try:
-      self.db.connect(hostname)
+      self.pool.connect(hostname, port)
       if not self.findSchema(self.set_name):
         self.addSchema(self.set_name, self.similarity_metric, self.dimensions)
       log.info(f"VDMS connection ready")
@@ -79,13 +163,17 @@ class VDMSDatabase(ReIDDatabase):
         "dimensions": dimensions
       }
     }]
-    response, _ = self.sendQuery(query)
+    response, _ = self.sendQuery(query, operation="schema")
     if response and response[0].get('status') != 0:
       log.warn(
         f"Failed to add the descriptor set to the database. Recieved response {response[0]}")
     return
 
   def addEntry(self, uuid, rvid, object_type, reid_vectors, set_name=SCHEMA_NAME):
+    """
+    Buffers the descriptors of a track until flush() adds them to the database
+    together with those of other tracks.
+    """
     query = {
       "AddDescriptor": {
         "set": f"{set_name}",
@@ -97,8 +185,32 @@ class VDMSDatabase(ReIDDatabase):
       }
     }
     blob = [[np.array(reid_vector, dtype="float32").tobytes()] for reid_vector in reid_vectors]
-    add_query = [query] * len(reid_vectors)
-    response, _ = self.sendQuery(add_query, blob)
+    with self.pending_lock:
+      self.pending_queries.extend([query] * len(reid_vectors))
+      self.pending_blobs.extend(blob)
+      full = len(self.pending_queries) >= self.write_batch_size
+      if not full and self.flush_timer is None:
+        self.flush_timer = threading.Timer(self.write_flush_interval, self.flush)
+        self.flush_timer.daemon = True
+        self.flush_timer.start()
+    if full:
+      self.flush()
+    return
+
+  def flush(self):
+    """
+    Adds all buffered descriptors to the database in a single request.
+    """
+    with self.pending_lock:
+      add_query, blob = self.pending_queries, self.pending_blobs
+      self.pending_queries, self.pending_blobs = [], []
+      if self.flush_timer is not None:
+        self.flush_timer.cancel()
+        self.flush_timer = None
+    if not add_query:
+      return
+    metrics.record_reid_write_batch(len(add_query))
+    response, _ = self.sendQuery(add_query, blob, operation="add")
     if response:
       for item in response:
         if item.get('status') != 0:
@@ -106,13 +218,21 @@ class VDMSDatabase(ReIDDatabase):
             f"Failed to add the descriptor to the database. Received response {item}")
     return
 
+  def close(self):
+    """
+    Adds the buffered descriptors to the database, flush() also stops the
+    write-behind timer.
+    """
+    self.flush()
+    return
+
   def findSchema(self, set_name):
     query = [{
       "FindDescriptorSet": {
         "set": f"{set_name}"
       }
     }]
-    response, _ = self.sendQuery(query)
+    response, _ = self.sendQuery(query, operation="schema")
     if response and response[0].get('status') == 0 and response[0].get('returned') > 0:
       return True
     return False
@@ -138,7 +258,7 @@ class VDMSDatabase(ReIDDatabase):
     }
     blob = [[np.array(reid_vector, dtype="float32").tobytes()] for reid_vector in reid_vectors]
     query = [find_query] * len(reid_vectors)
-    response, _ = self.sendQuery(query, blob)
+    response, _ = self.sendQuery(query, blob, operation="find")
     if response:
       result = [
         item.get('entities')
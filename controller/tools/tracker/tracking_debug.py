@@ -11,6 +11,7 @@ from controller.ilabs_tracking import IntelLabsTracking
 from controller.scene import Scene
 from controller.tracking import Tracking
 from scene_common.geometry import DEFAULTZ, Line, Point
+from scene_common.reid_codec import decodeReIDVector
 
 
 class SceneDebug:
@@ -35,8 +36,7 @@ class SceneDebug:
       self.reidExpired = []
       reidExp = state['reid_expired']
       for exp in reidExp:
-        vector = base64.b64decode(exp['reid'])
-        vector = np.array(struct.unpack("256f", vector)).reshape(1, -1)
+        vector = decodeReIDVector(exp['reid'])
         self.reidExpired.append(Expired(exp['timestamp'], exp['gid'], vector,
                                         exp['frame_count'], exp['first_seen']))
 
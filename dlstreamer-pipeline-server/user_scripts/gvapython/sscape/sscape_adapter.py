@@ -24,6 +24,7 @@ from sscape_policies import (
   classificationPolicy,
   ocrPolicy,
 )
+from sscape_codec import WIRE_FORMAT_BINARY, WIRE_FORMAT_JSON, encodeCameraData
 from sscape_3d_detector import Object3DChainedDataProcessor
 
 ROOT_CA = os.environ.get("ROOT_CA", "/run/secrets/certs/scenescape-ca.pem")
@@ -88,8 +89,12 @@ class PostDecodeTimestampCapture:
     return True
 
 class PostInferenceDataPublish:
-  def __init__(self, cameraid, metadatagenpolicy='detectionPolicy', publish_image=False):
+  def __init__(self, cameraid, metadatagenpolicy='detectionPolicy', publish_image=False,
+               wire_format=WIRE_FORMAT_JSON):
     self.cameraid = cameraid
+    if wire_format not in (WIRE_FORMAT_JSON, WIRE_FORMAT_BINARY):
+      raise ValueError(f"Unknown wire format {wire_format}")
+    self.wire_format = wire_format
 
     self.is_publish_image = publish_image
     self.is_publish_calibration_image = False
@@ -260,6 +265,12 @@ class PostInferenceDataPublish:
           unannotated_img['intrinsics'] = self.cam_auto_calibrate_intrinsics
         self.client.publish(f"scenescape/image/calibration/camera/{self.cameraid}", json.dumps(unannotated_img))
 
-      self.client.publish(f"scenescape/data/camera/{self.cameraid}", json.dumps(self.frame_level_data))
-      frame.add_message(json.dumps(self.frame_level_data))
+      frame_level_json = json.dumps(self.frame_level_data)
+      # Binary data has its own topic, the subscribers of the camera topic expect JSON
+      if self.wire_format == WIRE_FORMAT_BINARY:
+        self.client.publish(f"scenescape/data/camera_bin/{self.cameraid}",
+                            encodeCameraData(self.frame_level_data))
+      else:
+        self.client.publish(f"scenescape/data/camera/{self.cameraid}", frame_level_json)
+      frame.add_message(frame_level_json)
     return True
@@ -0,0 +1,84 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+# Encoder of the binary camera data format, which the controller decodes
+# with scene_common.camera_codec. That module is not available here, so the
+# layout below must be kept the same as the one described there.
+
+import base64
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b"\x93SCD"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+ALIGNMENT = 4
+
+ID_DTYPE = np.dtype("<i4")
+VALUE_DTYPE = np.dtype("<f4")
+BOX_FIELDS = ('bounding_box_px', 'center_of_mass')
+BOX_KEYS = ('x', 'y', 'width', 'height')
+
+WIRE_FORMAT_JSON = "json"
+WIRE_FORMAT_BINARY = "binary"
+
+def _reidVector(reid):
+  if isinstance(reid, (str, bytes)):
+    return np.frombuffer(base64.b64decode(reid), dtype=np.float32)
+  return np.asarray(reid, dtype=VALUE_DTYPE).reshape(-1)
+
+def _encodeCategory(category, objects):
+  count = len(objects)
+  ids = np.full(count, -1, dtype=ID_DTYPE)
+  confidence = np.full(count, np.nan, dtype=VALUE_DTYPE)
+  boxes = {field: np.full((count, len(BOX_KEYS)), np.nan, dtype=VALUE_DTYPE)
+           for field in BOX_FIELDS}
+  reid = None
+  extra = []
+  for idx, obj in enumerate(objects):
+    rest = {}
+    for key, value in obj.items():
+      if key == 'category' and value == category:
+        continue
+      if key == 'id' and type(value) == int and 0 <= value <= np.iinfo(ID_DTYPE).max:
+        ids[idx] = value
+      elif key == 'confidence' and type(value) in (int, float):
+        confidence[idx] = value
+      elif key in BOX_FIELDS and isinstance(value, dict) and value.keys() == set(BOX_KEYS):
+        boxes[key][idx] = [value[box_key] for box_key in BOX_KEYS]
+      elif key == 'reid' and value is not None:
+        vector = _reidVector(value)
+        if reid is None:
+          reid = np.full((count, len(vector)), np.nan, dtype=VALUE_DTYPE)
+        if len(vector) == reid.shape[1]:
+          reid[idx] = vector
+        else:
+          rest[key] = value
+      else:
+        rest[key] = value
+    extra.append(rest)
+
+  layout = {'name': category, 'count': count, 'reid': 0 if reid is None else reid.shape[1]}
+  if any(extra):
+    layout['extra'] = extra
+  arrays = [ids, confidence] + [boxes[field] for field in BOX_FIELDS]
+  if reid is not None:
+    arrays.append(reid)
+  return layout, arrays
+
+def encodeCameraData(jdata):
+  frame = {key: value for key, value in jdata.items() if key != 'objects'}
+  layouts = []
+  arrays = []
+  for category, objects in jdata.get('objects', {}).items():
+    layout, category_arrays = _encodeCategory(category, objects)
+    layouts.append(layout)
+    arrays.extend(category_arrays)
+
+  header = json.dumps({'frame': frame, 'categories': layouts}, separators=(',', ':')).encode('utf-8')
+  header += b" " * (-(HEADER.size + len(header)) % ALIGNMENT)
+  parts = [HEADER.pack(MAGIC, VERSION, 0, len(header)), header]
+  parts.extend(array.tobytes() for array in arrays)
+  return b"".join(parts)
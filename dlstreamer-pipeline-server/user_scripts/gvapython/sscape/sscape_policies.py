@@ -1,9 +1,10 @@
 # SPDX-FileCopyrightText: (C) 2024 - 2025 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
-import struct
 import base64
 
+import numpy as np
+
 ## Policies to post process data
 
 def detectionPolicy(pobj, item, fw, fh):
@@ -38,9 +39,9 @@ def detection3DPolicy(pobj, item, fw, fh):
 
 def reidPolicy(pobj, item, fw, fh):
   detectionPolicy(pobj, item, fw, fh)
-  reid_vector = item['tensors'][1]['data']
-  v = struct.pack("256f",*reid_vector)
-  pobj['reid'] = base64.b64encode(v).decode('utf-8')
+  # Same encoding as scene_common.reid_codec, which is not available here
+  reid_vector = np.ascontiguousarray(item['tensors'][1]['data'], dtype=np.float32)
+  pobj['reid'] = base64.b64encode(reid_vector.data).decode('utf-8')
   return
 
 def classificationPolicy(pobj, item, fw, fh):
@@ -338,8 +338,13 @@ class ACLCheck(APIView):
       log.warn("Access denied based on ACL restrictions.")
       return Response({'result': 'deny'}, status=status.HTTP_403_FORBIDDEN)
 
+    # The router narrows the ACLs down to the templates the topic can match,
+    # each of those is still matched against the topic as before.
+    candidates = PubSub.candidateTopics(currentTopic)
     matchedACL = None
     for acl in user_acls:
+      if acl.topic not in candidates:
+        continue
       templateTopic = PubSub.getTopicByTemplateName(acl.topic).template
       if PubSub.match_topic(templateTopic, currentTopic):
         matchedACL = acl
@@ -47,6 +47,8 @@ REST_FRAMEWORK = {
 
 MIDDLEWARE = [
   'django.middleware.security.SecurityMiddleware',
+  # ETags for GET replies, the scene controller refreshes scenes with conditional GETs
+  'django.middleware.http.ConditionalGetMiddleware',
   'django.contrib.sessions.middleware.SessionMiddleware',
   'django_session_timeout.middleware.SessionTimeoutMiddleware',
   'django.middleware.common.CommonMiddleware',
@@ -0,0 +1,472 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+# This file contains array based versions of the per-object geometry tests in
+# scene_common.geometry. They operate on all objects of a frame at once and are
+# expected to give exactly the same answers as their scalar counterparts.
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from scene_common.geometry import Region
+from scene_common.spatial_index import SpatialGrid
+
+# Same tolerance as LINE_IS_CLOSE in fast_geometry
+LINE_IS_CLOSE = 1e-9
+
+class BatchedRegions(ABC):
+  """! Base class for the batched tests, keeps a flattened copy of a
+  dictionary of regions and a SpatialGrid over their bounding boxes.
+
+  The arrays are only rebuilt after invalidate() is called or when the set
+  of regions changes. The grid is updated incrementally, regions whose
+  bounds did not change are left in place.
+  """
+
+  def __init__(self, cell_size=None):
+    self.keys = []
+    self.index = SpatialGrid() if cell_size is None else SpatialGrid(cell_size)
+    self._regions = ()
+    self._dirty = True
+    return
+
+  def invalidate(self):
+    """! Mark the precomputed region geometry as stale. Must be called
+    whenever the points of an existing region are modified in place.
+    """
+    self._dirty = True
+    return
+
+  def update(self, regions):
+    """! Rebuild the precomputed region geometry if it is out of date.
+
+    @param    regions    Dictionary of Region objects keyed by region id
+    """
+    if not self._dirty and len(regions) == len(self._regions) \
+       and all(a is b for a, b in zip(regions.values(), self._regions)):
+      return
+    self.keys = list(regions.keys())
+    self._regions = tuple(regions.values())
+    self._build(regions)
+    self._dirty = False
+    return
+
+  @abstractmethod
+  def _build(self, regions):
+    pass
+
+  def _updateIndex(self, bounds, indexed):
+    """! Bring the grid in line with self.keys.
+
+    @param    bounds     Array of shape (R, 4) with the bounding box of each region
+    @param    indexed    Boolean array of shape (R,), regions to keep in the grid
+    """
+    current = set(self.keys)
+    for key in [key for key in self.index.slots if key not in current]:
+      self.index.remove(key)
+    for idx, key in enumerate(self.keys):
+      if indexed[idx]:
+        self.index.insert(key, bounds[idx])
+      else:
+        self.index.remove(key)
+
+    self._slot_columns = np.full(len(self.index.slot_keys), -1, dtype=np.intp)
+    for idx, key in enumerate(self.keys):
+      if indexed[idx]:
+        self._slot_columns[self.index.slots[key]] = idx
+    return
+
+  def _candidates(self, bounds):
+    """! Candidate (query, column) pairs for an array of query boxes. """
+    query_idx, slots = self.index.query(bounds)
+    return query_idx, self._slot_columns[slots]
+
+class RegionMembership(BatchedRegions):
+  """! Batched point-in-region test for a collection of regions.
+
+  The region geometry is flattened into NumPy arrays (bounding boxes, circle
+  parameters and polygon edges) so that the locations of all objects can be
+  tested against all regions in a single pass. Each location is only tested
+  against the regions sharing a grid cell with it.
+  """
+
+  def _build(self, regions):
+    count = len(self.keys)
+
+    self._always = np.zeros(count, dtype=bool)
+    self._valid = np.zeros(count, dtype=bool)
+    self._bounds = np.zeros((count, 4))
+    self._is_circle = np.zeros(count, dtype=bool)
+    self._circles = np.zeros((count, 3))
+
+    edge_starts = []
+    edge_ends = []
+    edge_counts = np.zeros(count, dtype=np.intp)
+
+    for idx, region in enumerate(self._regions):
+      if region.area == Region.REGION_SCENE:
+        self._always[idx] = True
+        continue
+
+      bbox = region.boundingBox
+      self._bounds[idx] = (bbox.x, bbox.y, bbox.x2, bbox.y2)
+
+      if region.area == Region.REGION_CIRCLE:
+        self._valid[idx] = True
+        self._is_circle[idx] = True
+        self._circles[idx] = (region.center.x, region.center.y, region.radius)
+      elif region.area == Region.REGION_POLY and len(region.points) > 2:
+        self._valid[idx] = True
+        vertices = np.array([(pt.x, pt.y) for pt in region.points], dtype=np.float64)
+        # Same edge ordering as Polygon.isPointInside: (i, i - 1)
+        edge_starts.append(vertices)
+        edge_ends.append(np.roll(vertices, 1, axis=0))
+        edge_counts[idx] = len(vertices)
+
+    self._updateIndex(self._bounds, self._valid)
+    self._edge_counts = edge_counts
+    self._edge_offsets = np.cumsum(edge_counts) - edge_counts
+    if edge_starts:
+      self._edge_starts = np.vstack(edge_starts)
+      self._edge_ends = np.vstack(edge_ends)
+    else:
+      self._edge_starts = np.zeros((0, 2))
+      self._edge_ends = np.zeros((0, 2))
+    return
+
+  def pointsWithin(self, points):
+    """! Test every point against the regions near it.
+
+    @param    points    Array of shape (N, 2) or (N, 3) with object locations,
+                        only x and y are used.
+    @return   Boolean array of shape (N, R) where column r corresponds to
+              self.keys[r].
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim != 2:
+      points = points.reshape(-1, 2)
+    inside = np.zeros((len(points), len(self.keys)), dtype=bool)
+
+    point_idx, region_idx = self._candidates(np.hstack([points[:, :2], points[:, :2]]))
+    if len(point_idx):
+      px = points[point_idx, 0]
+      py = points[point_idx, 1]
+      bounds = self._bounds[region_idx]
+      hit = (px >= bounds[:, 0]) & (py >= bounds[:, 1]) \
+        & (px <= bounds[:, 2]) & (py <= bounds[:, 3])
+
+      circles = hit & self._is_circle[region_idx]
+      if circles.any():
+        pairs = np.flatnonzero(circles)
+        params = self._circles[region_idx[pairs]]
+        dx = np.abs(px[pairs] - params[:, 0])
+        dy = np.abs(py[pairs] - params[:, 1])
+        radius = params[:, 2]
+        hit[pairs] = (dx + dy <= radius) | (dx * dx + dy * dy <= radius * radius)
+
+      polygons = hit & ~self._is_circle[region_idx]
+      if polygons.any():
+        pairs = np.flatnonzero(polygons)
+        hit[pairs] = self._crossingParity(points, point_idx[pairs], region_idx[pairs])
+
+      inside[point_idx[hit], region_idx[hit]] = True
+
+    inside |= self._always
+    return inside
+
+  def _crossingParity(self, points, point_idx, region_idx):
+    """! Even-odd ray crossing test for (point, polygon) candidate pairs,
+    mirrors Polygon.isPointInside edge for edge.
+    """
+    counts = self._edge_counts[region_idx]
+    pair_ids = np.repeat(np.arange(len(point_idx)), counts)
+    starts = np.repeat(self._edge_offsets[region_idx], counts)
+    # Position of each edge within its polygon, 0 .. count - 1
+    local = np.arange(len(pair_ids)) - np.repeat(np.cumsum(counts) - counts, counts)
+    edges = starts + local
+
+    px = points[point_idx, 0][pair_ids]
+    py = points[point_idx, 1][pair_ids]
+    xi, yi = self._edge_starts[edges, 0], self._edge_starts[edges, 1]
+    xj, yj = self._edge_ends[edges, 0], self._edge_ends[edges, 1]
+
+    straddles = (yi > py) != (yj > py)
+    with np.errstate(divide='ignore', invalid='ignore'):
+      crosses = straddles & (px < ((xj - xi) * (py - yi) / (yj - yi) + xi))
+    parity = np.bincount(pair_ids[crosses], minlength=len(point_idx))
+    return (parity & 1).astype(bool)
+
+def segmentCrossings(lines, segments):
+  """! Crossing direction of each line with each segment, mirrors the
+  test done by Tripwire.lineCrosses for a single segment.
+
+  @param    lines       Array of shape (..., 2, 2), start and end point per line
+  @param    segments    Array of shape (..., 2, 2) broadcastable against lines
+  @return   int8 array with the broadcast shape, +1 or -1 depending on which
+            side of the segment the line ends on, 0 where they do not cross.
+  """
+  lines = np.asarray(lines, dtype=np.float64)
+  segments = np.asarray(segments, dtype=np.float64)
+  x1, y1 = lines[..., 0, 0], lines[..., 0, 1]
+  x2, y2 = lines[..., 1, 0], lines[..., 1, 1]
+  x3, y3 = segments[..., 0, 0], segments[..., 0, 1]
+  x4, y4 = segments[..., 1, 0], segments[..., 1, 1]
+
+  denominator = (y4 - y3) * (x2 - x1) - (x4 - x3) * (y2 - y1)
+  # Parallel lines divide by zero here, they are masked out below
+  with np.errstate(divide='ignore', invalid='ignore'):
+    ua = ((x4 - x3) * (y1 - y3) - (y4 - y3) * (x1 - x3)) / denominator
+    ix = x1 + ua * (x2 - x1)
+    iy = y1 + ua * (y2 - y1)
+    crosses = (np.abs(denominator) > LINE_IS_CLOSE) \
+      & _isPointOnLine(ix, iy, x1, y1, x2, y2) \
+      & _isPointOnLine(ix, iy, x3, y3, x4, y4)
+  direction = (x2 - x3) * (y4 - y3) - (y2 - y3) * (x4 - x3)
+  return np.where(crosses, np.copysign(1, direction), 0).astype(np.int8)
+
+def _isPointOnLine(px, py, x1, y1, x2, y2):
+  """! Array version of Line.isPointOnLine. """
+  in_bounds = (np.minimum(x1, x2) <= px) & (px <= np.maximum(x1, x2)) \
+    & (np.minimum(y1, y2) <= py) & (py <= np.maximum(y1, y2))
+  cross_product = (py - y1) * (x2 - x1) - (px - x1) * (y2 - y1)
+  return in_bounds & (np.abs(cross_product) <= LINE_IS_CLOSE)
+
+class TripwireCrossings(BatchedRegions):
+  """! Batched Tripwire.lineCrosses for a collection of tripwires.
+
+  The segments of all tripwires are stacked into a single array. Object
+  motion segments are only tested against the tripwires whose extent shares
+  a grid cell with them; a crossing point lies inside both bounding boxes so
+  this never misses a crossing.
+  """
+
+  def _build(self, tripwires):
+    count = len(self.keys)
+    self._bounds = np.zeros((count, 4))
+    self._valid = np.zeros(count, dtype=bool)
+    segments = []
+    segment_counts = np.zeros(count, dtype=np.intp)
+
+    for idx, tripwire in enumerate(self._regions):
+      if len(tripwire.points) < 2:
+        continue
+      vertices = np.array([(pt.x, pt.y) for pt in tripwire.points], dtype=np.float64)
+      segments.append(np.stack([vertices[:-1], vertices[1:]], axis=1))
+      segment_counts[idx] = len(vertices) - 1
+      self._bounds[idx] = (*vertices.min(axis=0), *vertices.max(axis=0))
+      self._valid[idx] = True
+
+    self._updateIndex(self._bounds, self._valid)
+    self._segment_counts = segment_counts
+    self._segment_offsets = np.cumsum(segment_counts) - segment_counts
+    self._segments = np.vstack(segments) if segments else np.zeros((0, 2, 2))
+    return
+
+  def directions(self, lines):
+    """! Crossing direction of every line with every tripwire.
+
+    @param    lines    Array of shape (N, 2, 2) with the start and end point
+                       of each object's motion segment.
+    @return   int8 array of shape (N, T) where column t corresponds to
+              self.keys[t], holding the value Tripwire.lineCrosses would return.
+    """
+    lines = np.asarray(lines, dtype=np.float64).reshape(-1, 2, 2)
+    result = np.zeros((len(lines), len(self.keys)), dtype=np.int8)
+    line_idx, tripwire_idx = self._candidates(
+      np.hstack([lines.min(axis=1), lines.max(axis=1)]))
+    if not len(line_idx):
+      return result
+
+    counts = self._segment_counts[tripwire_idx]
+    pair_ids = np.repeat(np.arange(len(line_idx)), counts)
+    local = np.arange(len(pair_ids)) - np.repeat(np.cumsum(counts) - counts, counts)
+    segments = self._segments[np.repeat(self._segment_offsets[tripwire_idx], counts) + local]
+    crossings = segmentCrossings(lines[line_idx[pair_ids]], segments)
+
+    # lineCrosses reports the first segment that is crossed
+    crossed = np.flatnonzero(crossings)
+    pairs, first = np.unique(pair_ids[crossed], return_index=True)
+    result[line_idx[pairs], tripwire_idx[pairs]] = crossings[crossed[first]]
+    return result
+
+def quaternionsToMatrices(quaternions):
+  """! Rotation matrices of an array of quaternions.
+
+  @param    quaternions    Array of shape (N, 4) in scalar last (x, y, z, w)
+                           order, as used for object rotations. They do not
+                           need to be normalized.
+  @return   Array of shape (N, 3, 3)
+  """
+  quaternions = np.asarray(quaternions, dtype=np.float64).reshape(-1, 4)
+  norms = np.linalg.norm(quaternions, axis=1, keepdims=True)
+  x, y, z, w = (quaternions / np.where(norms > 0, norms, 1)).T
+  return np.stack([
+    np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)], axis=-1),
+    np.stack([2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)], axis=-1),
+    np.stack([2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)], axis=-1),
+  ], axis=1)
+
+def objectBoxes(objects):
+  """! Flatten the oriented boxes of objects, as built by createObjectMesh,
+  into arrays.
+
+  @param    objects    Objects with sceneLoc, size and rotation attributes
+  @return   Tuple (locations, sizes, rotations, valid) with arrays of shape
+            (N, 3), (N, 3), (N, 4) and (N,). valid is False for objects
+            createObjectMesh would reject.
+  """
+  count = len(objects)
+  locations = np.zeros((count, 3))
+  sizes = np.zeros((count, 3))
+  rotations = np.zeros((count, 4))
+  rotations[:, 3] = 1
+  valid = np.zeros(count, dtype=bool)
+  for idx, obj in enumerate(objects):
+    location = getattr(obj, 'sceneLoc', None)
+    size = getattr(obj, 'size', None)
+    rotation = getattr(obj, 'rotation', None)
+    if not hasattr(location, 'asNumpyCartesian') \
+       or not isinstance(size, (list, tuple, np.ndarray)) or len(size) != 3 \
+       or not isinstance(rotation, (list, tuple, np.ndarray)) or len(rotation) != 4:
+      continue
+    try:
+      locations[idx] = location.asNumpyCartesian
+      sizes[idx] = size
+      rotations[idx] = rotation
+    except (TypeError, ValueError):
+      continue
+    valid[idx] = True
+  return locations, sizes, rotations, valid
+
+def boxesIntersectPrisms(centers, axes, half_sizes, triangles, heights):
+  """! Separating axis test between oriented boxes and vertical triangular
+  prisms, one pair per row. Both are treated as solids and touching counts
+  as intersecting.
+
+  @param    centers       Array of shape (P, 3), box centers
+  @param    axes          Array of shape (P, 3, 3), axes[:, i] is the unit
+                          direction of the i-th box edge
+  @param    half_sizes    Array of shape (P, 3), half the box edge lengths
+  @param    triangles     Array of shape (P, 3, 2), prism base in the z=0 plane
+  @param    heights       Array of shape (P,), prisms span z in [0, height]
+  @return   Boolean array of shape (P,)
+  """
+  count = len(centers)
+  edges = np.roll(triangles, -1, axis=1) - triangles
+  edges = np.concatenate([edges, np.zeros((count, 3, 1))], axis=2)
+  up = np.broadcast_to(np.array([0.0, 0.0, 1.0]), (count, 1, 3))
+
+  # Face normals of both solids, then the cross products of their edge
+  # directions. Parallel edges give zero axes, which never separate.
+  prism_edges = np.concatenate([edges, up], axis=1)
+  cross = np.cross(prism_edges[:, :, None, :], axes[:, None, :, :]).reshape(count, 12, 3)
+  candidates = np.concatenate([up, np.cross(edges, up), axes, cross], axis=1)
+
+  box_center = np.einsum('pkj,pj->pk', candidates, centers)
+  box_radius = np.einsum('pki,pi->pk', np.abs(np.einsum('pkj,pij->pki', candidates, axes)),
+                         half_sizes)
+
+  vertices = np.concatenate([
+    np.concatenate([triangles, np.zeros((count, 3, 1))], axis=2),
+    np.concatenate([triangles, np.broadcast_to(heights[:, None, None], (count, 3, 1))], axis=2),
+  ], axis=1)
+  projected = np.einsum('pkj,pvj->pkv', candidates, vertices)
+
+  separated = (box_center + box_radius < projected.min(axis=2) - LINE_IS_CLOSE) \
+    | (box_center - box_radius > projected.max(axis=2) + LINE_IS_CLOSE)
+  return ~separated.any(axis=1)
+
+class VolumetricIntersections(BatchedRegions):
+  """! Batched box-versus-region test for the volumetric regions of a
+  collection, the analytic counterpart of intersecting the meshes built by
+  createObjectMesh and createRegionMesh.
+
+  Each volumetric region is extruded from its buffered base polygon to its
+  height. The base is split into triangles once, when the regions are
+  built, so that every piece is convex and the separating axis theorem
+  applies. Objects are only tested against the regions sharing a grid cell
+  with the footprint of their box.
+  """
+
+  def _build(self, regions):
+    import mapbox_earcut as earcut
+    from scene_common.mesh_util import createBasePolygon
+
+    count = len(self.keys)
+    self._bounds = np.zeros((count, 4))
+    self._valid = np.zeros(count, dtype=bool)
+    triangles = []
+    heights = []
+    triangle_counts = np.zeros(count, dtype=np.intp)
+
+    for idx, region in enumerate(self._regions):
+      if not getattr(region, 'compute_intersection', False) \
+         or region.area != Region.REGION_POLY or len(region.points) < 3:
+        continue
+      base = np.array(createBasePolygon(region.points, region.buffer_size), dtype=np.float64)
+      if len(base) > 1 and np.array_equal(base[0], base[-1]):
+        base = base[:-1]
+      indices = np.asarray(earcut.triangulate_float64(base, np.array([len(base)])),
+                           dtype=np.intp).reshape(-1, 3)
+      if not len(indices):
+        continue
+      triangles.append(base[indices])
+      heights.append(np.full(len(indices), region.height))
+      triangle_counts[idx] = len(indices)
+      self._bounds[idx] = (*base.min(axis=0), *base.max(axis=0))
+      self._valid[idx] = True
+
+    self._updateIndex(self._bounds, self._valid)
+    self._triangle_counts = triangle_counts
+    self._triangle_offsets = np.cumsum(triangle_counts) - triangle_counts
+    self._triangles = np.vstack(triangles) if triangles else np.zeros((0, 3, 2))
+    self._heights = np.concatenate(heights) if heights else np.zeros(0)
+    return
+
+  @property
+  def active(self):
+    """! True if any region of the last update() is volumetric. """
+    return bool(self._valid.any())
+
+  def boxesIntersecting(self, locations, sizes, rotations, exclude=None):
+    """! Test oriented object boxes against every volumetric region.
+
+    @param    locations    Array of shape (N, 3), center of the bottom face
+    @param    sizes        Array of shape (N, 3), box width, depth and height
+    @param    rotations    Array of shape (N, 4), quaternions (x, y, z, w)
+    @param    exclude      Optional boolean array of shape (N, R), pairs
+                           that need not be tested, they are left False.
+    @return   Boolean array of shape (N, R) where column r corresponds to
+              self.keys[r].
+    """
+    locations = np.asarray(locations, dtype=np.float64).reshape(-1, 3)
+    sizes = np.asarray(sizes, dtype=np.float64).reshape(-1, 3)
+    result = np.zeros((len(locations), len(self.keys)), dtype=bool)
+    if not len(locations) or not self._valid.any():
+      return result
+
+    axes = np.swapaxes(quaternionsToMatrices(rotations), 1, 2)
+    half_sizes = sizes / 2
+    centers = locations + axes[:, 2] * half_sizes[:, 2:]
+    extents = np.abs(axes).transpose(0, 2, 1) @ half_sizes[:, :, None]
+    footprints = np.hstack([centers[:, :2] - extents[:, :2, 0], centers[:, :2] + extents[:, :2, 0]])
+
+    box_idx, region_idx = self._candidates(footprints)
+    if exclude is not None and len(box_idx):
+      keep = ~exclude[box_idx, region_idx]
+      box_idx, region_idx = box_idx[keep], region_idx[keep]
+    if not len(box_idx):
+      return result
+
+    counts = self._triangle_counts[region_idx]
+    pair_ids = np.repeat(np.arange(len(box_idx)), counts)
+    local = np.arange(len(pair_ids)) - np.repeat(np.cumsum(counts) - counts, counts)
+    pieces = np.repeat(self._triangle_offsets[region_idx], counts) + local
+    boxes = box_idx[pair_ids]
+    hits = boxesIntersectPrisms(centers[boxes], axes[boxes], half_sizes[boxes],
+                                self._triangles[pieces], self._heights[pieces])
+
+    hit = np.bincount(pair_ids[hits], minlength=len(box_idx)).astype(bool)
+    result[box_idx[hit], region_idx[hit]] = True
+    return result
@@ -0,0 +1,226 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+# Binary encoding of the detector messages, published on the binary camera
+# data topic as an alternative to JSON on the camera data topic, whose
+# subscribers such as the web UI expect JSON. A payload is a fixed header, a
+# JSON document with the frame level fields and the layout of each category,
+# and then, for each category in order, the arrays:
+#
+#   id               int32   (count,)
+#   confidence       float32 (count,)
+#   bounding_box_px  float32 (count, 4)  x, y, width, height
+#   center_of_mass   float32 (count, 4)  x, y, width, height
+#   reid             float32 (count, dimensions), when dimensions > 0
+#
+# all little endian and 4 byte aligned. Missing values are stored as -1 ids
+# and NaN floats. Fields of an object that do not fit in the arrays travel in
+# the JSON document. Floats are rounded to float32, e.g. a confidence of
+# 0.87 is decoded as 0.8700000047683716. Payloads start with MAGIC, which
+# can not start a UTF-8 JSON document.
+#
+# The controller builds the detector message from the arrays without
+# parsing JSON for the objects, and keeps the Re-ID vectors as arrays, so
+# they are never base64 encoded and decoded on their way to the tracker.
+
+import json
+import math
+import struct
+
+import numpy as np
+
+from scene_common.reid_codec import decodeReIDVector
+
+MAGIC = b"\x93SCD"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+ALIGNMENT = 4
+
+ID_DTYPE = np.dtype("<i4")
+VALUE_DTYPE = np.dtype("<f4")
+BOX_FIELDS = ('bounding_box_px', 'center_of_mass')
+BOX_KEYS = ('x', 'y', 'width', 'height')
+# Fields the detector schema requires an object to have one of
+LOCATION_KEYS = ('bounding_box', 'bounding_box_px', 'translation', 'lat_long_alt')
+
+def isEncodedCameraData(payload):
+  """! Tells a binary camera message from a JSON one. """
+  return payload[:len(MAGIC)] == MAGIC
+
+def _reidVector(reid):
+  if isinstance(reid, (str, bytes)):
+    return decodeReIDVector(reid)[0]
+  return np.asarray(reid, dtype=VALUE_DTYPE).reshape(-1)
+
+def _encodeCategory(category, objects):
+  count = len(objects)
+  ids = np.full(count, -1, dtype=ID_DTYPE)
+  confidence = np.full(count, np.nan, dtype=VALUE_DTYPE)
+  boxes = {field: np.full((count, len(BOX_KEYS)), np.nan, dtype=VALUE_DTYPE)
+           for field in BOX_FIELDS}
+  reid = None
+  extra = []
+  for idx, obj in enumerate(objects):
+    rest = {}
+    for key, value in obj.items():
+      if key == 'category' and value == category:
+        continue
+      if key == 'id' and type(value) == int and 0 <= value <= np.iinfo(ID_DTYPE).max:
+        ids[idx] = value
+      elif key == 'confidence' and type(value) in (int, float):
+        confidence[idx] = value
+      elif key in BOX_FIELDS and isinstance(value, dict) and value.keys() == set(BOX_KEYS):
+        boxes[key][idx] = [value[box_key] for box_key in BOX_KEYS]
+      elif key == 'reid' and value is not None:
+        vector = _reidVector(value)
+        if reid is None:
+          reid = np.full((count, len(vector)), np.nan, dtype=VALUE_DTYPE)
+        if len(vector) == reid.shape[1]:
+          reid[idx] = vector
+        else:
+          rest[key] = value
+      else:
+        rest[key] = value
+    extra.append(rest)
+
+  layout = {'name': category, 'count': count, 'reid': 0 if reid is None else reid.shape[1]}
+  if any(extra):
+    layout['extra'] = extra
+  arrays = [ids, confidence] + [boxes[field] for field in BOX_FIELDS]
+  if reid is not None:
+    arrays.append(reid)
+  return layout, arrays
+
+def encodeCameraData(jdata):
+  """! Encodes a detector message in the binary camera data format.
+
+  @param   jdata     Detector message, with objects grouped by category.
+  @return  Encoded message as bytes.
+  """
+  frame = {key: value for key, value in jdata.items() if key != 'objects'}
+  layouts = []
+  arrays = []
+  for category, objects in jdata.get('objects', {}).items():
+    layout, category_arrays = _encodeCategory(category, objects)
+    layouts.append(layout)
+    arrays.extend(category_arrays)
+
+  header = json.dumps({'frame': frame, 'categories': layouts}, separators=(',', ':')).encode('utf-8')
+  # JSON allows trailing whitespace, which aligns the arrays that follow
+  header += b" " * (-(HEADER.size + len(header)) % ALIGNMENT)
+  parts = [HEADER.pack(MAGIC, VERSION, 0, len(header)), header]
+  parts.extend(array.tobytes() for array in arrays)
+  return b"".join(parts)
+
+def _isCount(value):
+  return type(value) == int and value >= 0
+
+def _checkHeader(header):
+  """! Checks the JSON document of a payload has the structure written by
+  encodeCameraData(), so that decoding fails with ValueError only.
+  """
+  if not isinstance(header, dict) or not isinstance(header.get('frame'), dict) \
+     or not isinstance(header.get('categories'), list):
+    raise ValueError("Camera data header lacks the frame or the categories")
+  for layout in header['categories']:
+    if not isinstance(layout, dict) or not isinstance(layout.get('name'), str) \
+       or not _isCount(layout.get('count')) or not _isCount(layout.get('reid')):
+      raise ValueError("Invalid category layout in camera data header")
+    extra = layout.get('extra')
+    if extra is not None and (not isinstance(extra, list) or len(extra) != layout['count']
+                  or not all(isinstance(rest, dict) for rest in extra)):
+      raise ValueError("Invalid object fields in camera data header")
+  return
+
+def decodeCameraData(payload):
+  """! Decodes a message in the binary camera data format.
+
+  The arrays are read-only views on the payload.
+
+  @param   payload   Encoded message as bytes.
+  @return  The frame level fields of the message, with 'objects' mapping
+           each category to a dict of the arrays 'id', 'confidence',
+           'bounding_box_px', 'center_of_mass' and 'reid' (None without
+           Re-ID vectors), and 'extra', the other fields of each object.
+  @throws  ValueError if the payload is not a supported encoded message.
+  """
+  if len(payload) < HEADER.size:
+    raise ValueError("Camera data payload is too short")
+  magic, version, _, header_length = HEADER.unpack_from(payload)
+  if magic != MAGIC:
+    raise ValueError("Not an encoded camera data payload")
+  if version != VERSION:
+    raise ValueError(f"Unsupported camera data version {version}")
+  offset = HEADER.size + header_length
+  header = json.loads(bytes(payload[HEADER.size:offset]))
+  _checkHeader(header)
+
+  def take(dtype, count, width=0):
+    nonlocal offset
+    array = np.frombuffer(payload, dtype=dtype, count=count * (width or 1), offset=offset)
+    offset += array.nbytes
+    return array.reshape(count, width) if width else array
+
+  jdata = header['frame']
+  jdata['objects'] = {}
+  for layout in header['categories']:
+    count = layout['count']
+    detections = {
+      'id': take(ID_DTYPE, count),
+      'confidence': take(VALUE_DTYPE, count),
+    }
+    for field in BOX_FIELDS:
+      detections[field] = take(VALUE_DTYPE, count, len(BOX_KEYS))
+    detections['reid'] = take(VALUE_DTYPE, count, layout['reid']) if layout['reid'] else None
+    detections['extra'] = layout.get('extra') or [{} for _ in range(count)]
+    jdata['objects'][layout['name']] = detections
+  if offset != len(payload):
+    raise ValueError("Camera data payload does not match its layout")
+  return jdata
+
+def cameraDataToMessage(jdata):
+  """! Turns decoded camera data into the detector message the controller
+  processes. Re-ID vectors stay float32 arrays of shape (1, dimensions), as
+  decodeReIDVector() returns them, instead of being base64 encoded again.
+  Other fields are what the JSON encoding of the same data would parse to.
+
+  @param   jdata     Camera data from decodeCameraData().
+  @return  Detector message, with objects grouped by category.
+  @throws  ValueError if an object has neither a bounding box nor a
+           location, or array values the detector schema does not allow.
+  """
+  message = {key: value for key, value in jdata.items() if key != 'objects'}
+  message['objects'] = {}
+  for category, detections in jdata['objects'].items():
+    ids = detections['id'].tolist()
+    confidence = detections['confidence'].tolist()
+    boxes = [(field, detections[field].tolist()) for field in BOX_FIELDS]
+    reid = detections['reid']
+    if reid is not None:
+      # One copy per category, the payload is not kept alive by the tracked objects
+      reid = np.array(reid)
+    has_reid = [False] * len(ids) if reid is None else (~np.isnan(reid[:, 0])).tolist()
+    objects = []
+    for idx, rest in enumerate(detections['extra']):
+      obj = {'category': category}
+      if ids[idx] >= 0:
+        obj['id'] = ids[idx]
+      if not math.isnan(confidence[idx]):
+        if not 0 < confidence[idx] < math.inf:
+          raise ValueError(f"Invalid confidence of object {idx} of {category}")
+        obj['confidence'] = confidence[idx]
+      for field, values in boxes:
+        x, y, width, height = values[idx]
+        if not math.isnan(x):
+          if not (width >= 0 and height >= 0):
+            raise ValueError(f"Invalid {field} of object {idx} of {category}")
+          obj[field] = {'x': x, 'y': y, 'width': width, 'height': height}
+      if has_reid[idx]:
+        obj['reid'] = reid[idx:idx + 1]
+      if rest:
+        obj.update(rest)
+      if 'bounding_box_px' not in obj and not any(key in obj for key in LOCATION_KEYS):
+        raise ValueError(f"Object {idx} of {category} has no bounding box or location")
+      objects.append(obj)
+    message['objects'][category] = objects
+  return message
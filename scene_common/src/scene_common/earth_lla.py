@@ -93,6 +93,46 @@ def convertECEFToLLA(ecef_pt):
 
   return np.array([np.rad2deg(lat), np.rad2deg(long), altitude])
 
+def convertECEFToLLABatch(ecef_pts):
+  """! Array version of convertECEFToLLA, converts all points at once.
+  @param      ecef_pts         Array of shape (N, 3) in ECEF format [X, Y, Z]
+  @returns    numpy.ndarray    Array of shape (N, 3) in LLA format [latitude, longitude, altitude]
+  """
+  ecef_pts = np.asarray(ecef_pts, dtype=np.float64).reshape(-1, 3)
+  X, Y, Z = ecef_pts.T
+
+  # Vermeille's closed form solution, exact outside of a small region
+  # around the center of the earth
+  # https://doi.org/10.1007/s00190-002-0273-6
+  a_sq = EQUATORIAL_RADIUS**2
+  e_sq = 1 - POLAR_RADIUS**2/a_sq
+  e_4 = e_sq**2
+  p_xy = np.hypot(X, Y)
+  with np.errstate(divide='ignore', invalid='ignore'):
+    p = p_xy**2/a_sq
+    q = (1 - e_sq)*Z**2/a_sq
+    r = (p + q - e_4)/6
+    s = e_4*p*q/(4*r**3)
+    t = np.cbrt(1 + s + np.sqrt(s*(2 + s)))
+    u = r*(1 + t + 1/t)
+    v = np.sqrt(u**2 + e_4*q)
+    w = e_sq*(u + v - q)/(2*v)
+    k = np.sqrt(u + v + w**2) - w
+    D = k*p_xy/(k + e_sq)
+    D_Z = np.hypot(D, Z)
+    lat = 2*np.arctan2(Z, D + D_Z)
+    altitude = (k + e_sq - 1)/k*D_Z
+
+    # Same fallback as convertECEFToLLA, earth as sphere
+    fallback = ~(np.isfinite(lat) & np.isfinite(altitude))
+    if fallback.any():
+      R = np.linalg.norm(ecef_pts[fallback], axis=1)
+      lat[fallback] = np.arcsin(Z[fallback]/R)
+      altitude[fallback] = R - SPHERICAL_RADIUS
+  long = np.arctan2(Y, X)
+
+  return np.column_stack([np.rad2deg(lat), np.rad2deg(long), altitude])
+
 def convertToCartesianTRS(from_pts, to_pts):
   # Needs 3 point pairs, reliable with 4+
   (tr_mat, scale) = cv2.estimateAffine3D(from_pts, to_pts, force_rotation=False)
@@ -112,6 +152,36 @@ def convertXYZToLLA(trs_mat, map_pt):
   ecef_pt = np.matmul(trs_mat, np.hstack([map_pt, 1]).T)[:3]
   return convertECEFToLLA(ecef_pt)
 
+def convertXYZToLLABatch(trs_mat, map_pts):
+  """! Array version of convertXYZToLLA.
+  @param      trs_mat          TRS matrix from map to ECEF coordinates
+  @param      map_pts          Array of shape (N, 3) with map points
+  @returns    numpy.ndarray    Array of shape (N, 3) in LLA format
+  """
+  map_pts = np.asarray(map_pts, dtype=np.float64).reshape(-1, 3)
+  ecef_pts = map_pts @ trs_mat[:3, :3].T + trs_mat[:3, 3]
+  return convertECEFToLLABatch(ecef_pts)
+
+def calculateHeadingBatch(trs_mat, map_pts, velocities):
+  """! Array version of calculateHeading, the locations and velocity end
+  points of all objects are converted in a single call.
+  @param      trs_mat          TRS matrix from map to ECEF coordinates
+  @param      map_pts          Array of shape (N, 3) with map points
+  @param      velocities       Array of shape (N, 3) with velocities at map_pts
+  @returns    numpy.ndarray    Array of shape (N,) with headings in degrees
+  """
+  map_pts = np.asarray(map_pts, dtype=np.float64).reshape(-1, 3)
+  velocities = np.asarray(velocities, dtype=np.float64).reshape(-1, 3)
+  lla_pts = np.deg2rad(convertXYZToLLABatch(trs_mat, np.vstack([map_pts, map_pts + velocities]))[:, :2])
+  lat_a, long_a = lla_pts[:len(map_pts)].T
+  lat_b, long_b = lla_pts[len(map_pts):].T
+  long_diff = long_b - long_a
+
+  x = np.cos(lat_b) * np.sin(long_diff)
+  y = np.cos(lat_a) * np.sin(lat_b) - np.sin(lat_a) * np.cos(lat_b) * np.cos(long_diff)
+  bearing = np.arctan2(x, y)
+  return np.rad2deg(bearing) % 360
+
 def calculateHeading(trs_mat, map_pt, velocity):
   # Implemented Simple Version, assumes spherical:
   # --https://towardsdatascience.com/calculating-the-bearing-between-two-geospatial-coordinates-66203f57e4b4
@@ -8,6 +8,7 @@ import re
 import struct
 import threading
 from enum import Enum, auto
+from functools import lru_cache
 from string import Template
 
 from scene_common import log
@@ -17,6 +18,7 @@ from scene_common import log
 TOPIC_BASE = "scenescape"
 CHUNK_HEADER = "> LLHH"
 CHUNK_SIZE = 1024 * 1024
+TOPIC_CACHE_SIZE = 4096
 
 class _Topic(Enum):
   CHANNEL = auto()
@@ -26,6 +28,7 @@ class _Topic(Enum):
   CMD_SCENE_UPDATE = auto()
   DATA_AUTOCALIB_CAM_POSE = auto()
   DATA_CAMERA = auto()
+  DATA_CAMERA_BIN = auto()
   DATA_EXTERNAL = auto()
   DATA_REGION = auto()
   DATA_REGULATED = auto()
@@ -37,6 +40,101 @@ class _Topic(Enum):
   SYS_CHILDSCENE_STATUS = auto()
   ANALYTICS_CLUSTERS = auto()
 
+class TopicRouter:
+  """! Matches topic strings against a set of topic templates.
+
+  The templates are compiled once into a trie keyed by topic segment, with
+  variables as wildcard edges, so matching costs one dictionary lookup per
+  segment regardless of the number of templates. Results for recently seen
+  topics are kept in an LRU cache, which makes the per-message cost a single
+  lookup for the steady stream of topics from a fixed set of cameras.
+  """
+
+  _VARIABLE = object()
+
+  def __init__(self, templates, cache_size=TOPIC_CACHE_SIZE, fold_case=False):
+    self.fold_case = fold_case
+    self.root = {}
+    for order, (topic_id, templ) in enumerate(templates.items()):
+      node = self.root
+      names = []
+      static = 0
+      for element in self._split(templ.template):
+        if element.startswith("$"):
+          names.append(element[2:-1])
+          element = self._VARIABLE
+        else:
+          names.append(None)
+          static += 1
+        node = node.setdefault(element, {})
+      # Prefer the template with the most static segments, then the first one
+      node.setdefault(None, []).append((-static, order, topic_id, tuple(names)))
+      node[None].sort()
+    self._lookup = lru_cache(maxsize=cache_size)(self._match)
+    self._lookupAll = lru_cache(maxsize=cache_size)(self._matchAll)
+    return
+
+  def parse(self, topic_string):
+    """! Parses a topic into a dictionary with the matching template as
+    _topic_id and the values of its named identifiers.
+    @param   topic_string   Topic to parse.
+    @return  Dictionary owned by the caller, or None if no template matches.
+    """
+    parsed = self._lookup(topic_string)
+    if parsed is None:
+      return None
+    return dict(parsed)
+
+  def candidates(self, topic_string):
+    """! Lists every template a topic matches, not only the best one.
+    @param   topic_string   Topic to match.
+    @return  Tuple of the matching templates, most static segments first.
+    """
+    return self._lookupAll(topic_string)
+
+  def _split(self, topic_string):
+    if self.fold_case:
+      topic_string = topic_string.lower()
+    return topic_string.split('/')
+
+  def _walk(self, topic_split):
+    leaves = []
+    stack = [(self.root, 0)]
+    while stack:
+      node, depth = stack.pop()
+      if depth == len(topic_split):
+        leaves.extend(node.get(None, ()))
+        continue
+      element = topic_split[depth]
+      # Like the template regex, a variable never matches an empty segment
+      if element and self._VARIABLE in node:
+        stack.append((node[self._VARIABLE], depth + 1))
+      if element in node:
+        stack.append((node[element], depth + 1))
+    return leaves
+
+  def _match(self, topic_string):
+    leaves = self._walk(self._split(topic_string))
+    if not leaves:
+      return None
+    best = min(leaves)
+    parsed = {"_topic_id": best[2]}
+    for name, element in zip(best[3], topic_string.split('/')):
+      if name is not None:
+        parsed[name] = element
+    return parsed
+
+  def _matchAll(self, topic_string):
+    return tuple(leaf[2] for leaf in sorted(self._walk(self._split(topic_string))))
+
+  def cacheInfo(self):
+    return self._lookup.cache_info()
+
+  def clearCache(self):
+    self._lookup.cache_clear()
+    self._lookupAll.cache_clear()
+    return
+
 # Really gross way to put above constants directly into PubSub class
 class _PubSubTopicBase:
   pass
@@ -53,6 +151,7 @@ class PubSub(_PubSubTopicBase):
     _Topic.CMD_SCENE_UPDATE: Template(TOPIC_BASE + "/cmd/scene/update/${scene_id}"),
     _Topic.DATA_AUTOCALIB_CAM_POSE: Template(TOPIC_BASE + "/autocalibration/camera/pose/${camera_id}"),
     _Topic.DATA_CAMERA: Template(TOPIC_BASE + "/data/camera/${camera_id}"),
+    _Topic.DATA_CAMERA_BIN: Template(TOPIC_BASE + "/data/camera_bin/${camera_id}"),
     _Topic.DATA_EXTERNAL: Template(TOPIC_BASE + "/external/${scene_id}/${thing_type}"),
     _Topic.DATA_REGION: Template(TOPIC_BASE + "/data/region/${scene_id}/${region_id}/${thing_type}"),
     _Topic.DATA_REGULATED: Template(TOPIC_BASE + "/regulated/scene/${scene_id}"),
@@ -126,19 +225,7 @@ class PubSub(_PubSubTopicBase):
     if template == topic:
       return topic
 
-    regex = re.escape(template)
-    regex = regex.replace(r'\$\{thing_type\}', r'([^/]+)')
-    regex = regex.replace(r'\$\{camera_id\}', r'([^/]+)')
-    regex = regex.replace(r'\$\{scene_id\}', r'([^/]+)')
-    regex = regex.replace(r'\$\{channel\}', r'([^/]+)')
-    regex = regex.replace(r'\$\{scene_name\}', r'([^/]+)')
-    regex = regex.replace(r'\$\{region_id\}', r'([^/]+)')
-    regex = regex.replace(r'\$\{sensor_id\}', r'([^/]+)')
-    regex = regex.replace(r'\$\{region_type\}', r'([^/]+)')
-    regex = regex.replace(r'\$\{event_type\}', r'([^/]+)')
-    pattern = re.compile(f'^{regex}$', re.IGNORECASE)
-
-    match = pattern.fullmatch(topic)
+    match = _templatePattern(template).fullmatch(topic)
     if match:
       return match.groups()
     return None
@@ -286,35 +373,15 @@ class PubSub(_PubSubTopicBase):
        named identifiers and the values they were set to.
     """
 
-    topic_split = topic_string.split('/')
-    best_match = best_variables = None
-    best_score = 0
-    for key, templ in PubSub._TopicTemplates.items():
-      vsplit = templ.template.split('/')
-      if len(vsplit) != len(topic_split):
-        continue
+    return _topic_router.parse(topic_string)
 
-      static_score = var_score = 0
-      var_positions = []
-      for idx, (v_element, t_element) in enumerate(zip(vsplit, topic_split)):
-        if v_element == t_element:
-          static_score += 1
-        elif v_element.startswith("$"):
-          var_positions.append(idx)
-          var_score += 1
-      if static_score + var_score == len(vsplit) \
-         and static_score > best_score:
-        best_match = key
-        best_variables = var_positions
-
-    if best_match is not None:
-      parsed = {"_topic_id": best_match}
-      vsplit = PubSub._TopicTemplates[best_match].template.split('/')
-      for idx in best_variables:
-        parsed[vsplit[idx][2:-1]] = topic_split[idx]
-      return parsed
+  @staticmethod
+  def candidateTopics(topic_string):
+    """Returns the names of the templates that match_topic() can match
+       the topic against, ignoring case as it does.
+    """
 
-    return None
+    return {topic_id.name for topic_id in _acl_router.candidates(topic_string)}
 
   # Raise errors if someone tries to access wrong attribute
   @property
@@ -408,6 +475,15 @@ class PubSub(_PubSubTopicBase):
     self.receivedCondition.release()
     return
 
+_topic_router = TopicRouter(PubSub._TopicTemplates)
+_acl_router = TopicRouter(PubSub._TopicTemplates, fold_case=True)
+
+@lru_cache(maxsize=len(PubSub._TopicTemplates))
+def _templatePattern(template):
+  regex = re.escape(template)
+  regex = re.sub(r'\\\$\\\{[a-z_]+\\\}', lambda _: r'([^/]+)', regex)
+  return re.compile(f'^{regex}$', re.IGNORECASE)
+
 def initializeMqttClient(**kwargs):
   if hasattr(mqtt, 'CallbackAPIVersion'):
     return mqtt.Client(mqtt.CallbackAPIVersion.VERSION1, **kwargs)
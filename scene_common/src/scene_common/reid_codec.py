@@ -0,0 +1,33 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+# Re-ID vectors travel between the pipeline server, the controller and the
+# tracker tools as base64 encoded float32 arrays in native byte order, the
+# format written by struct.pack("256f", ...). The functions below convert
+# between the two without building a Python float per element.
+
+import base64
+
+import numpy as np
+
+REID_DTYPE = np.dtype(np.float32)
+REID_DIMENSIONS = 256
+
+def decodeReIDVector(encoded):
+  """! Decodes a base64 encoded Re-ID vector.
+
+  The returned array is a read-only view on the decoded bytes.
+
+  @param   encoded   Base64 encoded vector as str or bytes.
+  @return  Array of shape (1, dimensions) and dtype REID_DTYPE.
+  """
+  return np.frombuffer(base64.b64decode(encoded), dtype=REID_DTYPE).reshape(1, -1)
+
+def encodeReIDVector(vector):
+  """! Encodes a Re-ID vector as base64 straight from its array buffer.
+
+  @param   vector    Array or sequence of floats, of any shape.
+  @return  Base64 encoded vector as str.
+  """
+  vector = np.ascontiguousarray(vector, dtype=REID_DTYPE)
+  return base64.b64encode(vector.data).decode('ascii')
@@ -14,8 +14,13 @@ class RESTResult(dict):
     super().__init__()
     self.statusCode = statusCode
     self.errors = errors
+    self.etag = None
     return
 
+  @property
+  def notModified(self):
+    return self.statusCode == HTTPStatus.NOT_MODIFIED
+
 class RESTClient:
   def __init__(self, url, rootcert=None, auth=None):
     self.url = url
@@ -140,20 +145,30 @@ class RESTClient:
                               headers=headers, verify=self.rootcert)
     return self.decodeReply(reply, HTTPStatus.CREATED)
 
-  def _get(self, endpoint, parameters):
+  def _get(self, endpoint, parameters, etag=None):
     """Private method to get an object, used by public object specific calls.
 
     @param      endpoint        object specific endpoint on REST server
     @param      parameters      dictionary of key/value pairs appended to GET request,
                                 used by server to filter out objects
+    @param      etag            ETag of a previous reply, makes the request conditional
     @return                     RESTResult with decoded object(s) on success,
-                                empty with `errors` set on failure
+                                empty with `notModified` set if the object(s) still
+                                match `etag`, empty with `errors` set on failure.
+                                `etag` is set to the ETag of the reply.
     """
     full_path = urljoin(self.url, endpoint)
     headers = {'Authorization': f"Token {self.token}"}
+    if etag:
+      headers['If-None-Match'] = etag
     reply = self.session.get(full_path, params=parameters, headers=headers,
                              verify=self.rootcert)
-    return self.decodeReply(reply, HTTPStatus.OK)
+    if reply.status_code == HTTPStatus.NOT_MODIFIED:
+      result = RESTResult(statusCode=reply.status_code)
+    else:
+      result = self.decodeReply(reply, HTTPStatus.OK)
+    result.etag = reply.headers.get('ETag')
+    return result
 
   def _update(self, endpoint, data, files=None):
     """Private method to update an object, used by public object specific calls.
@@ -195,14 +210,15 @@ class RESTClient:
     return data, files
 
   # Scene
-  def getScenes(self, filter):
+  def getScenes(self, filter, etag=None):
     """Gets all scenes matching filter. If filter is None returns all scenes.
 
     @param      filter          dict with key/value pairs to filter matching objects
+    @param      etag            ETag of a previous reply, only get the scenes if changed
     @return                     RESTResult with decoded objects on success,
                                 empty with `errors` set on failure
     """
-    return self._get("scenes", filter)
+    return self._get("scenes", filter, etag)
 
   def createScene(self, data):
     """Creates a new scene
@@ -215,14 +231,15 @@ class RESTClient:
     data, files = self._separateFiles(data, ['map', 'thumbnail'])
     return self._create("scene", data, files)
 
-  def getScene(self, uid):
+  def getScene(self, uid, etag=None):
     """Gets scene with `uid`
 
     @param      uid             uid of scene to get
+    @param      etag            ETag of a previous reply, only get the scene if changed
     @return                     RESTResult with decoded object on success,
                                 empty with `errors` set on failure
     """
-    return self._get(f"scene/{uid}", None)
+    return self._get(f"scene/{uid}", None, etag)
 
   def updateScene(self, uid, data):
     """Updates scene with `uid`
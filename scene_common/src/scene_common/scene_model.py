@@ -6,21 +6,13 @@ import os
 
 from scene_common import log
 from scene_common.mesh_util import extractTriangleMesh
+from scene_common.transform import MapRaycaster
 
 
 class SceneModel:
   def __init__(self, name, map_file, scale=None):
     self.name = name
-    self.background = None
-    self.map_triangle_mesh = None
-    self.map_file = map_file
-    if map_file:
-      # FIXME: get the image binary data using url rather than this hack
-      if 'http' in map_file:
-        map_file = map_file.replace('https://web.scenescape.intel.com', '/home/scenescape/SceneScape')
-      if os.path.exists(map_file):
-        self.background = cv2.imread(map_file)
-        self.extractMapTriangleMesh(map_file, scale)
+    self.loadMap(map_file, scale)
     self.children = []
     self.cameras = {}
     self.regions = {}
@@ -34,6 +26,21 @@ class SceneModel:
     self.mesh_translation = None
     self.mesh_rotation = None
     self.scale = scale
+    # (mesh, translation, rotation, MapRaycaster) of the last map_raycaster
+    self._map_raycaster = None
+    return
+
+  def loadMap(self, map_file, scale=None):
+    self.background = None
+    self.map_triangle_mesh = None
+    self.map_file = map_file
+    if map_file:
+      # FIXME: get the image binary data using url rather than this hack
+      if 'http' in map_file:
+        map_file = map_file.replace('https://web.scenescape.intel.com', '/home/scenescape/SceneScape')
+      if os.path.exists(map_file):
+        self.background = cv2.imread(map_file)
+        self.extractMapTriangleMesh(map_file, scale)
     return
 
   def extractMapTriangleMesh(self, mapFile, scale):
@@ -52,6 +59,21 @@ class SceneModel:
 
     return
 
+  @property
+  def map_raycaster(self):
+    """! MapRaycaster of the map mesh, built on first use and rebuilt only
+    when the mesh or its placement changes. None without a map mesh.
+    """
+    if self.map_triangle_mesh is None:
+      return None
+    cached = self._map_raycaster
+    if cached is None or cached[0] is not self.map_triangle_mesh \
+       or cached[1] != self.mesh_translation or cached[2] != self.mesh_rotation:
+      raycaster = MapRaycaster(self.map_triangle_mesh, self.mesh_translation, self.mesh_rotation)
+      cached = (self.map_triangle_mesh, self.mesh_translation, self.mesh_rotation, raycaster)
+      self._map_raycaster = cached
+    return cached[3]
+
   def cameraWithID(self, anID):
     if anID in self.cameras:
       return self.cameras[anID]
@@ -0,0 +1,218 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import math
+
+import numpy as np
+
+DEFAULT_CELL_SIZE = 2.0 # meters
+DEFAULT_MAX_CELLS = 1024
+CELL_KEY_SHIFT = 1 << 32
+CELL_KEY_OFFSET = 1 << 31
+
+class SpatialGrid:
+  """! Uniform grid index over axis aligned bounds in the XY plane.
+
+  Each entry is registered in every cell its bounds overlap, so a query only
+  has to look at the entries sharing a cell with it instead of all of them.
+  Entries are identified by arbitrary hashable keys and are assigned a small
+  integer slot that is returned by queries. Entries that would cover more
+  than max_cells cells are not gridded and are returned for every query.
+
+  The grid can be updated incrementally with insert() and remove(). The
+  array form used by query() is recompiled lazily after a change.
+  """
+
+  def __init__(self, cell_size=DEFAULT_CELL_SIZE, max_cells=DEFAULT_MAX_CELLS):
+    if cell_size <= 0:
+      raise ValueError("Cell size must be positive", cell_size)
+    self.cell_size = float(cell_size)
+    self.max_cells = max_cells
+    self.slots = {}
+    self.slot_keys = []
+    self._free_slots = []
+    self._bounds = {}
+    self._cells = {}
+    self._large = set()
+    self._compiled = None
+    self.resetStats()
+    return
+
+  def __len__(self):
+    return len(self.slots)
+
+  def __contains__(self, key):
+    return key in self.slots
+
+  def bounds(self, key):
+    return self._bounds.get(key, None)
+
+  def insert(self, key, bounds):
+    """! Add an entry or move an existing one to new bounds.
+
+    @param    key       Identifier of the entry
+    @param    bounds    (x1, y1, x2, y2) with x1 <= x2 and y1 <= y2
+    @return   True if the index changed, False if the bounds were already current.
+    """
+    bounds = tuple(float(v) for v in bounds)
+    if self._bounds.get(key, None) == bounds:
+      return False
+    self.remove(key)
+
+    if self._free_slots:
+      slot = self._free_slots.pop()
+      self.slot_keys[slot] = key
+    else:
+      slot = len(self.slot_keys)
+      self.slot_keys.append(key)
+    self.slots[key] = slot
+    self._bounds[key] = bounds
+
+    cells = self._cellsCovered(bounds)
+    if cells is None:
+      self._large.add(slot)
+    else:
+      for cell in cells:
+        self._cells.setdefault(cell, set()).add(slot)
+    self._compiled = None
+    return True
+
+  def remove(self, key):
+    """! Remove an entry from the index.
+
+    @param    key       Identifier of the entry
+    @return   True if the entry was present.
+    """
+    slot = self.slots.pop(key, None)
+    if slot is None:
+      return False
+    bounds = self._bounds.pop(key)
+
+    if slot in self._large:
+      self._large.discard(slot)
+    else:
+      for cell in self._cellsCovered(bounds):
+        members = self._cells[cell]
+        members.discard(slot)
+        if not members:
+          del self._cells[cell]
+    self.slot_keys[slot] = None
+    self._free_slots.append(slot)
+    self._compiled = None
+    return True
+
+  def query(self, bounds):
+    """! Find the entries sharing at least one cell with each query box.
+
+    @param    bounds    Array of shape (Q, 4) with (x1, y1, x2, y2) per query.
+                        Points are queried as boxes of zero size.
+    @return   (query_idx, slots) arrays of candidate pairs, sorted by query
+              and slot and free of duplicates. Use slot_keys to map slots back
+              to keys.
+    """
+    bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+    count = len(bounds)
+    self.queries += count
+    empty = np.zeros(0, dtype=np.intp)
+    if not count or not self.slots:
+      return empty, empty
+
+    cell_keys, cell_starts, cell_counts, cell_members, large = self._compile()
+    query_parts = []
+    slot_parts = []
+
+    finite = np.isfinite(bounds).all(axis=1)
+    safe = np.where(finite[:, None], bounds, 0.0)
+    low = np.floor(safe[:, :2] / self.cell_size).astype(np.int64)
+    high = np.floor(safe[:, 2:] / self.cell_size).astype(np.int64)
+    span = np.minimum(high - low + 1, self.max_cells + 1)
+    num_cells = span[:, 0] * span[:, 1]
+    overflow = finite & (num_cells > self.max_cells)
+    num_cells = np.where(finite & ~overflow, num_cells, 0)
+
+    if len(cell_keys) and num_cells.any():
+      query_idx = np.repeat(np.arange(count), num_cells)
+      local = np.arange(len(query_idx)) - np.repeat(np.cumsum(num_cells) - num_cells, num_cells)
+      span_y = np.repeat(span[:, 1], num_cells)
+      cell_x = np.repeat(low[:, 0], num_cells) + local // span_y
+      cell_y = np.repeat(low[:, 1], num_cells) + local % span_y
+      wanted = cell_x * CELL_KEY_SHIFT + (cell_y + CELL_KEY_OFFSET)
+
+      pos = np.minimum(np.searchsorted(cell_keys, wanted), len(cell_keys) - 1)
+      found = cell_keys[pos] == wanted
+      query_idx = query_idx[found]
+      pos = pos[found]
+
+      members = cell_counts[pos]
+      query_parts.append(np.repeat(query_idx, members))
+      local = np.arange(members.sum()) - np.repeat(np.cumsum(members) - members, members)
+      slot_parts.append(cell_members[np.repeat(cell_starts[pos], members) + local])
+
+    if len(large):
+      query_parts.append(np.repeat(np.arange(count), len(large)))
+      slot_parts.append(np.tile(large, count))
+
+    if overflow.any():
+      active = np.array(sorted(self.slots.values()), dtype=np.intp)
+      overflow_idx = np.flatnonzero(overflow)
+      query_parts.append(np.repeat(overflow_idx, len(active)))
+      slot_parts.append(np.tile(active, len(overflow_idx)))
+
+    if not query_parts:
+      return empty, empty
+
+    num_slots = len(self.slot_keys)
+    pairs = np.unique(np.concatenate(query_parts).astype(np.int64) * num_slots
+                      + np.concatenate(slot_parts))
+    self.candidates += len(pairs)
+    return (pairs // num_slots).astype(np.intp), (pairs % num_slots).astype(np.intp)
+
+  def queryPoints(self, points):
+    """! Find the entries sharing a cell with each point.
+
+    @param    points    Array of shape (N, 2) or (N, 3), only x and y are used.
+    @return   (point_idx, slots) arrays of candidate pairs, see query().
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim != 2:
+      points = points.reshape(-1, 2)
+    return self.query(np.hstack([points[:, :2], points[:, :2]]))
+
+  @property
+  def stats(self):
+    """! Counters describing how selective the index has been since the
+    last resetStats().
+    """
+    return {
+      'entries': len(self.slots),
+      'queries': self.queries,
+      'candidates': self.candidates,
+      'candidates_per_query': self.candidates / self.queries if self.queries else 0.0,
+    }
+
+  def resetStats(self):
+    self.queries = 0
+    self.candidates = 0
+    return
+
+  def _cellsCovered(self, bounds):
+    x1, y1, x2, y2 = bounds
+    ix1 = math.floor(x1 / self.cell_size)
+    iy1 = math.floor(y1 / self.cell_size)
+    ix2 = math.floor(x2 / self.cell_size)
+    iy2 = math.floor(y2 / self.cell_size)
+    if (ix2 - ix1 + 1) * (iy2 - iy1 + 1) > self.max_cells:
+      return None
+    return [(ix, iy) for ix in range(ix1, ix2 + 1) for iy in range(iy1, iy2 + 1)]
+
+  def _compile(self):
+    if self._compiled is None:
+      cells = sorted((ix * CELL_KEY_SHIFT + (iy + CELL_KEY_OFFSET), sorted(members))
+                     for (ix, iy), members in self._cells.items())
+      cell_keys = np.array([key for key, _ in cells], dtype=np.int64)
+      cell_counts = np.array([len(members) for _, members in cells], dtype=np.intp)
+      cell_starts = np.cumsum(cell_counts) - cell_counts
+      cell_members = np.array([slot for _, members in cells for slot in members], dtype=np.intp)
+      large = np.array(sorted(self._large), dtype=np.intp)
+      self._compiled = (cell_keys, cell_starts, cell_counts, cell_members, large)
+    return self._compiled
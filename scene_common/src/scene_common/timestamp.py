@@ -3,8 +3,13 @@
 
 import time
 from datetime import datetime, timezone
+from functools import lru_cache
 
 DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+# Recently formatted timestamps, e.g. first_seen of the tracked objects
+ISO_TIME_CACHE_SIZE = 4096
+# Length of YYYY-MM-DDTHH:MM:SS.fffZ
+ISO_TIME_LENGTH = 24
 
 def get_iso_time(timestamp: float=None) -> str:
   """! Returns ISO 8601 timestamp in UTC as string.
@@ -15,8 +20,14 @@ def get_iso_time(timestamp: float=None) -> str:
   if timestamp is None:
     timestamp = time.time()
 
+  return _format_iso_time(timestamp)
+
+@lru_cache(maxsize=ISO_TIME_CACHE_SIZE)
+def _format_iso_time(timestamp):
   utc_time = datetime.fromtimestamp(timestamp, tz=timezone.utc)
-  return f"{utc_time.strftime(DATETIME_FORMAT)[:-3]}Z"
+  return f"{utc_time.year:04d}-{utc_time.month:02d}-{utc_time.day:02d}" \
+    f"T{utc_time.hour:02d}:{utc_time.minute:02d}:{utc_time.second:02d}" \
+    f".{utc_time.microsecond // 1000:03d}Z"
 
 def get_epoch_time(timestamp: str=None) -> float:
   """! Returns Epoch/POSIX timestamp in UTC as float.
@@ -27,8 +38,20 @@ def get_epoch_time(timestamp: str=None) -> float:
   if not timestamp:
     return time.time()
 
-  utc_time = datetime.strptime(timestamp, f"{DATETIME_FORMAT}Z").replace(tzinfo=timezone.utc)
-  return utc_time.timestamp()
+  return get_datetime_from_string(timestamp).timestamp()
+
+def _parse_iso_time(timestamp):
+  """! Parses the fixed layout written by get_iso_time() without strptime.
+
+  @param      timestamp    Time as string type.
+  @return     Datetime object, None if the string has another layout.
+  """
+  if len(timestamp) != ISO_TIME_LENGTH or timestamp[-1] != 'Z' \
+     or timestamp[4] != '-' or timestamp[7] != '-' or timestamp[10] != 'T' \
+     or timestamp[13] != ':' or timestamp[16] != ':' or timestamp[19] != '.' \
+     or timestamp[11:13] == "24":
+    return None
+  return datetime.fromisoformat(timestamp[:-1]).replace(tzinfo=timezone.utc)
 
 def adjust_time(now, server, client, lastTimeSync, timeOffset, exception):
   if server is not None and (not lastTimeSync or now - lastTimeSync > 300):
@@ -46,4 +69,7 @@ def get_datetime_from_string(date_string: str) -> datetime:
   @param      date_string    Date in string format.
   @return     Date as datetime object.
   """
+  utc_time = _parse_iso_time(date_string)
+  if utc_time is not None:
+    return utc_time
   return datetime.strptime(date_string, f"{DATETIME_FORMAT}Z").replace(tzinfo=timezone.utc)
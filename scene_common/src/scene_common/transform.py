@@ -281,6 +281,7 @@ class CameraPose:
     else:
       raise ValueError("Unable to understand pose", pose)
 
+    self._origin = self.pose_mat[0:3, 3].copy()
     inverted = np.linalg.inv(self.pose_mat)
     rmat = inverted[0:3, 0:3]
     self._extrinsicsTVecs = inverted[0:3, 3:4]
@@ -305,7 +306,7 @@ class CameraPose:
     # creating a new array and reshaping it is far faster than np.append
     npt = np.reshape(np.array([point.asNumpyCartesian, (1, 1)]), -1)
 
-    start = Point(np.matmul(self.pose_mat, np.array([0, 0, 0, 1]))[:3])
+    start = Point(self._origin)
     end = Point(np.matmul(self.pose_mat, npt)[:3])
 
     pt = end - start
@@ -330,6 +331,38 @@ class CameraPose:
       pt = Point(start.x, start.y, 0, polar=False)
     return pt
 
+  def cameraPointsToWorldPoints(self, points):
+    """Batched version of cameraPointToWorldPoint.
+
+    @param    points   Array of shape (N, 3) with points in the camera coordinate
+                       system, or of shape (N, 2) with points on the normalized
+                       image plane, which are projected to the ground plane
+    @return   Array of shape (N, 3) with the points in world coordinates
+    """
+    points = np.asarray(points, dtype=np.float64)
+    rotation = self.pose_mat[0:3, 0:3]
+    if points.shape[1] == 3:
+      return points @ rotation.T + self._origin
+
+    # Direction of the ray through each point, relative to the camera origin
+    rays = points @ rotation[:, 0:2].T + rotation[:, 2]
+    world = np.empty((len(points), 3))
+
+    # Project detection points in front of the camera to the ground plane
+    ground = rays[:, 2] < -1e-6
+    scale = -self._origin[2] / rays[ground, 2]
+    world[ground] = rays[ground] * scale[:, np.newaxis] + self._origin
+
+    # Rays parallel to the xy-plane, use horizon culling
+    horizon = ~ground
+    if horizon.any():
+      xy = rays[horizon, 0:2]
+      xy_length = np.hypot(xy[:, 0], xy[:, 1])[:, np.newaxis]
+      direction = np.divide(xy, xy_length, out=np.zeros_like(xy), where=xy_length > 1e-6)
+      world[horizon, 0:2] = self._origin[0:2] + direction * self._getHorizonDistance()
+      world[horizon, 2] = 0
+    return world
+
   def transformObjectPoseInScene(self, obj, obj_T, obj_R):
     obj.translate(obj_T)
     obj.rotate(obj_R,center=(0,0,0))
@@ -346,46 +379,67 @@ class CameraPose:
     return obj
 
 # FIXME - projectToMap and projectBounds must be consolidated into a single method
-  def projectToMap(self, obj_T, obj_R, map_obj, map_T, map_R):
+  def projectToMap(self, obj_T, obj_R, raycaster):
     """!
     Project the object detection in 2D camera frame into 3D world coordinates
-    @param    obj_T     object translation in camera csys
-    @param    obj_R     object rotation in camera csys
-    @param    map_obj   map as type o3d.geometry.TriangleMesh
-    @param    map_T     map translation in scene csys
-    @param    map_R     map rotation in scene csys
+    @param    obj_T       object translation in camera csys
+    @param    obj_R       object rotation in camera csys
+    @param    raycaster   MapRaycaster of the scene map
 
     @return   obj_T, obj_R translation and rotation of object projected to map
     """
+    return self.projectToMapBatch([obj_T], [obj_R], raycaster)[0]
 
+  def projectToMapBatch(self, translations, rotations, raycaster):
+    """!
+    Batched version of projectToMap, the rays towards all objects of a
+    frame are cast in a single call.
+    @param    translations    object translations in camera csys, shape (N, 3)
+    @param    rotations       object rotations in camera csys, quaternions of shape (N, 4)
+    @param    raycaster       MapRaycaster of the scene map
+
+    @return   List with the (obj_T, obj_R) of each object. Objects whose ray
+              misses the map are returned unchanged.
+    """
+    obj_T = np.asarray(translations, dtype=np.float64).reshape(-1, 3)
     cam_T = self.translation.asNumpyCartesian
     cam_R = Rotation.from_quat(np.radians(self.quaternion_rotation)).as_matrix()
-    map_obj = self.transformObjectPoseInScene(map_obj, map_T, map_R)
-    map_obj = self.transformSceneToCameraCoordinates(map_obj, cam_T, cam_R)
-
-    scene = o3d.t.geometry.RaycastingScene()
-    scene.add_triangles(map_obj)
-    rays = o3d.core.Tensor([[0, 0, 0, obj_T[0], obj_T[1], obj_T[2]]],dtype=o3d.core.Dtype.Float32)
-    rcast = scene.cast_rays(rays)
-    distance_ratio = rcast['t_hit'].numpy()[0]
-
-    if not distance_ratio == np.inf:
-      obj_R = Rotation.from_quat(obj_R).as_matrix()
-      obj_T = (distance_ratio * np.array(obj_T)).tolist()
-      v1 = (obj_R @ np.array([0, 0, 1]).reshape([3,1])).reshape([1,3]
-        )[0] #object local z axis in camera csys
-      v2 = rcast['primitive_normals'].numpy()[0] #surface normal vector in camera csys
-
-      obj_R = Rotation.from_matrix(
-        (rotationToTarget(v1,v2).as_matrix()) @ obj_R
-        ).as_quat()
-    return obj_T, obj_R
+    # The map stays in scene csys, the rays are moved out of camera csys instead
+    distance_ratio, normals = raycaster.castRays(np.broadcast_to(cam_T, obj_T.shape), obj_T @ cam_R.T)
+
+    result = list(zip(translations, rotations))
+    hit = np.flatnonzero(np.isfinite(distance_ratio))
+    if not len(hit):
+      return result
+
+    obj_R = Rotation.from_quat(np.asarray(rotations, dtype=np.float64).reshape(-1, 4)[hit]).as_matrix()
+    v1 = obj_R[:, :, 2] #object local z axis in camera csys
+    v2 = normals[hit] @ cam_R #surface normal vector in camera csys
+    projected_R = Rotation.from_matrix(rotationsToTargets(v1, v2).as_matrix() @ obj_R).as_quat()
+    projected_T = distance_ratio[hit, np.newaxis] * obj_T[hit]
+    for idx, new_T, new_R in zip(hit, projected_T.tolist(), projected_R):
+      result[idx] = (new_T, new_R)
+    return result
 
   def projectBounds(self, rect):
     """Project the bounding box from camera coordinate system to world coordinate system
     to determine the object location"""
-    bl, br, far_l, far_r = self._mapCameraViewCornersToWorld(rect)
+    return self._boundsFromCorners(*self._mapCameraViewCornersToWorld(rect))
+
+  def projectBoundsBatch(self, rects):
+    """Batched version of projectBounds, the corners of all bounding boxes
+    are projected in a single call.
 
+    @param    rects    List of Rectangles on the normalized image plane
+    @return   List with the (bounds, shadow, baseAngle) of each rectangle
+    """
+    corners = np.array([(corner.x, corner.y) for rect in rects
+                        for corner in (rect.bottomLeft, rect.bottomRight, rect.topLeft, rect.topRight)],
+                       dtype=np.float64).reshape(-1, 2)
+    world = [Point(pt) for pt in self.cameraPointsToWorldPoints(corners)]
+    return [self._boundsFromCorners(*world[idx:idx + 4]) for idx in range(0, len(world), 4)]
+
+  def _boundsFromCorners(self, bl, br, far_l, far_r):
     ll1 = self.translation.distance(far_l)
     ll2 = bl.distance(far_l)
     al = math.atan2(self.translation.z, ll1)
@@ -423,6 +477,78 @@ class CameraPose:
     return Rectangle(origin=Point(sensor_left.x, sensor_top.y),
                      size=((sensor_pt.x - sensor_left.x) * 2, sensor_pt.y - sensor_top.y))
 
+  def projectWorldPointsToCameraPixels(self, points):
+    """Batched version of projectWorldPointToCameraPixels.
+
+    Without lens distortion the points are projected with a cached 3x4
+    projection matrix, otherwise with a single cv2.projectPoints call.
+
+    @param    points   Array of shape (N, 3) with points in world coordinates
+    @return   Array of shape (N, 2) with the pixel coordinates of the points
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    projection, rvec, tvec = self._worldToPixelProjection()
+    distortion = self.intrinsics.distortion
+    if np.any(distortion):
+      pts, _ = cv2.projectPoints(points, rvec, tvec, self.intrinsics.intrinsics, distortion)
+      return pts.reshape(-1, 2)
+
+    pixels = points @ projection[:, 0:3].T + projection[:, 3]
+    depth = pixels[:, 2:3]
+    # Same as cv2.projectPoints for points on the camera plane
+    depth = np.where(depth != 0, depth, 1.0)
+    return pixels[:, 0:2] / depth
+
+  def projectEstimatedBoundsToCameraPixelsBatch(self, points, metricSizes):
+    """Batched version of projectEstimatedBoundsToCameraPixels, the points
+    of all bounds are projected in a single call.
+
+    @param    points        Array of shape (N, 3) with object locations in world coordinates
+    @param    metricSizes   Array of shape (N, 2) with the width and height of the objects
+    @return   List of Rectangles with the estimated bounds in pixels
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    sizes = np.asarray(metricSizes, dtype=np.float64).reshape(-1, 2)
+    # Cartesian form of the polar offsets in projectEstimatedBoundsToCameraPixels,
+    # Point(height, 0, 90, polar=True) is (height, 0, height)
+    angle = math.radians(self.angle - 90)
+    left_dir = np.array([math.cos(angle), math.sin(angle), 0.0])
+    top_dir = np.array([1.0, 0.0, 1.0])
+    left = points + (sizes[:, 0:1] / 2) * left_dir
+    top = points + sizes[:, 1:2] * top_dir
+
+    pixels = self.projectWorldPointsToCameraPixels(np.vstack((points, left, top)))
+    sensor_pt, sensor_left, sensor_top = np.split(pixels, 3)
+    return [Rectangle(origin=Point(pl[0], pt[1]),
+                      size=((pp[0] - pl[0]) * 2, pp[1] - pt[1]))
+            for pp, pl, pt in zip(sensor_pt.tolist(), sensor_left.tolist(), sensor_top.tolist())]
+
+  def _worldToPixelProjection(self):
+    """Projection matrix and extrinsics vectors from world coordinates to
+    pixels, cached until the pose or the intrinsics change.
+    """
+    cached = getattr(self, '_projection', None)
+    if cached is not None and cached[0] is self.pose_mat \
+       and cached[1] is self.intrinsics.intrinsics:
+      return cached[2:]
+
+    extrinsics = np.linalg.inv(self.pose_mat)[0:3, :]
+    rvec = cv2.Rodrigues(extrinsics[0:3, 0:3])[0]
+    tvec = extrinsics[0:3, 3:4].copy()
+    projection = self.intrinsics.intrinsics @ extrinsics
+    self._projection = (self.pose_mat, self.intrinsics.intrinsics, projection, rvec, tvec)
+    return self._projection[2:]
+
+  @property
+  def childTransform(self):
+    """ChildTransform of this pose, cached until the pose changes. Used
+    when the pose is the transform of a child scene into its parent.
+    """
+    cached = getattr(self, '_child_transform', None)
+    if cached is None or cached.pose_mat is not self.pose_mat:
+      cached = self._child_transform = ChildTransform(self.pose_mat)
+    return cached
+
   def _calculateRegionOfView(self, size):
     """Calculate the bounds of camera view on the map using horizon culling"""
     self.frameSize = size
@@ -464,6 +590,10 @@ class CameraPose:
       iterable = r
 
 
+    if iterable and not any(corner.is3D for corner in iterable):
+      points = np.array([(corner.x, corner.y) for corner in iterable], dtype=np.float64)
+      return [Point(pt) for pt in self.cameraPointsToWorldPoints(points)]
+
     for corner in iterable:
       world_point = self.cameraPointToWorldPoint(corner)
       corners.append(world_point)
@@ -582,6 +712,7 @@ class PointCorrespondenceTransform(CameraPose):
     self.euler_rotation = pdict['euler_rotation']
     self.scale = pdict['scale']
     self.pose_mat = pose_mat
+    self._origin = pose_mat[0:3, 3].copy()
     return
 
   def setResolution(self):
@@ -612,6 +743,124 @@ class PointCorrespondenceTransform(CameraPose):
         return False
     return True
 
+class MapRaycaster:
+  """! RaycastingScene over the map mesh of a scene, placed in scene csys.
+
+  Building the scene is the expensive part of projecting to the map, so it
+  is built once per mesh and placement and shared read-only by every camera
+  of the scene, see SceneModel.map_raycaster.
+  """
+
+  def __init__(self, mesh, translation=None, rotation=None):
+    """!
+    @param    mesh          map as type o3d.t.geometry.TriangleMesh, not modified
+    @param    translation   map translation in scene csys
+    @param    rotation      map rotation in scene csys, as xyz euler angles in radians
+    """
+    mesh = mesh.clone()
+    if translation is not None:
+      mesh.translate(o3d.core.Tensor(translation, dtype=o3d.core.Dtype.Float32))
+    if rotation is not None:
+      mesh.rotate(o3d.geometry.get_rotation_matrix_from_xyz(rotation), center=(0, 0, 0))
+    self.scene = o3d.t.geometry.RaycastingScene()
+    self.scene.add_triangles(mesh)
+    return
+
+  def castRays(self, origins, directions):
+    """! Cast all rays in one call.
+
+    @param    origins       ray origins in scene csys, shape (N, 3)
+    @param    directions    ray directions in scene csys, shape (N, 3)
+    @return   Tuple (t_hit, normals) with arrays of shape (N,) and (N, 3).
+              t_hit is in units of the direction length, inf on a miss.
+    """
+    rays = np.hstack([np.asarray(origins), np.asarray(directions)]).astype(np.float32)
+    rcast = self.scene.cast_rays(o3d.core.Tensor(rays))
+    return rcast['t_hit'].numpy(), rcast['primitive_normals'].numpy()
+
+class ChildTransform:
+  """! Transform from a child scene into its parent, split into the parts
+  needed to move the published form of objects. It is built once per
+  child transform, see CameraPose.childTransform, so that the objects of
+  a message are moved with a handful of array operations.
+  """
+
+  def __init__(self, pose_mat):
+    self.pose_mat = pose_mat
+    self.linear = pose_mat[0:3, 0:3]
+    self.translation = pose_mat[0:3, 3]
+    self.scale = np.linalg.norm(self.linear, axis=0)
+    # A mirrored box is the same box with its x axis negated, which keeps
+    # the rotation of the boxes proper
+    self.mirrored = np.linalg.det(self.linear) < 0
+    proper = self.linear * [-1, 1, 1] if self.mirrored else self.linear
+    # Nearest rotation, defined even when the scale of an axis is zero
+    u, _, vt = np.linalg.svd(proper)
+    if np.linalg.det(u @ vt) < 0:
+      u[:, -1] = -u[:, -1]
+    self.rotation = Rotation.from_matrix(u @ vt)
+    return
+
+  def transformPoints(self, points):
+    """! Points of shape (N, 3) from child to parent coordinates """
+    return np.asarray(points, dtype=np.float64) @ self.linear.T + self.translation
+
+  def transformVectors(self, vectors):
+    """! Free vectors such as velocities, shape (N, 3) """
+    return np.asarray(vectors, dtype=np.float64) @ self.linear.T
+
+  def transformBoxes(self, rotations):
+    """! Orientation of boxes from child to parent coordinates.
+
+    @param    rotations    Array of shape (N, 4), quaternions (x, y, z, w)
+    @return   Tuple (rotations, edge_scales) with arrays of shape (N, 4)
+              and (N, 3), the box edges are scaled by edge_scales.
+    """
+    quaternions = np.asarray(rotations, dtype=np.float64).reshape(-1, 4)
+    object_rotations = Rotation.from_quat(quaternions)
+    axes = self.linear @ object_rotations.as_matrix()
+    if self.mirrored:
+      # Conjugate by the reflection of the x axis, see __init__
+      object_rotations = Rotation.from_quat(quaternions * [1, -1, -1, 1])
+    return (self.rotation * object_rotations).as_quat(), np.linalg.norm(axes, axis=1)
+
+  def transformObjects(self, objects):
+    """! Move the published form of objects into the parent, in place.
+
+    Translations are required, velocities and boxes (rotation and size)
+    are moved for the objects that have them. Boxes without a rotation are
+    aligned with the child axes.
+
+    @param    objects    List of object dicts with 3D translations
+    """
+    if not objects:
+      return
+    translations = self.transformPoints([obj['translation'] for obj in objects]).tolist()
+    for obj, translation in zip(objects, translations):
+      obj['translation'] = translation
+
+    moving = [obj for obj in objects if _isVector(obj.get('velocity', None), 3)]
+    if moving:
+      velocities = self.transformVectors([obj['velocity'] for obj in moving]).tolist()
+      for obj, velocity in zip(moving, velocities):
+        obj['velocity'] = velocity
+
+    oriented = [obj for obj in objects if _isVector(obj.get('rotation', None), 4)]
+    if oriented:
+      rotations, edge_scales = self.transformBoxes([obj['rotation'] for obj in oriented])
+      for obj, rotation, edge_scale in zip(oriented, rotations.tolist(), edge_scales):
+        obj['rotation'] = rotation
+        if _isVector(obj.get('size', None), 3):
+          obj['size'] = (edge_scale * obj['size']).tolist()
+
+    for obj in objects:
+      if _isVector(obj.get('size', None), 3) and not _isVector(obj.get('rotation', None), 4):
+        obj['size'] = (self.scale * obj['size']).tolist()
+    return
+
+def _isVector(value, length):
+  return isarray(value) and len(value) == length
+
 def getPoseMatrix(sceneobj, rot_adjust=None):
   """! Extract the pose matrix of the scenescape object.
 
@@ -684,6 +933,18 @@ def normalize(vector):
     return vector
   return vector / magnitude
 
+def rotationsToTargets(v1, v2):
+  """Batched rotationToTarget, v1 and v2 are arrays of shape (N, 3)"""
+  v1 = np.asarray(v1, dtype=np.float64)
+  v2 = np.asarray(v2, dtype=np.float64)
+  quat = np.hstack([
+           np.cross(v1, v2),
+           (np.linalg.norm(v1, axis=1) * np.linalg.norm(v2, axis=1)
+            + np.einsum('ij,ij->i', v1, v2))[:, np.newaxis]
+         ])
+  quat[np.linalg.norm(quat, axis=1) <= 1e-6] = (0, 0, 0, 1)
+  return Rotation.from_quat(quat)
+
 def rotationToTarget(v1, v2):
   """Compute rotation (in quaternion) from vector v1 to v2"""
   quat = np.hstack([
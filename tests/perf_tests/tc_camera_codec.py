@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+# Compares the JSON and the binary camera data formats: payload size, rate
+# of encoding in the pipeline server and rate of decoding in the controller,
+# to arrays and to the detector message the controller processes, with the
+# Re-ID vectors as arrays as MovingObject keeps them.
+
+import json
+import time
+
+import numpy as np
+import orjson
+
+from scene_common import log
+from scene_common.camera_codec import (cameraDataToMessage, decodeCameraData,
+                                       encodeCameraData)
+from scene_common.reid_codec import (REID_DIMENSIONS, decodeReIDVector,
+                                     encodeReIDVector)
+
+OBJECTS = 30
+FRAMES = 2000
+
+def frameData(with_reid, rng):
+  objects = []
+  for idx in range(OBJECTS):
+    x, y = rng.integers(0, 1800), rng.integers(0, 900)
+    width, height = rng.integers(40, 120), rng.integers(100, 300)
+    obj = {
+      'category': "person",
+      'confidence': float(rng.uniform(0.5, 1)),
+      'center_of_mass': {'x': int(x + width / 3), 'y': int(y + height / 4),
+                         'width': width / 3, 'height': height / 4},
+      'bounding_box_px': {'x': int(x), 'y': int(y), 'width': int(width), 'height': int(height)},
+      'id': idx + 1,
+    }
+    if with_reid:
+      obj['reid'] = encodeReIDVector(rng.normal(0, 1, REID_DIMENSIONS))
+    objects.append(obj)
+  return {'id': "camera1", 'debug_mac': "02:42:ac:12:00:05",
+          'timestamp': "2025-05-16T21:22:58.388Z", 'debug_timestamp_end': "2025-05-16T21:22:58.401Z",
+          'debug_processing_time': 0.013, 'rate': 15.0, 'objects': {'person': objects}}
+
+def rate(function, argument):
+  begin = time.perf_counter()
+  for _ in range(FRAMES):
+    function(argument)
+  return FRAMES / (time.perf_counter() - begin)
+
+def jsonToMessage(payload):
+  message = orjson.loads(payload)
+  # MovingObject decodes the base64 Re-ID vectors of JSON messages
+  for objects in message['objects'].values():
+    for obj in objects:
+      if 'reid' in obj:
+        obj['reid'] = decodeReIDVector(obj['reid'])
+  return message
+
+def measure(jdata):
+  encoded = {'json': json.dumps(jdata).encode('utf-8'), 'binary': encodeCameraData(jdata)}
+  return {
+    'json': (len(encoded['json']), rate(json.dumps, jdata), rate(orjson.loads, encoded['json']),
+             rate(jsonToMessage, encoded['json'])),
+    'binary': (len(encoded['binary']), rate(encodeCameraData, jdata),
+               rate(decodeCameraData, encoded['binary']),
+               rate(lambda payload: cameraDataToMessage(decodeCameraData(payload)),
+                    encoded['binary'])),
+  }
+
+def test():
+  rng = np.random.default_rng(0)
+  log.log("Objects per frame: %d" % OBJECTS)
+  for with_reid in (False, True):
+    results = measure(frameData(with_reid, rng))
+    log.log("Re-ID vectors: %s" % ("yes" if with_reid else "no"))
+    for wire_format, (size, encode, decode, message) in results.items():
+      log.log("  %-6s %7d bytes encode: %8.0f msgs/sec decode: %8.0f msgs/sec to message: %8.0f msgs/sec"
+              % (wire_format, size, encode, decode, message))
+    assert results['binary'][0] < results['json'][0]
+    if with_reid:
+      # Re-ID vectors are not base64 decoded
+      assert results['binary'][3] > results['json'][3]
+  return 0
+
+if __name__ == '__main__':
+  exit(test() or 0)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+# Measures the throughput of the whole SceneController, from the MQTT
+# callback to the published messages, by replaying the recorded camera
+# references in process. No broker or REST server is needed.
+
+import argparse
+import json
+import os
+import tempfile
+
+from controller.replay import ControllerReplay, loadRecording, logReport, sceneFromConfig
+
+PERF_TESTS_PATH = os.path.dirname(os.path.abspath(__file__))
+CONFIG = os.path.join(PERF_TESTS_PATH, "config", "config.json")
+REFERENCES = [os.path.join(PERF_TESTS_PATH, "references", f"xREF_RETAIL_demo-cam{idx}.txt.zip")
+              for idx in (1, 2, 3)]
+TRACKER_CONFIG = "controller/config/tracker-config.json"
+SCHEMA = "controller/src/schema/metadata.schema.json"
+
+def build_argparser():
+  parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+  parser.add_argument("input", nargs="*", default=REFERENCES, help="recorded camera JSONL file(s)")
+  parser.add_argument("--config", default=CONFIG, help="scene config the input was recorded for")
+  parser.add_argument("--tracker_config_file", default=TRACKER_CONFIG,
+                      help="JSON file with tracker configuration")
+  parser.add_argument("--schema_file", default=SCHEMA, help="JSON file with metadata schema")
+  parser.add_argument("--realtime", action="store_true",
+                      help="deliver messages at their recorded times instead of at full speed")
+  parser.add_argument("--speed", type=float, default=1.0, help="speedup of the realtime replay")
+  parser.add_argument("--target", type=float, help="minimum messages/sec to pass")
+  parser.add_argument("--binary", action="store_true",
+                      help="deliver messages in the binary camera data format instead of JSON")
+  return parser
+
+def test(args):
+  messages = loadRecording(args.input)
+  with tempfile.TemporaryDirectory() as tmpdir:
+    scene_file = os.path.join(tmpdir, "scene.json")
+    with open(scene_file, "w") as f:
+      json.dump({'results': [sceneFromConfig(args.config)]}, f)
+    replay = ControllerReplay([scene_file], args.tracker_config_file, args.schema_file)
+    report = replay.run(messages, realtime=args.realtime, speed=args.speed, binary=args.binary)
+    replay.close()
+
+  logReport(report)
+  assert report['messages'] == len(messages)
+  assert report['published_bytes'] > 0
+  if args.target:
+    assert report['rate'] >= args.target
+  return 0
+
+if __name__ == '__main__':
+  exit(test(build_argparser().parse_args()) or 0)
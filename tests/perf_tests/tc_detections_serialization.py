@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+# Compares the publish fan-out of one frame (scene, regulated, region and
+# event payloads) with and without the per-frame DetectionsCache.
+
+import time
+
+import numpy as np
+import orjson
+
+from controller.detections_builder import (DetectionsCache, buildDetectionsDict,
+                                           buildDetectionsList, composeDetections,
+                                           splitDetections)
+from controller.moving_object import ChainData
+from scene_common import log
+from scene_common.geometry import Point
+from scene_common.reid_codec import encodeReIDVector
+
+OBJECTS = 200
+REGIONS = 10
+FRAMES = 200
+REID_LENGTH = 256
+
+class PublishedObject:
+  """! Just the attributes of a MovingObject that prepareObjDict reads. """
+
+  def __init__(self, idx, rng):
+    self.gid = f"0b9a43c5-5b3f-4d6c-9b1e-{idx:012d}"
+    self.category = "person"
+    self.sceneLoc = Point(*rng.uniform(0, 50, 3))
+    self.velocity = Point(*rng.normal(0, 1, 3))
+    self.size = [0.5, 0.5, 1.85]
+    self.rotation = [0, 0, 0, 1]
+    self.reidVector = rng.normal(0, 1, REID_LENGTH).astype(np.float32)
+    self.reidEncoded = encodeReIDVector(self.reidVector)
+    self.visibility = ["camera1", "camera2"]
+    self.confidence = 0.97
+    self.first_seen = 1684272178.388
+    self.info = {'category': "person", 'confidence': 0.97}
+    regions = {f"region-{region}": {'entered': 1684272178.388}
+               for region in range(REGIONS) if (idx + region) % 5 == 0}
+    self.chain_data = ChainData(regions=regions, publishedLocations=[], sensors={}, persist={})
+    return
+
+def frameData():
+  return {'timestamp': "2023-05-16T21:22:58.388Z", 'id': "scene", 'name': "Scene",
+          'rate': 10.0, 'unique_detection_count': OBJECTS}
+
+def regionObjects(objects, region):
+  return [obj for obj in objects if f"region-{region}" in obj.chain_data.regions]
+
+def publishUncached(objects):
+  published = 0
+  jdata = frameData()
+  jdata['objects'] = buildDetectionsList(objects, None)
+  published += len(orjson.dumps(jdata, option=orjson.OPT_SERIALIZE_NUMPY))
+  published += len(orjson.dumps({'objects': jdata['objects']}, option=orjson.OPT_SERIALIZE_NUMPY))
+  for region in range(REGIONS):
+    robjects = regionObjects(objects, region)
+    jdata['objects'] = buildDetectionsList(robjects, None)
+    published += len(orjson.dumps(jdata, option=orjson.OPT_SERIALIZE_NUMPY))
+    event = {'objects': list(buildDetectionsDict(robjects, None).values())}
+    published += len(orjson.dumps(event, option=orjson.OPT_SERIALIZE_NUMPY))
+  return published
+
+def publishCached(objects, cache):
+  published = 0
+  cache.nextFrame()
+  jdata = frameData()
+  jdata['objects'] = buildDetectionsList(objects, None, cache=cache)
+  published += len(composeDetections(splitDetections(jdata), cache.fragments(jdata['objects'])))
+  published += len(orjson.dumps({'objects': jdata['objects']}, option=orjson.OPT_SERIALIZE_NUMPY))
+  envelope = None
+  for region in range(REGIONS):
+    robjects = regionObjects(objects, region)
+    jdata['objects'] = buildDetectionsList(robjects, None, cache=cache)
+    envelope = envelope or splitDetections(jdata)
+    published += len(composeDetections(envelope, cache.fragments(jdata['objects'])))
+    event = {'objects': list(buildDetectionsDict(robjects, None, cache).values())}
+    published += len(orjson.dumps(event, option=orjson.OPT_SERIALIZE_NUMPY))
+  return published
+
+def measure(publish):
+  rng = np.random.default_rng(0)
+  objects = [PublishedObject(idx, rng) for idx in range(OBJECTS)]
+  published = 0
+  begin = time.monotonic()
+  for _ in range(FRAMES):
+    published += publish(objects)
+  elapsed = time.monotonic() - begin
+  return OBJECTS * FRAMES / elapsed, published / elapsed
+
+def test():
+  before = measure(publishUncached)
+  cache = DetectionsCache()
+  after = measure(lambda objects: publishCached(objects, cache))
+  log.log("Objects: %d Regions: %d" % (OBJECTS, REGIONS))
+  log.log("Uncached: %.0f objects/sec %.0f bytes/sec" % before)
+  log.log("Cached:   %.0f objects/sec %.0f bytes/sec" % after)
+  assert after[0] > before[0]
+  return 0
+
+if __name__ == '__main__':
+  exit(test() or 0)
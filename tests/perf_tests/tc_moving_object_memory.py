@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+# Measures the memory held per tracked object and the allocations made per
+# frame when every detection becomes a MovingObject continuing its track.
+
+import gc
+import time
+import tracemalloc
+
+from controller.moving_object import LOCATION_LIMIT, MovingObject
+from scene_common import log
+
+OBJECTS = 1000
+FRAMES = 4 * LOCATION_LIMIT
+# Allowed growth of the memory per object once the history is full
+MAX_GROWTH = 0.1
+
+def createFrame(frame, previous):
+  objects = []
+  for idx in range(OBJECTS):
+    info = {'id': idx, 'category': "person", 'confidence': 0.9,
+            'translation': [idx * 0.1, frame * 0.05, 0.0]}
+    obj = MovingObject(info, 1684272178.388 + frame * 0.1, None)
+    obj.sceneLoc
+    if previous:
+      obj.setPrevious(previous[idx])
+    else:
+      obj.setGID(f"gid-{idx}")
+    objects.append(obj)
+  return objects
+
+def tracedBlocks():
+  snapshot = tracemalloc.take_snapshot()
+  return sum(stat.count for stat in snapshot.statistics('filename'))
+
+def test():
+  gc.collect()
+  tracemalloc.start()
+  baseline = tracemalloc.get_traced_memory()[0]
+
+  objects = None
+  per_object = {}
+  blocks = []
+  collections = sum(stats['collections'] for stats in gc.get_stats())
+  begin = time.monotonic()
+  for frame in range(FRAMES):
+    measure = frame % LOCATION_LIMIT == LOCATION_LIMIT - 1
+    if measure:
+      before = tracedBlocks()
+    current = createFrame(frame, objects)
+    if measure:
+      # Count while the previous frame is still referenced
+      blocks.append(tracedBlocks() - before)
+    objects = current
+    if measure:
+      per_object[frame + 1] = (tracemalloc.get_traced_memory()[0] - baseline) / OBJECTS
+  elapsed = time.monotonic() - begin
+  collections = sum(stats['collections'] for stats in gc.get_stats()) - collections
+  tracemalloc.stop()
+
+  log.log("Objects: %d Frames: %d" % (OBJECTS, FRAMES))
+  for frame, size in per_object.items():
+    log.log("After %d frames: %.0f bytes per tracked object" % (frame, size))
+  log.log("Allocations per frame: %.0f" % (sum(blocks) / len(blocks)))
+  log.log("GC collections per frame: %.2f" % (collections / FRAMES))
+  log.log("Frame time (traced): %.2f ms" % (elapsed * 1000 / FRAMES))
+
+  full = per_object[2 * LOCATION_LIMIT]
+  assert per_object[FRAMES] <= full * (1 + MAX_GROWTH)
+  return 0
+
+if __name__ == '__main__':
+  exit(test() or 0)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+# Compares the recall and the query latency of the IVF and IVF-PQ local Re-ID
+# indexes with an exact brute force search, for the batched query of all
+# vectors collected for a track.
+
+import time
+
+import numpy as np
+
+from controller.reid_index import (DIMENSIONS, INDEX_FLAT, INDEX_IVF,
+                                   INDEX_IVFPQ, LocalReIDDatabase)
+from controller.uuid_manager import DEFAULT_MINIMUM_FEATURE_COUNT
+from scene_common import log
+
+IDENTITIES = 2000
+VECTORS_PER_IDENTITY = 25
+TRACKS = 200
+NOISE = 0.35
+# Minimum share of the queries matched to the same identity as brute force
+MIN_RECALL = {INDEX_IVF: 0.95, INDEX_IVFPQ: 0.85}
+
+def createData():
+  rng = np.random.default_rng(0)
+  centers = rng.normal(0, 1, (IDENTITIES, DIMENSIONS)).astype(np.float32)
+  centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+  def sample(center, count):
+    vectors = center + rng.normal(0, NOISE / np.sqrt(DIMENSIONS), (count, DIMENSIONS))
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+  entries = [sample(center, VECTORS_PER_IDENTITY) for center in centers]
+  tracks = [sample(centers[idx], DEFAULT_MINIMUM_FEATURE_COUNT)
+            for idx in rng.choice(IDENTITIES, TRACKS, replace=False)]
+  return entries, tracks
+
+def measure(index, entries, tracks):
+  database = LocalReIDDatabase(index=index)
+  database.connect()
+  begin = time.perf_counter()
+  for idx, vectors in enumerate(entries):
+    database.addEntry(f"uuid-{idx}", idx, "person", vectors)
+  build = time.perf_counter() - begin
+
+  matches = []
+  latencies = []
+  for vectors in tracks:
+    begin = time.perf_counter()
+    results = database.findSimilarityScores("person", vectors)
+    latencies.append(time.perf_counter() - begin)
+    matches.extend(entities[0]['uuid'] for entities in results)
+  return build, np.array(latencies) * 1000, matches
+
+def test():
+  entries, tracks = createData()
+  log.log("Entries: %d Tracks: %d Vectors per track: %d"
+          % (IDENTITIES * VECTORS_PER_IDENTITY, TRACKS, DEFAULT_MINIMUM_FEATURE_COUNT))
+  _, exact_latency, exact = measure(INDEX_FLAT, entries, tracks)
+  log.log("%s: query p50 %.2f ms p99 %.2f ms"
+          % (INDEX_FLAT, np.percentile(exact_latency, 50), np.percentile(exact_latency, 99)))
+
+  for index, min_recall in MIN_RECALL.items():
+    build, latency, matches = measure(index, entries, tracks)
+    recall = np.mean([match == expected for match, expected in zip(matches, exact)])
+    log.log("%s: recall@1 %.3f query p50 %.2f ms p99 %.2f ms speedup %.1fx build %.1f s"
+            % (index, recall, np.percentile(latency, 50), np.percentile(latency, 99),
+               np.median(exact_latency) / np.median(latency), build))
+    assert recall >= min_recall
+  return 0
+
+if __name__ == '__main__':
+  exit(test() or 0)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+# Measures how the throughput of the scene pipeline scales with the number
+# of shards. Camera messages are routed by the same scene partitioning as the
+# sharded SceneController and handled by SceneShardWorker in worker processes
+# through serveShard(), as in the controller. The MQTT broker is left out,
+# published messages are captured by CapturePubSub.
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import tempfile
+import time
+
+import orjson
+
+from controller import scene_controller
+from controller.replay import CapturePubSub
+from controller.scene_sharding import (SHARD_MOVING_OBJECT, SceneShardWorker,
+                                       serveShard, shardForScene)
+from scene_common import log
+from scene_common.mqtt import PubSub
+from scene_common.timestamp import get_epoch_time, get_iso_time
+
+TRACKER_CONFIG = "controller/config/tracker-config.json"
+SCHEMA = "controller/src/schema/metadata.schema.json"
+SCENES = 8
+OBJECTS = 10
+FRAMES = 200
+# Expected fraction of the speedup allowed by the partitioning
+MIN_EFFICIENCY = 0.7
+
+def sceneID(scene_idx):
+  return f"scene-{scene_idx}"
+
+def cameraID(scene_idx):
+  return f"camera-{scene_idx}"
+
+def sceneData(scene_idx):
+  return {
+    'uid': sceneID(scene_idx), 'name': sceneID(scene_idx),
+    'regulated_rate': 30, 'external_update_rate': 30,
+    'cameras': [{'uid': cameraID(scene_idx), 'name': cameraID(scene_idx),
+                 'resolution': [640, 480], 'intrinsics': {'fov': 70},
+                 'translation': [0, 0, 3], 'rotation': [-135, 0, 0], 'scale': [1, 1, 1]}],
+  }
+
+def createMessage(scene_idx, frame, base):
+  objects = []
+  for idx in range(OBJECTS):
+    objects.append({
+      'id': idx,
+      'category': 'person',
+      'confidence': 0.99,
+      'bounding_box': {'x': -0.5 + 0.1 * idx + 0.001 * frame, 'y': -0.3,
+                       'width': 0.08, 'height': 0.5},
+    })
+  return orjson.dumps({
+    'timestamp': get_iso_time(base + frame * 0.1),
+    'id': cameraID(scene_idx),
+    'objects': {'person': objects},
+    'rate': 10.0,
+  })
+
+def runBenchmarkShard(shard, shard_count, inbox, results, scene_file):
+  """! Same as runShardWorker(), with the MQTT connection replaced by a
+  CapturePubSub.
+  """
+  pubsub = CapturePubSub()
+  # SceneController creates its own PubSub
+  original = scene_controller.PubSub
+  scene_controller.PubSub = lambda *args, **kwargs: pubsub
+  try:
+    worker = SceneShardWorker(shard, shard_count, False, False, math.inf, None, None, None,
+                              None, None, None, None, TRACKER_CONFIG, SCHEMA, "regulated",
+                              [scene_file])
+  finally:
+    scene_controller.PubSub = original
+  worker.updateSubscriptions()
+  worker.updateObjectClasses()
+  results.put(None)
+  serveShard(worker, inbox)
+  for scene in worker.scenes:
+    for tracker in list(scene.tracker.trackers.values()):
+      tracker.waitForComplete()
+  end = time.monotonic()
+  count = sum(counts['count'] for counts in pubsub.published.values())
+  published = sum(counts['bytes'] for counts in pubsub.published.values())
+  results.put((shard, count, published, end))
+  for scene in worker.scenes:
+    scene.tracker.join()
+  return
+
+def measure(shard_count, scene_file):
+  context = multiprocessing.get_context('spawn')
+  results = context.Queue()
+  inboxes = [context.Queue() for _ in range(shard_count)]
+  workers = [context.Process(target=runBenchmarkShard,
+                             args=(shard, shard_count, inbox, results, scene_file))
+             for shard, inbox in enumerate(inboxes)]
+  for worker in workers:
+    worker.start()
+  # Wait for the scenes to be created before starting the clock
+  for worker in workers:
+    results.get()
+
+  base = get_epoch_time()
+  messages = [[(PubSub.formatTopic(PubSub.DATA_CAMERA, camera_id=cameraID(scene_idx)),
+                createMessage(scene_idx, frame, base)) for scene_idx in range(SCENES)]
+              for frame in range(FRAMES)]
+
+  begin = time.monotonic()
+  for frame in messages:
+    for scene_idx, (topic, payload) in enumerate(frame):
+      shard = shardForScene(sceneID(scene_idx), shard_count)
+      inboxes[shard].put((SHARD_MOVING_OBJECT, topic, payload))
+  for inbox in inboxes:
+    inbox.put(None)
+  finished = [results.get() for _ in workers]
+  elapsed = max(end for _, _, _, end in finished) - begin
+
+  for worker in workers:
+    worker.join()
+  sizes = shardSizes(shard_count)
+  for shard, count, size, _ in finished:
+    # A shard that failed to handle its messages publishes nothing
+    if sizes[shard]:
+      assert count > 0 and size > 0, f"Shard {shard} published nothing"
+  published = sum(size for _, _, size, _ in finished)
+  return SCENES * FRAMES / elapsed, published / elapsed
+
+def shardSizes(shard_count):
+  sizes = [0] * shard_count
+  for scene_idx in range(SCENES):
+    sizes[shardForScene(sceneID(scene_idx), shard_count)] += 1
+  return sizes
+
+def idealSpeedup(shard_count):
+  """! Hash partitioning is not always balanced, the busiest shard bounds
+  the speedup that can be reached.
+  """
+  return SCENES / max(shardSizes(shard_count))
+
+def test(max_shards=None):
+  max_shards = max_shards or min(os.cpu_count(), SCENES)
+  baseline = None
+  with tempfile.TemporaryDirectory() as tmpdir:
+    scene_file = os.path.join(tmpdir, "scenes.json")
+    with open(scene_file, "w") as f:
+      json.dump({'results': [sceneData(scene_idx) for scene_idx in range(SCENES)]}, f)
+    for shard_count in range(1, max_shards + 1):
+      rate, bandwidth = measure(shard_count, scene_file)
+      baseline = baseline or rate
+      speedup = rate / baseline
+      log.log("Shards: %d msgs/sec: %.1f bytes/sec: %.0f speedup: %.2f ideal: %.2f"
+              % (shard_count, rate, bandwidth, speedup, idealSpeedup(shard_count)))
+      assert speedup >= MIN_EFFICIENCY * idealSpeedup(shard_count)
+  return 0
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument("--shards", type=int, help="Maximum number of shards to measure")
+  exit(test(parser.parse_args().shards) or 0)
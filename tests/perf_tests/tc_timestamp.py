@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+# Compares the fixed layout timestamp parsing and cached formatting of
+# scene_common.timestamp with the strptime/strftime implementation.
+
+import time
+from datetime import datetime, timezone
+
+from scene_common import log
+from scene_common.timestamp import DATETIME_FORMAT, get_epoch_time, get_iso_time
+
+CALLS = 200000
+# Distinct timestamps formatted repeatedly, like first_seen of tracked objects
+OBJECTS = 1000
+
+def strptimeEpochTime(timestamp):
+  return datetime.strptime(timestamp, f"{DATETIME_FORMAT}Z").replace(tzinfo=timezone.utc).timestamp()
+
+def strftimeIsoTime(timestamp):
+  utc_time = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+  return f"{utc_time.strftime(DATETIME_FORMAT)[:-3]}Z"
+
+def measure(function, args):
+  begin = time.perf_counter()
+  for idx in range(CALLS):
+    function(args[idx % len(args)])
+  return (time.perf_counter() - begin) * 1e6 / CALLS
+
+def test():
+  epochs = [1684272178.388 + idx * 0.1 for idx in range(OBJECTS)]
+  strings = [strftimeIsoTime(epoch) for epoch in epochs]
+  assert [get_iso_time(epoch) for epoch in epochs] == strings
+  assert [get_epoch_time(string) for string in strings] \
+    == [strptimeEpochTime(string) for string in strings]
+
+  results = {
+    'parse': (measure(strptimeEpochTime, strings), measure(get_epoch_time, strings)),
+    'format': (measure(strftimeIsoTime, epochs), measure(get_iso_time, epochs)),
+  }
+  for name, (before, after) in results.items():
+    log.log("%s: strptime/strftime %.2f us fast path %.2f us speedup %.1fx"
+            % (name, before, after, before / after))
+    assert after < before
+  return 0
+
+if __name__ == '__main__':
+  exit(test() or 0)
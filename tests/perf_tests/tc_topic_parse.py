@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+# Compares the per message cost of PubSub.parseTopic, backed by the compiled
+# topic trie and its LRU cache, with scoring the topic against every template,
+# for a topic mix like the one received by the scene controller.
+
+import random
+import time
+
+from scene_common import log
+from scene_common.mqtt import PubSub, TopicRouter
+
+MESSAGES = 200000
+CAMERAS = 64
+SENSORS = 16
+SCENES = 8
+# Share of the messages per topic, cameras dominate the controller input
+TOPIC_MIX = (
+  (0.80, lambda rng: PubSub.formatTopic(PubSub.DATA_CAMERA,
+                                        camera_id=f"camera{rng.randrange(CAMERAS)}")),
+  (0.10, lambda rng: PubSub.formatTopic(PubSub.DATA_SENSOR,
+                                        sensor_id=f"sensor{rng.randrange(SENSORS)}")),
+  (0.05, lambda rng: PubSub.formatTopic(PubSub.DATA_REGULATED,
+                                        scene_id=f"scene{rng.randrange(SCENES)}")),
+  (0.05, lambda rng: PubSub.formatTopic(PubSub.EVENT, region_type="region",
+                                        scene_id=f"scene{rng.randrange(SCENES)}",
+                                        region_id=f"region{rng.randrange(4)}",
+                                        event_type="count")),
+)
+
+def linearParseTopic(topic_string):
+  topic_split = topic_string.split('/')
+  best_match = best_variables = None
+  best_score = 0
+  for key, templ in PubSub._TopicTemplates.items():
+    vsplit = templ.template.split('/')
+    if len(vsplit) != len(topic_split):
+      continue
+
+    static_score = var_score = 0
+    var_positions = []
+    for idx, (v_element, t_element) in enumerate(zip(vsplit, topic_split)):
+      if v_element == t_element:
+        static_score += 1
+      elif v_element.startswith("$"):
+        var_positions.append(idx)
+        var_score += 1
+    if static_score + var_score == len(vsplit) \
+       and static_score > best_score:
+      best_match = key
+      best_variables = var_positions
+
+  if best_match is not None:
+    parsed = {"_topic_id": best_match}
+    vsplit = PubSub._TopicTemplates[best_match].template.split('/')
+    for idx in best_variables:
+      parsed[vsplit[idx][2:-1]] = topic_split[idx]
+    return parsed
+  return None
+
+def createTopics():
+  rng = random.Random(0)
+  weights = [share for share, _ in TOPIC_MIX]
+  makers = [maker for _, maker in TOPIC_MIX]
+  return [rng.choices(makers, weights)[0](rng) for _ in range(MESSAGES)]
+
+def measure(function, topics):
+  begin = time.perf_counter()
+  for topic in topics:
+    function(topic)
+  return (time.perf_counter() - begin) * 1e6 / len(topics)
+
+def test():
+  topics = createTopics()
+  assert all(PubSub.parseTopic(topic) == linearParseTopic(topic) for topic in set(topics))
+
+  # Without the cache every topic walks the trie
+  uncached = TopicRouter(PubSub._TopicTemplates, cache_size=0)
+  results = {
+    'linear scan': measure(linearParseTopic, topics),
+    'trie': measure(uncached.parse, topics),
+    'trie + cache': measure(PubSub.parseTopic, topics),
+  }
+  log.log("Messages: %d distinct topics: %d" % (MESSAGES, len(set(topics))))
+  for name, cost in results.items():
+    log.log("%s: %.2f us per message" % (name, cost))
+  log.log("Speedup: %.1fx" % (results['linear scan'] / results['trie + cache']))
+  assert results['trie + cache'] < results['linear scan']
+  return 0
+
+if __name__ == '__main__':
+  exit(test() or 0)
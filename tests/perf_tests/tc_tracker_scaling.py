@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+# Measures the Python side cost of IntelLabsTracking per tracker step, i.e.
+# associating the reliable tracks with the detections and the previous
+# tracks, for an increasing number of concurrent tracks.
+
+import math
+import time
+
+from controller.ilabs_tracking import IntelLabsTracking
+from controller.moving_object import MovingObject
+from controller.tracking import (MAX_UNRELIABLE_TIME,
+                                 NON_MEASUREMENT_TIME_DYNAMIC,
+                                 NON_MEASUREMENT_TIME_STATIC)
+from scene_common import log
+
+TRACK_COUNTS = (50, 500, 2000)
+FRAME_RATE = 10
+WARMUP_FRAMES = 10
+FRAMES = 20
+# Distance between objects, well beyond the tracking radius
+SPACING = 5.0
+SPEED = 0.5
+# Allowed growth of the cost per track from the smallest to the largest count
+MAX_GROWTH = 4
+
+def createObjects(count, frame, when):
+  columns = math.ceil(math.sqrt(count))
+  objects = []
+  for idx in range(count):
+    x = (idx % columns) * SPACING + frame * SPEED / FRAME_RATE
+    y = (idx // columns) * SPACING
+    obj = MovingObject({'id': idx, 'category': "person", 'confidence': 0.9,
+                        'translation': [x, y, 0.0]}, when, None)
+    obj.sceneLoc
+    objects.append(obj)
+  return objects
+
+def measure(count):
+  tracker = IntelLabsTracking(MAX_UNRELIABLE_TIME, NON_MEASUREMENT_TIME_DYNAMIC,
+                              NON_MEASUREMENT_TIME_STATIC)
+  associate = tracker.associateTracks
+  elapsed = {'associate': 0.0}
+  def timedAssociate(*args):
+    begin = time.perf_counter()
+    associate(*args)
+    elapsed['associate'] += time.perf_counter() - begin
+    return
+  tracker.associateTracks = timedAssociate
+
+  begin = 1684272178.388
+  for frame in range(WARMUP_FRAMES + FRAMES):
+    if frame == WARMUP_FRAMES:
+      elapsed['associate'] = 0.0
+      step_begin = time.perf_counter()
+    when = begin + frame / FRAME_RATE
+    tracker.trackCategory(createObjects(count, frame, when), when, [])
+  step = (time.perf_counter() - step_begin) / FRAMES
+  tracks = len(tracker.all_tracker_objects)
+  tracker.uuid_manager.pool.shutdown(wait=False)
+  return tracks, step, elapsed['associate'] / FRAMES
+
+def test():
+  per_track = {}
+  for count in TRACK_COUNTS:
+    tracks, step, associate = measure(count)
+    assert tracks > 0
+    per_track[count] = associate / tracks
+    log.log("Tracks: %d step: %.2f ms association: %.2f ms (%.2f us per track)"
+            % (count, step * 1000, associate * 1000, per_track[count] * 1e6))
+
+  growth = per_track[TRACK_COUNTS[-1]] / per_track[TRACK_COUNTS[0]]
+  log.log("Association cost per track grows %.1fx from %d to %d tracks"
+          % (growth, TRACK_COUNTS[0], TRACK_COUNTS[-1]))
+  assert growth < MAX_GROWTH
+  return 0
+
+if __name__ == '__main__':
+  exit(test() or 0)
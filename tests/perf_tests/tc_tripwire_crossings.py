@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import time
+
+import numpy as np
+
+from scene_common import log
+from scene_common.batch_geometry import TripwireCrossings
+from scene_common.geometry import Line, Point, Tripwire
+
+OBJECTS = 500
+TRIPWIRES = 50
+FRAME_RATE = 30
+FRAMES = 100
+SCENE_SIZE = 50.0
+
+def createTripwires(rng):
+  tripwires = {}
+  for idx in range(TRIPWIRES):
+    start = rng.uniform(0, SCENE_SIZE, 2)
+    points = [start, start + rng.uniform(-5, 5, 2), start + rng.uniform(-5, 5, 2)]
+    tripwires[str(idx)] = Tripwire(str(idx), str(idx), {'points': [pt.tolist() for pt in points]})
+  return tripwires
+
+def createFrames(rng):
+  start = rng.uniform(0, SCENE_SIZE, (OBJECTS, 2))
+  frames = []
+  for _ in range(FRAMES):
+    end = start + rng.normal(0, 0.5, (OBJECTS, 2))
+    frames.append(np.stack([start, end], axis=1))
+    start = end
+  return frames
+
+def scalarDirections(tripwires, lines):
+  directions = np.zeros((len(lines), len(tripwires)), dtype=np.int8)
+  for row, line in enumerate(lines):
+    line = Line(Point(*line[0]), Point(*line[1]))
+    for column, tripwire in enumerate(tripwires.values()):
+      directions[row, column] = tripwire.lineCrosses(line)
+  return directions
+
+def test():
+  rng = np.random.default_rng(0)
+  tripwires = createTripwires(rng)
+  frames = createFrames(rng)
+  crossings = TripwireCrossings()
+  crossings.update(tripwires)
+
+  begin = time.monotonic()
+  batched = [crossings.directions(lines) for lines in frames]
+  batched_time = (time.monotonic() - begin) / FRAMES
+
+  begin = time.monotonic()
+  scalar = [scalarDirections(tripwires, lines) for lines in frames[:10]]
+  scalar_time = (time.monotonic() - begin) / 10
+
+  for expected, result in zip(scalar, batched):
+    assert (expected == result).all()
+
+  log.log("Objects: %d Tripwires: %d" % (OBJECTS, TRIPWIRES))
+  log.log("lineCrosses per frame: %.2f ms" % (scalar_time * 1000))
+  log.log("TripwireCrossings per frame: %.2f ms" % (batched_time * 1000))
+  log.log("Candidates per query:", crossings.index.stats['candidates_per_query'])
+  assert batched_time < 1 / FRAME_RATE
+  return 0
+
+if __name__ == '__main__':
+  exit(test() or 0)
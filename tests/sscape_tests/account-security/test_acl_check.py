@@ -0,0 +1,53 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+from string import Template
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from manager.models import PubSubACL
+from scene_common import mqtt
+from scene_common.mqtt import PubSub, TopicRouter
+from scene_common.options import CAN_SUBSCRIBE, READ_AND_WRITE, READ_ONLY, WRITE_ONLY
+
+class ACLCheckTestCase(TestCase):
+
+  def setUp(self):
+    self.user = User.objects.create_user('test_user', 'test_user@intel.com', 'testpassword')
+    return
+
+  def check(self, topic, access):
+    response = self.client.post('/api/v1/aclcheck',
+                                data={'username': 'test_user', 'topic': topic, 'acc': access})
+    return response.status_code, response.json()['result']
+
+  def test_acl_matches_template(self):
+    PubSubACL.objects.create(user=self.user, topic="DATA_CAMERA", access=READ_ONLY)
+    self.assertEqual(self.check("scenescape/data/camera/cam1", CAN_SUBSCRIBE), (200, 'allow'))
+    self.assertEqual(self.check("SceneScape/Data/Camera/cam1", CAN_SUBSCRIBE), (200, 'allow'))
+    self.assertEqual(self.check("scenescape/data/camera/cam1", WRITE_ONLY), (403, 'deny'))
+    self.assertEqual(self.check("scenescape/data/sensor/cam1", CAN_SUBSCRIBE), (403, 'deny'))
+    return
+
+  def test_acl_empty_segments(self):
+    PubSubACL.objects.create(user=self.user, topic="DATA_CAMERA", access=READ_AND_WRITE)
+    PubSubACL.objects.create(user=self.user, topic="DATA_SCENE", access=READ_AND_WRITE)
+    self.assertEqual(self.check("scenescape/data/camera/", CAN_SUBSCRIBE), (403, 'deny'))
+    self.assertEqual(self.check("scenescape/data/scene//person", CAN_SUBSCRIBE), (403, 'deny'))
+    return
+
+  def test_acl_topic_matching_two_templates(self):
+    # None of the templates overlap, make the sensor one match camera topics too
+    templates = dict(PubSub._TopicTemplates)
+    templates[PubSub.DATA_SENSOR] = Template("scenescape/data/${kind}/${sensor_id}")
+    PubSubACL.objects.create(user=self.user, topic="DATA_CAMERA", access=READ_ONLY)
+    PubSubACL.objects.create(user=self.user, topic="DATA_SENSOR", access=READ_AND_WRITE)
+    with patch.dict(PubSub._TopicTemplates, templates), \
+         patch.object(mqtt, '_acl_router', TopicRouter(templates, fold_case=True)):
+      # Every matching ACL is considered and the last one applies, not only
+      # the one of the most specific template
+      self.assertEqual(self.check("scenescape/data/camera/cam1", WRITE_ONLY), (200, 'allow'))
+      self.assertEqual(self.check("scenescape/data/other/s1", WRITE_ONLY), (200, 'allow'))
+    return
@@ -0,0 +1,209 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+from types import SimpleNamespace
+
+import numpy as np
+import open3d as o3d
+import pytest
+
+from scene_common import geometry
+from scene_common.batch_geometry import (RegionMembership, TripwireCrossings,
+                                         VolumetricIntersections, objectBoxes,
+                                         segmentCrossings)
+from scene_common.mesh_util import createObjectMesh, createRegionMesh
+
+REGIONS = {
+  'poly': {'points': [[2, 1], [5, 1], [5, 4], [2, 4]]},
+  'concave': {'points': [[0, 0], [6, 0], [6, 6], [3, 2], [0, 6]]},
+  'circle': {'area': 'circle', 'center': [5, 5], 'radius': 3},
+  'scene': {'area': 'scene'},
+  'line': {'points': [[0, 0], [4, 4]]},
+}
+
+def createRegions(names):
+  return {name: geometry.Region(name, name, REGIONS[name]) for name in names}
+
+def samplePoints():
+  rng = np.random.default_rng(7)
+  random_pts = rng.uniform(-2, 10, (500, 2))
+  # Points on vertices and edges exercise the boundary conditions
+  grid_pts = np.array([[x, y] for x in range(-1, 10) for y in range(-1, 10)], dtype=float)
+  return np.vstack([random_pts, grid_pts])
+
+@pytest.mark.parametrize("names",
+                        [(['poly']),
+                         (['concave', 'circle']),
+                         (['poly', 'concave', 'circle', 'scene', 'line'])])
+def test_pointsWithin(names):
+  """! Verifies 'RegionMembership.pointsWithin()' matches 'Region.isPointWithin()'. """
+
+  regions = createRegions(names)
+  membership = RegionMembership()
+  membership.update(regions)
+  points = samplePoints()
+
+  within = membership.pointsWithin(points)
+  assert within.shape == (len(points), len(regions))
+  for row, pt in enumerate(points):
+    for column, key in enumerate(membership.keys):
+      assert within[row, column] == regions[key].isPointWithin(geometry.Point(pt[0], pt[1]))
+
+  return
+
+def test_pointsWithin_empty():
+  """! Verifies 'RegionMembership.pointsWithin()' with no points and no regions. """
+
+  membership = RegionMembership()
+  membership.update(createRegions(['poly', 'circle']))
+  assert membership.pointsWithin(np.zeros((0, 2))).shape == (0, 2)
+
+  membership.update({})
+  assert membership.pointsWithin(samplePoints()).shape == (len(samplePoints()), 0)
+
+  return
+
+def test_invalidate():
+  """! Verifies the precomputed geometry is only refreshed after 'RegionMembership.invalidate()'. """
+
+  regions = createRegions(['poly'])
+  membership = RegionMembership()
+  membership.update(regions)
+  point = np.array([[8.0, 8.0]])
+  assert not membership.pointsWithin(point)[0, 0]
+
+  regions['poly'].updatePoints({'points': [[6, 6], [9, 6], [9, 9], [6, 9]]})
+  membership.invalidate()
+  membership.update(regions)
+  assert membership.pointsWithin(point)[0, 0]
+
+  return
+
+TRIPWIRES = {
+  'single': [[2, 2], [2, 8]],
+  'bent': [[0, 5], [5, 5], [5, 0]],
+  'crossed': [[0, 0], [8, 8], [8, 0], [0, 8]],
+  'far': [[100, 100], [101, 101]],
+}
+
+def sampleLines():
+  rng = np.random.default_rng(5)
+  start = rng.uniform(-1, 9, (400, 2))
+  random_lines = np.stack([start, start + rng.normal(0, 2, (400, 2))], axis=1)
+  # Lines ending on or running along the tripwires exercise the boundary conditions
+  edge_lines = np.array([[[x, y], [x2, y2]] for x, y in [(0, 0), (2, 5), (5, 5), (1, 3)]
+                         for x2, y2 in [(2, 2), (5, 0), (3, 5), (2, 8), (8, 8)]], dtype=float)
+  return np.vstack([random_lines, edge_lines])
+
+def test_directions():
+  """! Verifies 'TripwireCrossings.directions()' matches 'Tripwire.lineCrosses()'. """
+
+  tripwires = {name: geometry.Tripwire(name, name, {'points': points})
+               for name, points in TRIPWIRES.items()}
+  crossings = TripwireCrossings()
+  crossings.update(tripwires)
+  lines = sampleLines()
+
+  directions = crossings.directions(lines)
+  assert directions.shape == (len(lines), len(tripwires))
+  assert directions.any()
+  for row, line in enumerate(lines):
+    line = geometry.Line(geometry.Point(*line[0]), geometry.Point(*line[1]))
+    for column, key in enumerate(crossings.keys):
+      assert directions[row, column] == tripwires[key].lineCrosses(line)
+
+  assert crossings.directions(np.zeros((0, 2, 2))).shape == (0, len(tripwires))
+  return
+
+def test_segmentCrossings():
+  """! Verifies 'segmentCrossings()' broadcasts lines against segments. """
+
+  lines = np.array([[[0, 0], [2, 2]], [[0, 2], [2, 0]], [[3, 3], [4, 4]]], dtype=float)
+  segments = np.array([[[0, 1], [2, 1]], [[1, 0], [1, 2]]], dtype=float)
+  result = segmentCrossings(lines[:, None], segments[None])
+
+  assert result.shape == (3, 2)
+  assert (result == [[-1, 1], [1, 1], [0, 0]]).all()
+  return
+
+VOLUMES = {
+  'box': {'points': [[2, 1], [5, 1], [5, 4], [2, 4]], 'height': 2.0},
+  'concave': {'points': [[0, 0], [6, 0], [6, 6], [3, 2], [0, 6]], 'height': 1.0},
+  'buffered': {'points': [[7, 7], [9, 7], [8, 9]], 'height': 0.5, 'buffer_size': 0.3},
+  'flat': {'points': [[-2, -2], [-1, -2], [-1, -1]], 'volumetric': False},
+}
+
+def sampleObjects(count):
+  rng = np.random.default_rng(11)
+  quaternions = rng.normal(size=(count, 4))
+  # Upright objects turning about z, as tracked objects usually are
+  quaternions[:count // 2, :2] = 0
+  objects = []
+  for idx in range(count):
+    x, y = rng.uniform(-3, 11, 2)
+    objects.append(SimpleNamespace(gid=idx, sceneLoc=geometry.Point(x, y, rng.uniform(-1.5, 2.5)),
+                                   size=rng.uniform(0.1, 2.0, 3).tolist(),
+                                   rotation=quaternions[idx].tolist()))
+  return objects
+
+def meshesOverlap(obj_mesh, region_mesh):
+  """! Open3D reference: the surfaces cross, or one solid holds the other. """
+  if obj_mesh.is_intersecting(region_mesh):
+    return True
+  for solid, other in ((obj_mesh, region_mesh), (region_mesh, obj_mesh)):
+    scene = o3d.t.geometry.RaycastingScene()
+    scene.add_triangles(o3d.t.geometry.TriangleMesh.from_legacy(solid))
+    points = o3d.core.Tensor(np.asarray(other.vertices), dtype=o3d.core.float32)
+    if scene.compute_occupancy(points).numpy().any():
+      return True
+  return False
+
+def test_boxesIntersecting():
+  """! Verifies 'VolumetricIntersections.boxesIntersecting()' against the
+  Open3D meshes of 'createObjectMesh()' and 'createRegionMesh()'.
+  """
+
+  regions = {name: geometry.Region(name, name, dict({'volumetric': True}, **info))
+             for name, info in VOLUMES.items()}
+  volumes = VolumetricIntersections()
+  volumes.update(regions)
+  assert volumes.active
+  objects = sampleObjects(300)
+
+  bottoms, sizes, rotations, valid = objectBoxes(objects)
+  assert valid.all()
+  result = volumes.boxesIntersecting(bottoms, sizes, rotations)
+  assert result.shape == (len(objects), len(regions))
+  assert result.any()
+  assert not result[:, volumes.keys.index('flat')].any()
+
+  for column, key in enumerate(volumes.keys):
+    region = regions[key]
+    if not region.compute_intersection:
+      continue
+    createRegionMesh(region)
+    for row, obj in enumerate(objects):
+      createObjectMesh(obj)
+      assert result[row, column] == meshesOverlap(obj.mesh, region.mesh)
+
+  exclude = np.zeros_like(result)
+  exclude[::2] = True
+  assert (volumes.boxesIntersecting(bottoms, sizes, rotations, exclude=exclude)
+          == (result & ~exclude)).all()
+  return
+
+def test_boxesIntersecting_invalid():
+  """! Verifies objects without a usable box are flagged and nothing is
+  tested without volumetric regions.
+  """
+
+  objects = [SimpleNamespace(sceneLoc=geometry.Point(1, 1, 0), size=None, rotation=[0, 0, 0, 1]),
+             SimpleNamespace(sceneLoc=geometry.Point(1, 1, 0), size=[1, 1, 1], rotation=[0, 0, 1]),
+             SimpleNamespace(sceneLoc=geometry.Point(1, 1, 0), size=[1, 1, 1], rotation=[0, 0, 0, 1])]
+  assert objectBoxes(objects)[3].tolist() == [False, False, True]
+
+  volumes = VolumetricIntersections()
+  volumes.update(createRegions(['poly', 'circle']))
+  assert not volumes.active
+  assert volumes.boxesIntersecting(*objectBoxes(objects)[:3]).shape == (3, 2)
+  return
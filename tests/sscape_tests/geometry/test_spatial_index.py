@@ -0,0 +1,91 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+import pytest
+
+from scene_common.spatial_index import SpatialGrid
+
+BOXES = {
+  'small': (1.0, 1.0, 2.5, 1.5),
+  'wide': (-4.0, 3.0, 12.0, 5.0),
+  'point': (7.0, 7.0, 7.0, 7.0),
+  'huge': (-1000.0, -1000.0, 1000.0, 1000.0),
+}
+
+def overlaps(box, query):
+  return box[0] <= query[2] and query[0] <= box[2] and box[1] <= query[3] and query[1] <= box[3]
+
+def candidateSets(grid, queries):
+  query_idx, slots = grid.query(queries)
+  found = [set() for _ in queries]
+  for idx, slot in zip(query_idx, slots):
+    found[idx].add(grid.slot_keys[slot])
+  return found
+
+def sampleQueries():
+  rng = np.random.default_rng(11)
+  low = rng.uniform(-8, 15, (300, 2))
+  size = rng.exponential(1.5, (300, 2))
+  return np.hstack([low, low + size])
+
+@pytest.mark.parametrize("cell_size", [(0.5), (2.0), (50.0)])
+def test_query(cell_size):
+  """! Verifies 'SpatialGrid.query()' returns every overlapping entry. """
+
+  grid = SpatialGrid(cell_size, max_cells=256)
+  for key, box in BOXES.items():
+    assert grid.insert(key, box)
+  queries = sampleQueries()
+
+  for query, found in zip(queries, candidateSets(grid, queries)):
+    for key, box in BOXES.items():
+      if overlaps(box, query):
+        assert key in found
+
+  stats = grid.stats
+  assert stats['queries'] == len(queries)
+  assert stats['candidates_per_query'] <= len(BOXES)
+  return
+
+def test_query_selective():
+  """! Verifies distant entries are not returned as candidates. """
+
+  grid = SpatialGrid(1.0)
+  for idx in range(100):
+    grid.insert(idx, (idx * 10.0, 0.0, idx * 10.0 + 1.0, 1.0))
+
+  point_idx, slots = grid.queryPoints(np.array([[500.5, 0.5], [-50.0, 0.0]]))
+  assert list(point_idx) == [0]
+  assert grid.slot_keys[slots[0]] == 50
+  assert grid.stats['candidates_per_query'] == 0.5
+  return
+
+def test_insert_remove():
+  """! Verifies incremental updates move and remove entries. """
+
+  grid = SpatialGrid(1.0)
+  grid.insert('a', (0.0, 0.0, 1.0, 1.0))
+  grid.insert('b', (5.0, 5.0, 6.0, 6.0))
+  assert not grid.insert('a', (0.0, 0.0, 1.0, 1.0))
+
+  assert grid.insert('a', (5.5, 5.5, 6.5, 6.5))
+  assert candidateSets(grid, [(0.5, 0.5, 0.5, 0.5), (6.0, 6.0, 6.0, 6.0)]) == [set(), {'a', 'b'}]
+
+  assert grid.remove('b')
+  assert not grid.remove('b')
+  assert 'b' not in grid and len(grid) == 1
+  assert candidateSets(grid, [(6.0, 6.0, 6.0, 6.0)]) == [{'a'}]
+
+  grid.insert('c', (0.0, 0.0, 0.5, 0.5))
+  assert candidateSets(grid, [(0.1, 0.1, 0.1, 0.1)]) == [{'c'}]
+  return
+
+def test_query_nonfinite():
+  """! Verifies queries with NaN coordinates only match ungridded entries. """
+
+  grid = SpatialGrid(1.0, max_cells=4)
+  grid.insert('small', BOXES['small'])
+  grid.insert('huge', BOXES['huge'])
+  assert candidateSets(grid, [(np.nan, 0.0, np.nan, 0.0)]) == [{'huge'}]
+  return
@@ -260,3 +260,61 @@ def test_getHeading():
     error = np.linalg.norm(calc_pt - expected_outputs[i])
     assert error < 1  # degrees
   return
+
+def test_convertECEFToLLABatch():
+  """ Test the closed form batch conversion against convertECEFToLLA for
+  points from below the surface up to low earth orbit, including the poles.
+  """
+  rng = np.random.default_rng(0)
+  lla_pts = rng.uniform([-90.0, -180.0, -500.0], [90.0, 180.0, 1e+6], (2000, 3))
+  lla_pts[:2] = [[90.0, 0.0, 10.0], [-90.0, 45.0, 0.0]]
+  ecef_pts = np.array([earth_lla.convertLLAToECEF(pt) for pt in lla_pts])
+
+  calc_pts = earth_lla.convertECEFToLLABatch(ecef_pts)
+  assert calc_pts.shape == (len(ecef_pts), 3)
+  for ecef_pt, calc_pt in zip(ecef_pts[2:], calc_pts[2:]):
+    assert calcLLAError(calc_pt, earth_lla.convertECEFToLLA(ecef_pt)) < 1e-6
+  # convertECEFToLLA breaks down at the poles, the closed form does not
+  for lla_pt, calc_pt in zip(lla_pts, calc_pts):
+    assert calcLLAError(calc_pt, lla_pt) < 1e-6
+
+  # Deep inside the earth both fall back to a sphere
+  inside = np.array([[1.0, 2.0, 3.0]])
+  assert np.allclose(earth_lla.convertECEFToLLABatch(inside)[0], earth_lla.convertECEFToLLA(inside[0]))
+  assert earth_lla.convertECEFToLLABatch(np.zeros((0, 3))).shape == (0, 3)
+  return
+
+def test_convertXYZToLLABatch(lla_datafile):
+  with open(lla_datafile, 'r') as f:
+    inputs = json.load(f)
+  map_pts = np.array(inputs[0]['map points'])
+  trs_mat = earth_lla.calculateTRSLocal2LLAFromSurfacePoints(map_pts[:4], inputs[0]['lat, long, altitude points'][:4])
+  rng = np.random.default_rng(1)
+  pts = np.vstack([map_pts, rng.uniform([-50, -50, -5], [250, 250, 20], (200, 3))])
+
+  calc_pts = earth_lla.convertXYZToLLABatch(trs_mat, pts)
+  for pt, calc_pt in zip(pts, calc_pts):
+    assert calcLLAError(calc_pt, earth_lla.convertXYZToLLA(trs_mat, pt)) < 1e-6
+  return
+
+def test_calculateHeadingBatch(lla_datafile):
+  with open(lla_datafile, 'r') as f:
+    inputs = json.load(f)
+  map_pts = np.array(inputs[0]['map points'])
+  trs_mat = earth_lla.calculateTRSLocal2LLAFromSurfacePoints(map_pts[:4], inputs[0]['lat, long, altitude points'][:4])
+  rng = np.random.default_rng(2)
+  pts = rng.uniform([0, 0, 0], [170, 190, 2], (200, 3))
+  velocities = rng.normal(0, 2, (200, 3))
+
+  headings = earth_lla.calculateHeadingBatch(trs_mat, pts, velocities)
+  assert headings.shape == (len(pts),)
+  for pt, velocity, heading in zip(pts, velocities, headings):
+    expected = earth_lla.calculateHeading(trs_mat, pt, velocity)
+    # Compare on the circle, 359.9999 and 0.0 are the same heading
+    assert abs((heading - expected + 180) % 360 - 180) < 1e-6
+
+  a = earth_lla.SPHERICAL_RADIUS
+  headings = earth_lla.calculateHeadingBatch(np.identity(4), [[a, 0, 0]] * 3,
+                                             [[0, 0, 1], [0, 1, 0], [0, 1, 1]])
+  assert np.allclose(headings, [0, 90, 44.808], atol=1e-3)
+  return
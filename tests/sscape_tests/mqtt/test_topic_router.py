@@ -0,0 +1,88 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+from string import Template
+
+import pytest
+
+from scene_common.mqtt import PubSub, TopicRouter
+
+@pytest.mark.parametrize("topic_id, identifiers",
+                         [(PubSub.CMD_DATABASE, {}),
+                          (PubSub.DATA_CAMERA, {'camera_id': "camera1"}),
+                          (PubSub.DATA_CAMERA_BIN, {'camera_id': "camera1"}),
+                          (PubSub.DATA_SCENE, {'scene_id': "3bc0", 'thing_type': "person"}),
+                          (PubSub.EVENT, {'region_type': "region", 'scene_id': "3bc0",
+                                          'region_id': "r1", 'event_type': "count"})])
+def test_parseTopic(topic_id, identifiers):
+  """! Verifies a formatted topic parses back into its template and identifiers.
+
+  @param    topic_id       Topic template
+  @param    identifiers    Values of the named identifiers of the template
+  """
+  topic = PubSub.formatTopic(topic_id, **identifiers)
+  assert PubSub.parseTopic(topic) == {'_topic_id': topic_id, **identifiers}
+  assert PubSub.parseTopic(topic) is not PubSub.parseTopic(topic)
+  return
+
+@pytest.mark.parametrize("topic", ["scenescape/data/camera", "scenescape/data/camera/a/b",
+                                   "other/data/camera/a", "scenescape/data/unknown/a",
+                                   "scenescape/data/camera/", "scenescape/data/scene//person"])
+def test_parseUnknownTopic(topic):
+  """! Verifies topics not matching any template are not parsed.
+
+  @param    topic    Topic string
+  """
+  assert PubSub.parseTopic(topic) is None
+  return
+
+def test_staticSegmentsPreferred():
+  """! Verifies the template with the most static segments wins when a topic
+  matches several templates, and the cache does not leak between topics.
+  """
+  router = TopicRouter({
+    'any': Template("base/${kind}/${item_id}"),
+    'camera': Template("base/camera/${camera_id}"),
+  }, cache_size=1)
+  assert router.parse("base/camera/c1") == {'_topic_id': 'camera', 'camera_id': "c1"}
+  assert router.parse("base/sensor/s1") == {'_topic_id': 'any', 'kind': "sensor", 'item_id': "s1"}
+  assert router.parse("base/camera/c2") == {'_topic_id': 'camera', 'camera_id': "c2"}
+  assert router.cacheInfo().misses == 3
+  return
+
+def test_matchTopic():
+  """! Verifies matching a topic against a single template. """
+
+  template = PubSub.getTopicByTemplateName("DATA_CAMERA").template
+  assert PubSub.match_topic(template, "scenescape/data/camera/cam1") == ("cam1",)
+  assert PubSub.match_topic(template, "scenescape/data/sensor/cam1") is None
+  return
+
+def test_emptySegments():
+  """! Verifies variables match empty segments neither in the router nor in
+  match_topic, so the router can prefilter the templates for match_topic.
+  """
+  for topic in ("scenescape/data/camera/", "scenescape/data/scene//person"):
+    assert PubSub.candidateTopics(topic) == set()
+    for topic_id in PubSub._TopicTemplates:
+      assert PubSub.match_topic(PubSub._TopicTemplates[topic_id].template, topic) is None
+  return
+
+def test_candidates():
+  """! Verifies every template a topic matches is a candidate, most static
+  segments first, and that case is only ignored when asked for.
+  """
+  templates = {
+    'any': Template("base/${kind}/${item_id}"),
+    'camera': Template("base/camera/${camera_id}"),
+  }
+  router = TopicRouter(templates)
+  assert router.candidates("base/camera/c1") == ('camera', 'any')
+  assert router.candidates("base/sensor/s1") == ('any',)
+  assert router.candidates("BASE/camera/c1") == ()
+
+  router = TopicRouter(templates, fold_case=True)
+  assert router.candidates("BASE/Camera/C1") == ('camera', 'any')
+  assert router.parse("BASE/Camera/C1") == {'_topic_id': 'camera', 'camera_id': "C1"}
+  assert PubSub.candidateTopics("SceneScape/data/camera/cam1") == {"DATA_CAMERA"}
+  return
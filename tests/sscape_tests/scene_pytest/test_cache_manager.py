@@ -0,0 +1,172 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import copy
+import json
+import threading
+from http import HTTPStatus
+
+import pytest
+
+from controller.cache_manager import CacheManager, parameterFingerprint
+from scene_common.rest_client import RESTResult
+
+SCENES = [
+  {'uid': "scene-1", 'name': "Scene 1",
+   'cameras': [{'uid': "cam-1", 'name': "Camera 1", 'resolution': [640, 480]},
+               {'uid': "cam-2", 'name': "Camera 2", 'resolution': [640, 480]}],
+   'regions': [{'uid': "region-1", 'name': "Region 1", 'points': [[0, 0], [2, 0], [2, 2]]},
+               {'uid': "region-2", 'name': "Region 2", 'points': [[5, 5], [7, 5], [7, 7]]}],
+   'sensors': [{'uid': "sensor-1", 'name': "Sensor 1", 'area': "scene"}]},
+  {'uid': "scene-2", 'name': "Scene 2",
+   'cameras': [{'uid': "cam-3", 'name': "Camera 3", 'resolution': [640, 480]}]},
+]
+
+@pytest.fixture
+def cache_manager(tmp_path):
+  path = tmp_path / "scenes.json"
+  path.write_text(json.dumps({'results': SCENES}))
+  cache_manager = CacheManager(data_source=[str(path)])
+  cache_manager.data_source.scenes = copy.deepcopy(SCENES)
+  return cache_manager
+
+def test_refreshScene(cache_manager):
+  """! Verifies a scene refresh only rebuilds the parts of the scene that
+  changed and leaves the other scenes alone.
+  """
+  scene = cache_manager.sceneWithID("scene-1")
+  other = cache_manager.sceneWithID("scene-2")
+  cameras = dict(scene.cameras)
+  regions = dict(scene.regions)
+
+  scene_data = cache_manager.data_source.scenes[0]
+  scene_data['regions'][1]['points'] = [[5, 5], [9, 5], [9, 9]]
+  scene_data['cameras'][1]['resolution'] = [1280, 720]
+  cache_manager.requestRefresh("scene-1")
+  assert cache_manager.waitForRefresh(5)
+
+  assert cache_manager.sceneWithID("scene-1") is scene
+  assert scene.cameras["cam-1"] is cameras["cam-1"]
+  assert scene.cameras["cam-2"] is not cameras["cam-2"]
+  assert scene.regions["region-1"] is regions["region-1"]
+  assert scene.regions["region-2"].points[1].x == 9
+  assert cache_manager.sceneWithCameraID("cam-2") is scene
+  assert cache_manager.sceneWithID("scene-2") is other
+
+  del cache_manager.data_source.scenes[1]
+  cache_manager.requestRefresh("scene-2")
+  assert cache_manager.waitForRefresh(5)
+  assert cache_manager.sceneWithID("scene-2") is None
+  assert cache_manager.sceneWithCameraID("cam-3") is None
+  return
+
+def test_conditionalRefresh(cache_manager, monkeypatch):
+  """! Verifies scenes that were not modified are not updated, and new and
+  modified scenes are picked up by a refresh of all scenes.
+  """
+  updated = []
+  etags = []
+  scenes = cache_manager.data_source.scenes
+
+  def getScenes(etag=None):
+    etags.append(etag)
+    if etag == str(len(scenes)):
+      return RESTResult(HTTPStatus.NOT_MODIFIED)
+    result = RESTResult(HTTPStatus.OK)
+    result.update({'results': scenes})
+    result.etag = str(len(scenes))
+    return result
+
+  monkeypatch.setattr(cache_manager.data_source, "getScenes", getScenes)
+  for scene in cache_manager.allScenes():
+    monkeypatch.setattr(scene, "updateScene", lambda data, uid=scene.uid: updated.append(uid))
+
+  cache_manager.refreshScenes()
+  cache_manager.refreshScenes()
+  assert etags == [None, "2"]
+  assert updated == []
+
+  scenes.append({'uid': "scene-3", 'name': "Scene 3"})
+  scenes[0] = dict(scenes[0], name="Renamed")
+  cache_manager.invalidate()
+  assert cache_manager.waitForRefresh(5)
+  assert updated == ["scene-1"]
+  assert cache_manager.sceneWithID("scene-3").name == "Scene 3"
+  return
+
+def test_refreshOffThread(cache_manager, monkeypatch):
+  """! Verifies requesting a refresh does not wait on the data source and
+  the cached scenes stay available while it runs.
+  """
+  release = threading.Event()
+  getScene = cache_manager.data_source.getScene
+
+  def slowGetScene(scene_uid, etag=None):
+    release.wait(5)
+    return getScene(scene_uid, etag)
+
+  monkeypatch.setattr(cache_manager.data_source, "getScene", slowGetScene)
+  scene = cache_manager.sceneWithCameraID("cam-1")
+  cache_manager.requestRefresh("scene-1")
+  cache_manager.requestRefresh("scene-1")
+  assert not cache_manager.waitForRefresh(0.1)
+  assert cache_manager.sceneWithCameraID("cam-1") is scene
+
+  release.set()
+  assert cache_manager.waitForRefresh(5)
+  return
+
+def test_cameraParameters(cache_manager, monkeypatch):
+  """! Verifies parameters sent by a camera rebuild only that camera when
+  they change, and are ignored when they repeat.
+  """
+  requested = []
+  monkeypatch.setattr(cache_manager, "requestRefresh", requested.append)
+  scene = cache_manager.sceneWithID("scene-1")
+  other = scene.cameras["cam-2"]
+  message = {'id': "cam-1", 'intrinsics': {'fx': 500, 'fy': 500, 'cx': 320, 'cy': 240},
+             'distortion': {'k1': 0, 'k2': 0, 'p1': 0, 'p2': 0, 'k3': 0}}
+
+  cache_manager.refreshScenesForCamParams(message)
+  camera = scene.cameras["cam-1"]
+  assert camera.pose.intrinsics.intrinsics[0, 0] == 500
+  assert cache_manager.camera_parameters["cam-1"]['resolution'] == [640, 480]
+  assert scene.cameras["cam-2"] is other
+  assert requested == ["scene-1"]
+
+  cache_manager.refreshScenesForCamParams(dict(message))
+  assert scene.cameras["cam-1"] is camera
+  assert requested == ["scene-1"]
+
+  message['intrinsics'] = dict(message['intrinsics'], fx=600)
+  cache_manager.refreshScenesForCamParams(message)
+  assert scene.cameras["cam-1"].pose.intrinsics.intrinsics[0, 0] == 600
+  assert requested == ["scene-1", "scene-1"]
+  return
+
+def test_sceneFilter(tmp_path):
+  """! Verifies scenes rejected by the filter are never built. """
+  path = tmp_path / "scenes.json"
+  path.write_text(json.dumps({'results': SCENES}))
+  cache_manager = CacheManager(data_source=[str(path)],
+                               scene_filter=lambda scene_data: scene_data['uid'] == "scene-2")
+
+  assert [scene.uid for scene in cache_manager.allScenes()] == ["scene-2"]
+  assert cache_manager.sceneWithCameraID("cam-1") is None
+  assert cache_manager.sceneWithCameraID("cam-3") is not None
+
+  cache_manager.refreshScene("scene-1")
+  assert cache_manager.sceneWithID("scene-1") is None
+  return
+
+def test_parameterFingerprint():
+  """! Verifies fingerprints compare equal only for equal parameters, even
+  when their hashes collide.
+  """
+  intrinsics = {'fx': 905.0, 'fy': 905.0, 'cx': 320.0, 'cy': 240.0}
+  assert parameterFingerprint((intrinsics, [0.1, 0.0])) == parameterFingerprint((dict(intrinsics), [0.1, 0.0]))
+  assert parameterFingerprint((intrinsics, [0.1, 0.0])) != parameterFingerprint((intrinsics, [0.1, 0.2]))
+  assert parameterFingerprint({'fx': 1}) != parameterFingerprint([['fx', 1]])
+  # hash(-1) == hash(-2) in CPython
+  assert parameterFingerprint([-1]) != parameterFingerprint([-2])
+  return
@@ -0,0 +1,157 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import importlib.util
+import json
+import os
+
+import numpy as np
+import orjson
+import pytest
+
+from scene_common.camera_codec import (BOX_FIELDS, HEADER, ID_DTYPE, MAGIC,
+                                       VALUE_DTYPE, cameraDataToMessage,
+                                       decodeCameraData, encodeCameraData,
+                                       isEncodedCameraData)
+from scene_common.reid_codec import (REID_DIMENSIONS, decodeReIDVector,
+                                     encodeReIDVector)
+
+ADAPTER_CODEC = "dlstreamer-pipeline-server/user_scripts/gvapython/sscape/sscape_codec.py"
+
+def detectorMessage():
+  rng = np.random.default_rng(0)
+  people = []
+  for idx in range(3):
+    people.append({
+      'id': idx + 1,
+      'category': "person",
+      'confidence': 0.75 + idx / 8,
+      'center_of_mass': {'x': 120 + idx, 'y': 40, 'width': 12.5, 'height': 30.25},
+      'bounding_box_px': {'x': 100 + idx, 'y': 10, 'width': 38, 'height': 121},
+      'reid': encodeReIDVector(rng.normal(0, 1, REID_DIMENSIONS)),
+    })
+  del people[1]['reid']
+  cars = [
+    {'id': 1, 'category': "car", 'confidence': 0.5, 'translation': [1.0, 2.0, 3.0],
+     'rotation': [0, 0, 0, 1], 'size': [4.5, 1.75, 1.5], 'text': "ABC123"},
+    {'id': 2, 'category': "car", 'bounding_box_px': {'x': 5, 'y': 6, 'width': 7, 'height': 8}},
+  ]
+  return {'id': "camera1", 'timestamp': "2025-05-16T21:22:58.388Z", 'rate': 15.0,
+          'objects': {'person': people, 'car': cars, 'bicycle': []}}
+
+def test_roundTrip():
+  """! Verifies a message decodes to the same message JSON would parse to,
+  with the arrays of each category in between.
+  """
+  jdata = detectorMessage()
+  payload = encodeCameraData(jdata)
+  assert isEncodedCameraData(payload)
+  assert not isEncodedCameraData(json.dumps(jdata).encode('utf-8'))
+
+  decoded = decodeCameraData(payload)
+  people = decoded['objects']['person']
+  assert people['id'].dtype == ID_DTYPE
+  assert people['id'].tolist() == [1, 2, 3]
+  for field in BOX_FIELDS:
+    assert people[field].dtype == VALUE_DTYPE
+    assert people[field].shape == (3, 4)
+  assert people['reid'].shape == (3, REID_DIMENSIONS)
+  assert np.isnan(people['reid'][1]).all()
+  assert decoded['objects']['car']['reid'] is None
+  assert decoded['objects']['bicycle']['id'].shape == (0,)
+
+  message = cameraDataToMessage(decoded)
+  expected = orjson.loads(json.dumps(jdata))
+  for category, objects in message['objects'].items():
+    for obj, expected_obj in zip(objects, expected['objects'][category]):
+      if 'reid' in expected_obj:
+        # Re-ID vectors are kept as the arrays decodeReIDVector returns
+        reid = obj.pop('reid')
+        assert reid.dtype == VALUE_DTYPE and reid.shape == (1, REID_DIMENSIONS)
+        assert np.array_equal(reid, decodeReIDVector(expected_obj.pop('reid')))
+  assert message == expected
+  return
+
+def test_lowerPrecision():
+  """! Verifies floats travel as float32. """
+  jdata = {'id': "camera1", 'timestamp': "2025-05-16T21:22:58.388Z",
+           'objects': {'person': [{'id': 1, 'category': "person", 'confidence': 0.87,
+                                   'translation': [1, 2, 3], 'size': [1, 1, 2]}]}}
+  message = cameraDataToMessage(decodeCameraData(encodeCameraData(jdata)))
+  assert message['objects']['person'][0]['confidence'] == pytest.approx(0.87, rel=1e-7)
+  assert message['objects']['person'][0]['confidence'] == 0.8700000047683716
+  return
+
+def test_invalidPayload():
+  """! Verifies payloads that can not be decoded are rejected. """
+  payload = encodeCameraData(detectorMessage())
+  with pytest.raises(ValueError):
+    decodeCameraData(payload[:HEADER.size - 1])
+  with pytest.raises(ValueError):
+    decodeCameraData(payload[:-4])
+  with pytest.raises(ValueError):
+    decodeCameraData(payload + b"\0\0\0\0")
+  with pytest.raises(ValueError):
+    decodeCameraData(HEADER.pack(MAGIC, 2, 0, 0))
+  with pytest.raises(ValueError):
+    decodeCameraData(b"{" + payload[1:])
+  return
+
+@pytest.mark.parametrize("obj", [
+  ({'id': 1, 'category': "person", 'confidence': 0.5}),
+  ({'id': 1, 'category': "person", 'confidence': 0.0,
+    'bounding_box_px': {'x': 5, 'y': 6, 'width': 7, 'height': 8}}),
+  ({'id': 1, 'category': "person",
+    'bounding_box_px': {'x': 5, 'y': 6, 'width': -7, 'height': 8}}),
+  ({'id': 1, 'category': "person", 'center_of_mass': {'x': 5, 'y': 6, 'width': 7, 'height': -8},
+    'bounding_box_px': {'x': 5, 'y': 6, 'width': 7, 'height': 8}}),
+])
+def test_invalidObjects(obj):
+  """! Verifies objects the detector schema rejects are rejected when the
+  message is built from the arrays.
+  """
+  jdata = {'id': "camera1", 'timestamp': "2025-05-16T21:22:58.388Z", 'objects': {'person': [obj]}}
+  decoded = decodeCameraData(encodeCameraData(jdata))
+  with pytest.raises(ValueError):
+    cameraDataToMessage(decoded)
+  return
+
+def encodeHeader(header):
+  header = json.dumps(header).encode('utf-8')
+  header += b" " * (-(HEADER.size + len(header)) % 4)
+  return HEADER.pack(MAGIC, 1, 0, len(header)) + header
+
+@pytest.mark.parametrize("header", [
+  ([]),
+  ({'categories': []}),
+  ({'frame': {'id': "camera1"}}),
+  ({'frame': [], 'categories': []}),
+  ({'frame': {}, 'categories': {}}),
+  ({'frame': {}, 'categories': ["person"]}),
+  ({'frame': {}, 'categories': [{'name': "person", 'reid': 0}]}),
+  ({'frame': {}, 'categories': [{'name': "person", 'count': "1", 'reid': 0}]}),
+  ({'frame': {}, 'categories': [{'name': "person", 'count': -1, 'reid': 0}]}),
+  ({'frame': {}, 'categories': [{'name': 1, 'count': 0, 'reid': 0}]}),
+  ({'frame': {}, 'categories': [{'name': "person", 'count': 0, 'reid': None}]}),
+  ({'frame': {}, 'categories': [{'name': "person", 'count': 0, 'reid': 0, 'extra': [{}]}]}),
+  ({'frame': {}, 'categories': [{'name': "person", 'count': 1, 'reid': 0, 'extra': ["x"]}]}),
+  ({'frame': {}, 'categories': [{'name': "person", 'count': 1, 'reid': 0, 'extra': {}}]}),
+])
+def test_malformedHeader(header):
+  """! Verifies a header without the structure of an encoded message is
+  rejected with ValueError.
+  """
+  with pytest.raises(ValueError, match="header"):
+    decodeCameraData(encodeHeader(header))
+  return
+
+@pytest.mark.skipif(not os.path.exists(ADAPTER_CODEC), reason="pipeline server scripts not available")
+def test_adapterEncoding():
+  """! Verifies the pipeline server encodes messages as the controller expects. """
+  spec = importlib.util.spec_from_file_location("sscape_codec", ADAPTER_CODEC)
+  sscape_codec = importlib.util.module_from_spec(spec)
+  spec.loader.exec_module(sscape_codec)
+
+  jdata = detectorMessage()
+  assert sscape_codec.encodeCameraData(jdata) == encodeCameraData(jdata)
+  return
@@ -0,0 +1,52 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+import orjson
+import pytest
+
+from controller.detections_builder import (DetectionsCache, composeDetections,
+                                           splitDetections)
+
+def objDicts():
+  return [{'id': f"gid-{idx}", 'type': "person", 'translation': np.array([idx, 1.5, 0.0]),
+           'reid': [0.25] * 4} for idx in range(4)]
+
+@pytest.mark.parametrize("count", [(0), (1), (4)])
+def test_composeDetections(count):
+  """! Verifies composed payloads are identical to dumping the whole message. """
+
+  cache = DetectionsCache()
+  cache.nextFrame()
+  objects = objDicts()[:count]
+  for obj_dict in objects:
+    cache.addObjDict(obj_dict['id'], obj_dict)
+  jdata = {'timestamp': "2023-05-16T21:22:58.388Z", 'objects': objects,
+           'id': "scene", 'rate': np.float32(9.5)}
+
+  jstr = composeDetections(splitDetections(jdata), cache.fragments(jdata['objects']))
+  assert jstr == orjson.dumps(jdata, option=orjson.OPT_SERIALIZE_NUMPY)
+  assert jdata['objects'] is objects
+  return
+
+def test_fragments():
+  """! Verifies fragments are reused within a frame and refreshed after
+  'DetectionsCache.discardFragment()' or a new frame.
+  """
+
+  cache = DetectionsCache()
+  cache.nextFrame()
+  obj_dict = objDicts()[0]
+  cache.addObjDict(obj_dict['id'], obj_dict)
+  assert cache.objDict(obj_dict['id']) is obj_dict
+
+  first = cache.fragments([obj_dict])[0]
+  assert cache.fragments([obj_dict])[0] is first
+
+  obj_dict['direction'] = 1
+  cache.discardFragment(obj_dict['id'])
+  assert orjson.loads(cache.fragments([obj_dict])[0])['direction'] == 1
+
+  cache.nextFrame()
+  assert cache.objDict(obj_dict['id']) is None
+  return
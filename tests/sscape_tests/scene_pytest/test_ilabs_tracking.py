@@ -0,0 +1,73 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from controller.ilabs_tracking import IntelLabsTracking
+from controller.moving_object import MovingObject
+from controller.tracking import (MAX_UNRELIABLE_TIME,
+                                 NON_MEASUREMENT_TIME_DYNAMIC,
+                                 NON_MEASUREMENT_TIME_STATIC)
+from scene_common.timestamp import get_epoch_time
+
+def createTracker():
+  tracker = IntelLabsTracking(MAX_UNRELIABLE_TIME, NON_MEASUREMENT_TIME_DYNAMIC,
+                              NON_MEASUREMENT_TIME_STATIC)
+  tracker.uuid_manager = MagicMock()
+  return tracker
+
+def createObject(oid, uuid=None, x=0.0):
+  obj = MovingObject({'id': oid, 'category': "person", 'translation': [x, 0, 0]},
+                     get_epoch_time(), None)
+  obj.sceneLoc
+  obj.uuid = uuid
+  return obj
+
+def trackedObject(uuid, rv_id, x=0.0):
+  return SimpleNamespace(attributes={'info': uuid}, id=rv_id,
+                         x=x, y=0.0, z=0.0, vx=0.0, vy=0.0)
+
+def test_fromTrackedObject():
+  """! Verifies reliable tracks are associated with the detection carrying
+  their uuid and continue the previous track with the same rv_id.
+  """
+  tracker = createTracker()
+  previous = createObject(1, "uuid-old")
+  previous.rv_id = 7
+  previous.setGID("gid-7")
+  tracker.all_tracker_objects = [previous]
+  tracker._indexTrackerObjects()
+
+  detection = createObject(2, "uuid-new")
+  other = createObject(3, "uuid-other")
+  detections = {obj.uuid: obj for obj in (detection, other)}
+  continued = tracker.from_tracked_object(trackedObject("uuid-new", 7, x=1.0), detections)
+  assert continued is detection
+  assert continued.gid == "gid-7"
+  assert continued.sceneLoc.x == 1.0
+
+  started = tracker.from_tracked_object(trackedObject("uuid-other", 8), detections)
+  assert started.gid == "uuid-other"
+
+  assert tracker.from_tracked_object(trackedObject("uuid-old", 7), {}) is previous
+  return
+
+def test_mergeAlreadyTrackedObjects():
+  """! Verifies tracks consumed directly continue the track with the same oid,
+  start new tracks otherwise and keep recently seen missing tracks.
+  """
+  tracker = createTracker()
+  existing = [createObject(oid) for oid in (1, 2)]
+  for obj in existing:
+    obj.setGID(obj.oid)
+    obj.last_seen = get_epoch_time()
+  tracker.already_tracked_objects = existing
+
+  tracks = [createObject(oid) for oid in (2, 3)]
+  result = tracker.mergeAlreadyTrackedObjects(tracks)
+  assert [obj.oid for obj in result] == [2, 3, 1]
+  assert result[0] is tracks[0]
+  assert [entry.point.x for entry in result[0].location] == [0, 0]
+  assert result[2] is existing[0]
+  return
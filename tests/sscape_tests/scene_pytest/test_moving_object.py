@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+import pytest
+
+from controller.moving_object import (LOCATION_LIMIT, Chronoloc,
+                                      LocationHistory, MovingObject)
+from scene_common.geometry import Point
+from scene_common.reid_codec import REID_DIMENSIONS, REID_DTYPE, encodeReIDVector
+
+def chain(length):
+  histories = [LocationHistory(Chronoloc(Point(0, 0, 0), 0.0, None))]
+  for idx in range(1, length):
+    history = LocationHistory(Chronoloc(Point(idx, 0, 0), float(idx), None))
+    history.follow(histories[-1])
+    histories.append(history)
+  return histories
+
+@pytest.mark.parametrize("length", [(1), (3), (LOCATION_LIMIT), (3 * LOCATION_LIMIT)])
+def test_follow(length):
+  """! Verifies a history lists the chain newest first, capped at LOCATION_LIMIT,
+  and continuing it leaves the history of the previous object intact.
+  """
+
+  histories = chain(length)
+  latest = histories[-1]
+  expected = list(range(length - 1, max(length - 1 - LOCATION_LIMIT, -1), -1))
+  assert [entry.point.x for entry in latest] == expected
+  assert [entry.when for entry in latest[1:]] == expected[1:]
+  assert latest[-1].point.x == expected[-1]
+  if length > 1:
+    previous = histories[-2]
+    assert [entry.point.x for entry in previous] == \
+      list(range(length - 2, max(length - 2 - LOCATION_LIMIT, -1), -1))
+  return
+
+def test_forkedHistory():
+  """! Verifies continuing an object that was already continued does not
+  change the other branch.
+  """
+
+  histories = chain(5)
+  branch = LocationHistory(Chronoloc(Point(10, 0, 0), 10.0, None))
+  branch.follow(histories[2])
+  assert [entry.point.x for entry in branch] == [10, 2, 1, 0]
+  assert [entry.point.x for entry in histories[-1]] == [4, 3, 2, 1, 0]
+  with pytest.raises(IndexError):
+    branch[4]
+  return
+
+def test_fromList():
+  """! Verifies a history can be restored from a list of locations. """
+
+  entries = [Chronoloc(Point(idx, idx, 0), float(idx), None) for idx in range(5)]
+  history = LocationHistory.fromList(entries)
+  assert [entry.point.y for entry in history] == list(range(5))
+  return
+
+def test_slots():
+  """! Verifies moving objects do not carry a per instance dictionary. """
+
+  subclass = MovingObject.createSubclass("forklift")
+  obj = subclass({'id': 1, 'category': "forklift", 'translation': [1, 2, 0]}, 0.0, None)
+  assert not hasattr(obj, '__dict__')
+  assert not hasattr(obj, 'visibility')
+  assert obj.sceneLoc.x == 1
+  return
+
+def test_reidVector():
+  """! Verifies base64 Re-ID vectors are decoded and kept for publishing,
+  and vectors decoded from binary camera data are kept as they are.
+  """
+
+  vector = np.arange(REID_DIMENSIONS, dtype=REID_DTYPE).reshape(1, -1)
+  info = {'id': 1, 'category': "person", 'translation': [1, 2, 0]}
+  obj = MovingObject(dict(info, reid=encodeReIDVector(vector)), 0.0, None)
+  assert np.array_equal(obj.reidVector, vector)
+  assert obj.reidEncoded == encodeReIDVector(vector)
+  assert 'reid' not in obj.info
+
+  obj = MovingObject(dict(info, reid=vector), 0.0, None)
+  assert obj.reidVector is vector
+  assert obj.reidEncoded is None
+  assert 'reid' not in obj.info
+  return
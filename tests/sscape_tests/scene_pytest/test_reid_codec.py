@@ -0,0 +1,47 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import base64
+import struct
+
+import numpy as np
+
+from controller.detections_builder import prepareObjDict
+from controller.moving_object import MovingObject
+from scene_common.reid_codec import (REID_DIMENSIONS, REID_DTYPE,
+                                     decodeReIDVector, encodeReIDVector)
+from scene_common.timestamp import get_epoch_time
+
+def packedVector(seed=0):
+  vector = np.random.default_rng(seed).normal(0, 1, REID_DIMENSIONS).tolist()
+  return vector, base64.b64encode(struct.pack("256f", *vector)).decode('utf-8')
+
+def test_codec():
+  """! Verifies vectors are encoded and decoded in the format of struct.pack. """
+
+  vector, encoded = packedVector()
+  decoded = decodeReIDVector(encoded)
+  assert decoded.shape == (1, REID_DIMENSIONS)
+  assert decoded.dtype == REID_DTYPE
+  assert np.array_equal(decoded[0], np.array(vector, dtype=np.float32))
+
+  assert encodeReIDVector(vector) == encoded
+  assert encodeReIDVector(decoded) == encoded
+  assert encodeReIDVector(np.array(vector)[::-1][::-1]) == encoded
+  return
+
+def test_publishOriginalEncoding():
+  """! Verifies a detection publishes the Re-ID string it was received with
+  instead of encoding the vector again.
+  """
+  _, encoded = packedVector()
+  obj = MovingObject({'id': 1, 'category': "person", 'translation': [1, 0, 0],
+                      'reid': encoded}, get_epoch_time(), None)
+  assert 'reid' not in obj.info
+  assert obj.reidEncoded is encoded
+  assert np.array_equal(obj.reidVector, decodeReIDVector(encoded))
+
+  obj.sceneLoc
+  obj.setGID("gid-1")
+  assert prepareObjDict(None, obj, False)['reid'] is encoded
+  return
@@ -0,0 +1,126 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+import pytest
+
+from controller.reid_index import (INDEX_FLAT, INDEX_IVF, INDEX_IVFPQ,
+                                   LocalReIDDatabase)
+
+DIMENSIONS = 32
+IDENTITIES = 64
+VECTORS_PER_IDENTITY = 80
+
+def identities(seed=0):
+  rng = np.random.default_rng(seed)
+  centers = rng.normal(0, 10, (IDENTITIES, DIMENSIONS)).astype(np.float32)
+  return rng, centers
+
+def populate(database, rng, centers):
+  for idx, center in enumerate(centers):
+    vectors = center + rng.normal(0, 0.5, (VECTORS_PER_IDENTITY, DIMENSIONS))
+    database.addEntry(f"uuid-{idx}", idx, "person", vectors)
+  return
+
+@pytest.mark.parametrize("index", [(INDEX_FLAT), (INDEX_IVF), (INDEX_IVFPQ)])
+def test_findSimilarityScores(index):
+  """! Verifies the vectors of a track are matched to the identity they were
+  drawn from, in the format returned by VDMS.
+
+  @param    index    Index type
+  """
+  database = LocalReIDDatabase(dimensions=DIMENSIONS, index=index, ivf_lists=8, ivf_probes=2,
+                               pq_subquantizers=8)
+  database.connect()
+  rng, centers = identities()
+  populate(database, rng, centers)
+  assert database.partitions[("reid_vector", "person")].trained == (index != INDEX_FLAT)
+
+  queries = centers[5] + rng.normal(0, 0.5, (12, DIMENSIONS))
+  results = database.findSimilarityScores("person", queries, k_neighbors=3)
+  assert len(results) == 12
+  for entities in results:
+    assert len(entities) == 3
+    assert entities[0]['uuid'] == "uuid-5"
+    assert entities[0]['rvid'] == "5"
+    distances = [entity['_distance'] for entity in entities]
+    assert distances == sorted(distances)
+
+  assert database.findSimilarityScores("vehicle", queries) == []
+  return
+
+def test_flatDistances():
+  """! Verifies the flat index returns exact squared L2 distances. """
+
+  database = LocalReIDDatabase(dimensions=4)
+  database.addEntry("a", 1, "person", [[0, 0, 0, 0], [1, 1, 1, 1]])
+  database.addEntry("b", 2, "person", [[3, 0, 0, 0]])
+  results = database.findSimilarityScores("person", [[1, 0, 0, 0]], k_neighbors=5)
+  assert [(entity['uuid'], entity['_distance']) for entity in results[0]] \
+    == [("a", 1.0), ("a", 3.0), ("b", 4.0)]
+  return
+
+def test_eviction(monkeypatch):
+  """! Verifies the oldest vectors are evicted beyond max_entries and once
+  they are older than the TTL.
+  """
+  now = [1000.0]
+  monkeypatch.setattr("controller.reid_index.get_epoch_time", lambda: now[0])
+  database = LocalReIDDatabase(dimensions=2, max_entries=3, ttl=10)
+  for idx in range(4):
+    database.addEntry(f"uuid-{idx}", idx, "person", [[idx, 0]])
+    now[0] += 4
+  partition = database.partitions[("reid_vector", "person")]
+  assert partition.uuids == ["uuid-1", "uuid-2", "uuid-3"]
+
+  results = database.findSimilarityScores("person", [[0, 0]], k_neighbors=3)
+  assert [entity['uuid'] for entity in results[0]] == ["uuid-2", "uuid-3"]
+  return
+
+@pytest.mark.parametrize("index", [(INDEX_FLAT), (INDEX_IVFPQ)])
+def test_snapshot(tmp_path, index):
+  """! Verifies a snapshot restores the partitions memory mapped, and the
+  restored index can be searched and extended.
+
+  @param    index    Index type
+  """
+  options = {'dimensions': DIMENSIONS, 'index': index, 'ivf_lists': 8, 'pq_subquantizers': 8,
+             'snapshot_path': str(tmp_path)}
+  database = LocalReIDDatabase(**options)
+  rng, centers = identities()
+  populate(database, rng, centers)
+  database.saveSnapshot(str(tmp_path))
+  queries = centers[:4] + rng.normal(0, 0.5, (4, DIMENSIONS))
+  expected = database.findSimilarityScores("person", queries)
+
+  restored = LocalReIDDatabase(**options)
+  restored.connect()
+  assert restored.findSchema("reid_vector")
+  partition = restored.partitions[("reid_vector", "person")]
+  stored = partition.codes if index == INDEX_IVFPQ else partition.vectors
+  assert isinstance(stored, np.memmap)
+  assert restored.findSimilarityScores("person", queries) == expected
+
+  restored.addEntry("uuid-new", 100, "person", [centers[0] + 100])
+  assert partition.count == IDENTITIES * VECTORS_PER_IDENTITY + 1
+  assert not isinstance(partition.added, np.memmap)
+  return
+
+def test_sharedSnapshotDirectory(tmp_path):
+  """! Verifies databases saving to the same directory keep the partitions
+  of each other listed, so all of them are restored.
+  """
+  rng, centers = identities()
+  people = LocalReIDDatabase(dimensions=DIMENSIONS)
+  vehicles = LocalReIDDatabase(dimensions=DIMENSIONS)
+  people.addEntry("uuid-person", 1, "person", [centers[0]])
+  vehicles.addEntry("uuid-vehicle", 2, "vehicle", [centers[1]])
+  people.saveSnapshot(str(tmp_path))
+  vehicles.saveSnapshot(str(tmp_path))
+  people.saveSnapshot(str(tmp_path))
+
+  restored = LocalReIDDatabase(dimensions=DIMENSIONS, snapshot_path=str(tmp_path))
+  restored.connect()
+  assert set(restored.partitions) == {("reid_vector", "person"), ("reid_vector", "vehicle")}
+  assert [path.name for path in tmp_path.iterdir() if path.name.endswith(".tmp")] == []
+  return
@@ -0,0 +1,117 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import zipfile
+
+import orjson
+
+from controller.replay import ControllerReplay, loadRecording
+from scene_common.mqtt import PubSub
+
+TRACKER_CONFIG = "controller/config/tracker-config.json"
+SCHEMA = "controller/src/schema/metadata.schema.json"
+
+SCENE = {
+  'uid': "scene-1", 'name': "Scene 1", 'regulated_rate': 30, 'external_update_rate': 30,
+  'cameras': [{'uid': "camera1", 'name': "camera1", 'resolution': [640, 480],
+               'intrinsics': {'fov': 70}, 'translation': [0, 0, 3],
+               'rotation': [-135, 0, 0], 'scale': [1, 1, 1]}],
+}
+
+def recordMessages(frames):
+  lines = []
+  for frame in range(frames):
+    lines.append(orjson.dumps({
+      'timestamp': "1970-01-01T00:00:%06.3fZ" % (frame * 0.1),
+      'id': "camera1",
+      'frame': frame,
+      'objects': [{'id': 1, 'category': "person", 'confidence': 0.9,
+                   'bounding_box': {'x': -0.1 + 0.01 * frame, 'y': 0.1,
+                                    'width': 0.1, 'height': 0.3}}],
+    }))
+  return b"\n".join(lines)
+
+def test_loadRecording(tmp_path):
+  """! Verifies recordings are merged in timestamp order, from zip archives
+  too, and lists of objects are grouped by category.
+  """
+  first = tmp_path / "cam1.txt"
+  first.write_bytes(recordMessages(3))
+  second = tmp_path / "cam2.txt.zip"
+  with zipfile.ZipFile(second, "w") as archive:
+    archive.writestr("cam2.txt", recordMessages(2))
+
+  messages = loadRecording([str(first), str(second)])
+  assert [jdata['frame'] for _, jdata in messages] == [0, 0, 1, 1, 2]
+  assert list(messages[0][1]['objects'].keys()) == ["person"]
+  return
+
+def test_replay(tmp_path):
+  """! Verifies recorded messages go through the controller and what it
+  publishes is captured.
+  """
+  scene_file = tmp_path / "scene.json"
+  scene_file.write_text(json.dumps({'results': [SCENE]}))
+  recording = tmp_path / "cam1.txt"
+  recording.write_bytes(recordMessages(10))
+
+  replay = ControllerReplay([str(scene_file)], TRACKER_CONFIG, SCHEMA)
+  assert PubSub.formatTopic(PubSub.DATA_CAMERA, camera_id="camera1") in replay.pubsub.callbacks
+  assert PubSub.formatTopic(PubSub.DATA_CAMERA_BIN, camera_id="camera1") in replay.pubsub.callbacks
+  report = replay.run(loadRecording([str(recording)]))
+  replay.close()
+
+  assert report['messages'] == 10
+  assert report['skipped'] == 0
+  assert report['published']['DATA_SCENE']['count'] > 0
+  assert report['published_bytes'] > 0
+  assert set(report['latency_ms']['total'].keys()) == {'p50', 'p90', 'p99', 'max'}
+  return
+
+def test_replayBinary(tmp_path):
+  """! Verifies messages in the binary camera data format, on their own
+  topic, are handled like the same messages in JSON.
+  """
+  scene_file = tmp_path / "scene.json"
+  scene_file.write_text(json.dumps({'results': [SCENE]}))
+  recording = tmp_path / "cam1.txt"
+  recording.write_bytes(recordMessages(10))
+  messages = loadRecording([str(recording)])
+
+  reports = []
+  for binary in (False, True):
+    replay = ControllerReplay([str(scene_file)], TRACKER_CONFIG, SCHEMA)
+    reports.append(replay.run(messages, binary=binary))
+    replay.close()
+
+  assert reports[1]['messages'] == reports[0]['messages'] == 10
+  assert reports[1]['published']['DATA_SCENE']['count'] == reports[0]['published']['DATA_SCENE']['count']
+  return
+
+def test_movedCamera(tmp_path):
+  """! Verifies a message of a camera moved to a scene that is not refreshed
+  yet refreshes all scenes, so that the camera is found in its new scene.
+  """
+  scene_file = tmp_path / "scene.json"
+  scene_file.write_text(json.dumps({'results': [SCENE]}))
+  replay = ControllerReplay([str(scene_file)], TRACKER_CONFIG, SCHEMA)
+  cache_manager = replay.controller.cache_manager
+
+  # The camera is moved to a new scene and only its old scene is refreshed
+  moved = dict(SCENE, uid="scene-2", name="Scene 2")
+  cache_manager.data_source.scenes = [dict(SCENE, cameras=[]), moved]
+  cache_manager.requestRefresh("scene-1")
+  assert cache_manager.waitForRefresh(10)
+  assert cache_manager.sceneWithCameraID("camera1") is None
+
+  topic = PubSub.formatTopic(PubSub.DATA_CAMERA, camera_id="camera1")
+  replay.pubsub.deliver(topic, orjson.dumps({
+    'timestamp': "1970-01-01T00:00:00.000Z", 'id': "camera1",
+    'objects': {'person': [{'id': 1, 'category': "person", 'confidence': 0.9,
+                            'bounding_box': {'x': 0, 'y': 0.1, 'width': 0.1, 'height': 0.3}}]},
+  }))
+  assert cache_manager.waitForRefresh(10)
+  assert cache_manager.sceneWithCameraID("camera1").uid == "scene-2"
+  replay.close()
+  return
@@ -9,6 +9,7 @@ import pytest
 import numpy as np
 import copy
 
+from scene_common.camera import Camera
 from scene_common.timestamp import get_epoch_time
 from scene_common.geometry import Region, Point
 
@@ -67,6 +68,38 @@ def test_visible(scene_obj, camera_obj, detectionType, jdata, when):
 
   return
 
+def test_visibleMatrix(scene_obj, camera_obj):
+  """! Verifies the batched visibility of 'Scene._updateVisible()' matches
+  testing each camera's regionOfView separately, and follows pose changes.
+
+  @param    scene_obj     Scene class object
+  @param    camera_obj    Camera class object
+  """
+  other = Camera("camera2", {
+    'width': 640,
+    'height': 480,
+    'camera points': [[278, 61], [621, 132], [559, 460], [66, 289]],
+    'map points': [[0.1, 5.38, 0], [3.04, 5.35, 0], [3.05, 2.42, 0], [0.1, 2.45, 0]],
+    'intrinsics': 70,
+  })
+  other.pose.regionOfView = Region(None, None, {'points': [[0, 0], [2, 0], [2, 2], [0, 2]]})
+  scene_obj.cameras[camera_obj.cameraID] = camera_obj
+  scene_obj.cameras[other.cameraID] = other
+
+  class LocatedObject:
+    def __init__(self, x, y):
+      self.sceneLoc = Point(x, y, 0)
+
+  objects = [LocatedObject(x, y) for x in np.linspace(-1, 6, 8) for y in np.linspace(-1, 6, 8)]
+  for step in range(2):
+    scene_obj._updateVisible(objects)
+    for obj in objects:
+      expected = [camera.cameraID for camera in scene_obj.cameras.values()
+                  if camera.pose.regionOfView.isPointWithin(obj.sceneLoc)]
+      assert obj.visibility == expected
+    other.pose.regionOfView = Region(None, None, {'points': [[1, 1], [5, 1], [5, 5], [1, 5]]})
+  return
+
 def test_isIntersecting(scene_obj):
   """! Verifies the 'Scene.isIntersecting' method.
 
@@ -117,6 +150,12 @@ def test_isIntersecting(scene_obj):
   error_obj.sceneLoc = None
   assert scene_obj.isIntersecting(error_obj, region) is False
 
+  # Regions of the scene are tested with the prisms cached for region events
+  scene_obj.regions[region.uuid] = region
+  assert scene_obj.isIntersecting(intersecting_obj, region) is True
+  assert scene_obj.isIntersecting(non_intersecting_obj, region) is False
+  assert region.uuid in scene_obj.region_volumes.keys
+
   return
 
 @pytest.mark.parametrize("objects", [
@@ -0,0 +1,128 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import math
+import queue
+import threading
+
+import pytest
+
+from controller import scene_controller, scene_sharding
+from controller.replay import CapturePubSub
+from controller.scene_sharding import (SHARD_DATABASE, SHARD_MOVING_OBJECT,
+                                       SHARD_SCENE_UPDATE, ForwardedMessage,
+                                       SceneRoute, ShardedSceneController,
+                                       serveShard, shardForScene)
+from controller.tracking import Tracking
+from scene_common.mqtt import PubSub
+
+TRACKER_CONFIG = "controller/config/tracker-config.json"
+SCHEMA = "controller/src/schema/metadata.schema.json"
+
+SCENE = {
+  'uid': "scene-1", 'name': "Scene 1", 'regulated_rate': 30, 'external_update_rate': 30,
+  'cameras': [{'uid': "camera1", 'name': "camera1", 'resolution': [640, 480],
+               'intrinsics': {'fov': 70}, 'translation': [0, 0, 3],
+               'rotation': [-135, 0, 0], 'scale': [1, 1, 1]}],
+}
+
+class RecordingController:
+  def __init__(self):
+    self.received = []
+    return
+
+  def handleMovingObjectMessage(self, client, userdata, message):
+    self.received.append(('moving', message.topic, message.payload))
+    return
+
+  def handleSensorMessage(self, client, userdata, message):
+    self.received.append(('sensor', message.topic, message.payload))
+    return
+
+  def republishEvents(self, client, userdata, message):
+    self.received.append(('event', message.topic, message.payload))
+    return
+
+  def handleDatabaseMessage(self, client, userdata, message):
+    raise RuntimeError("database unavailable")
+
+  def handleSceneUpdateMessage(self, client, userdata, message):
+    self.received.append(('scene', message.topic, message.payload))
+    return
+
+@pytest.mark.parametrize("shard_count", [(1), (3), (8)])
+def test_shardForScene(shard_count):
+  """! Verifies scenes are partitioned into valid, stable shards. """
+
+  uids = [f"3bc091c7-e449-46a0-9540-29c499bca1{idx:02d}" for idx in range(50)]
+  shards = [shardForScene(uid, shard_count) for uid in uids]
+  assert all(0 <= shard < shard_count for shard in shards)
+  assert shards == [shardForScene(uid, shard_count) for uid in uids]
+  if shard_count > 1:
+    assert len(set(shards)) > 1
+  return
+
+def test_serveShard():
+  """! Verifies forwarded messages reach the controller callbacks in order
+  and a failing callback does not stop the shard.
+  """
+
+  inbox = queue.Queue()
+  inbox.put((SHARD_MOVING_OBJECT, "scenescape/data/camera/cam1", b'{"id": "cam1"}'))
+  inbox.put((SHARD_DATABASE, "scenescape/cmd/database", b"update"))
+  inbox.put((SHARD_MOVING_OBJECT, "scenescape/data/camera/cam2", b'{"id": "cam2"}'))
+  inbox.put((SHARD_SCENE_UPDATE, "scenescape/cmd/scene/update/scene1", b"update"))
+  inbox.put(None)
+
+  controller = RecordingController()
+  serveShard(controller, inbox)
+  assert controller.received == [
+    ('moving', "scenescape/data/camera/cam1", b'{"id": "cam1"}'),
+    ('moving', "scenescape/data/camera/cam2", b'{"id": "cam2"}'),
+    ('scene', "scenescape/cmd/scene/update/scene1", b"update"),
+  ]
+  return
+
+class InertProcess:
+  def __init__(self, target, args, name, daemon):
+    return
+
+  def start(self):
+    return
+
+class InertContext:
+  def Queue(self, maxsize=0):
+    return queue.Queue(maxsize)
+
+  def Process(self, target, args, name, daemon):
+    return InertProcess(target, args, name, daemon)
+
+def test_dispatcherBuildsNoTrackers(tmp_path, monkeypatch):
+  """! Verifies the dispatcher only keeps the routing of the scenes, with no
+  tracker, and forwards a camera message to the shard owning its scene.
+  """
+  scene_file = tmp_path / "scenes.json"
+  scene_file.write_text(json.dumps({'results': [SCENE]}))
+  pubsub = CapturePubSub()
+  monkeypatch.setattr(scene_sharding.multiprocessing, 'get_context',
+                      lambda method: InertContext())
+  threads = set(threading.enumerate())
+
+  # SceneController creates its own PubSub
+  with monkeypatch.context() as patch:
+    patch.setattr(scene_controller, 'PubSub', lambda *args, **kwargs: pubsub)
+    dispatcher = ShardedSceneController(2, False, False, math.inf, None, None, None, None,
+                                        None, None, None, TRACKER_CONFIG, SCHEMA, "regulated",
+                                        [str(scene_file)])
+  dispatcher.onConnect(None, None, {}, 0)
+  scenes = dispatcher.cache_manager.allScenes()
+  assert [type(scene) for scene in scenes] == [SceneRoute]
+  assert not any(isinstance(thread, Tracking) for thread in set(threading.enumerate()) - threads)
+  assert PubSub.formatTopic(PubSub.DATA_CAMERA, camera_id="camera1") in pubsub.callbacks
+
+  topic = PubSub.formatTopic(PubSub.DATA_CAMERA, camera_id="camera1")
+  dispatcher.handleMovingObjectMessage(None, None, ForwardedMessage(topic, b'{}'))
+  inbox = dispatcher.inboxes[shardForScene(SCENE['uid'], 2)]
+  assert inbox.get_nowait() == (SHARD_MOVING_OBJECT, topic, b'{}')
+  return
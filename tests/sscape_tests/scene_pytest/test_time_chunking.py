@@ -0,0 +1,67 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from controller.time_chunking import (CHUNKING_ADAPTIVE, ChunkWindow,
+                                      TimeChunkProcessor)
+from controller.tracker_mailbox import TrackerMailbox
+
+def test_chunkWindow():
+  """! Verifies the adaptive window covers the slowest active camera and the
+  tracker latency, within the latency budget.
+  """
+
+  window = ChunkWindow(min_interval=0.02, max_latency=0.2)
+  assert window.window(0.0) == 0.02
+
+  for frame in range(13):
+    window.observeFrame("cam1", frame / 30)
+  for frame in range(5):
+    window.observeFrame("cam2", frame / 10)
+  assert window.activeCameras(0.4) == {"cam1", "cam2"}
+  assert window.window(0.4) == pytest.approx(0.1)
+
+  # A camera that stopped sending no longer holds up the chunks
+  assert window.activeCameras(0.7) == {"cam2"}
+  assert window.activeCameras(2.0) == set()
+  assert window.window(2.0) == 0.02
+
+  for _ in range(50):
+    window.observeTracking(0.15)
+  assert window.window(0.4) == pytest.approx(0.05, abs=1e-3)
+  return
+
+def test_adaptiveDispatch():
+  """! Verifies a chunk is dispatched once every active camera delivered a
+  frame, and frames of a busy tracker are kept for the next chunk.
+  """
+
+  person = SimpleNamespace(queue=TrackerMailbox(), last_duration=0.0)
+  vehicle = SimpleNamespace(queue=TrackerMailbox(), last_duration=0.0)
+  manager = SimpleNamespace(trackers={"person": person, "vehicle": vehicle})
+  processor = TimeChunkProcessor(manager, interval_ms=10, mode=CHUNKING_ADAPTIVE,
+                                 max_latency_ms=5000)
+  for camera_id in ("cam1", "cam2"):
+    processor.window.observeFrame(camera_id, time.monotonic() - 1)
+    processor.window.observeFrame(camera_id, time.monotonic())
+  vehicle.queue.put("busy")
+
+  started = time.monotonic()
+  processor.add_message("cam1", "person", ["p1"], 1.0, [])
+  processor.add_message("cam1", "vehicle", ["v1"], 1.0, [])
+  processor.add_message("cam2", "person", ["p2"], 2.0, [])
+  processor.start()
+  objects, when, _, _ = person.queue.get()
+  assert time.monotonic() - started < 0.5
+  assert objects == [["p1"], ["p2"]]
+  assert when == 2.0
+
+  vehicle.queue.get()
+  vehicle.queue.task_done()
+  objects, _, _, _ = vehicle.queue.get()
+  assert objects == [["v1"]]
+  return
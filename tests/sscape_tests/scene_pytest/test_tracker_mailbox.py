@@ -0,0 +1,95 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from controller.tracking import STREAMING_MODE, Tracking
+from controller.tracker_mailbox import (POLICY_BLOCK, POLICY_DROP_OLDEST,
+                                        POLICY_MERGE, PUT_DROPPED,
+                                        PUT_DROPPED_OLDEST, PUT_MERGED,
+                                        PUT_QUEUED, TrackerMailbox)
+
+def drain(mailbox):
+  items = []
+  while not mailbox.empty():
+    items.append(mailbox.get())
+    mailbox.task_done()
+  return items
+
+def test_merge():
+  """! Verifies the merge policy keeps the latest pending frame per camera,
+  in arrival order.
+  """
+
+  mailbox = TrackerMailbox(POLICY_MERGE, maxsize=2)
+  assert mailbox.put("cam1-0", "cam1") == PUT_QUEUED
+  assert mailbox.put("cam2-0", "cam2") == PUT_QUEUED
+  assert mailbox.put("cam1-1", "cam1") == PUT_MERGED
+  assert mailbox.qsize() == 2
+  assert drain(mailbox) == ["cam2-0", "cam1-1"]
+
+  mailbox.put("cam1-2", "cam1")
+  mailbox.put("cam2-1", "cam2")
+  assert mailbox.put("cam3-0", "cam3") == PUT_DROPPED_OLDEST
+  assert mailbox.put("unknown", None) == PUT_DROPPED_OLDEST
+  assert drain(mailbox) == ["cam3-0", "unknown"]
+  mailbox.join()
+  return
+
+def test_dropOldest():
+  """! Verifies the drop-oldest policy keeps every frame up to the limit. """
+
+  mailbox = TrackerMailbox(POLICY_DROP_OLDEST, maxsize=2)
+  for frame in range(3):
+    mailbox.put(frame, "cam1")
+  assert drain(mailbox) == [1, 2]
+  mailbox.join()
+  return
+
+def test_block():
+  """! Verifies the block policy waits for room and drops the new frame on
+  timeout.
+  """
+
+  mailbox = TrackerMailbox(POLICY_BLOCK, maxsize=1, timeout_ms=10)
+  assert mailbox.put(0, "cam1") == PUT_QUEUED
+  assert mailbox.put(1, "cam1") == PUT_DROPPED
+
+  consumer = threading.Timer(0.05, mailbox.get)
+  consumer.start()
+  mailbox.timeout = 5
+  assert mailbox.put(2, "cam1") == PUT_QUEUED
+  consumer.join()
+  assert mailbox.get() == 2
+  return
+
+def test_forcedPut():
+  """! Verifies a forced put (the stop request) bypasses the size limit and
+  join() waits for all delivered frames.
+  """
+
+  mailbox = TrackerMailbox(POLICY_BLOCK, maxsize=1, timeout_ms=0)
+  mailbox.put(0)
+  assert mailbox.put(None, force=True) == PUT_QUEUED
+  assert drain(mailbox) == [0, None]
+  mailbox.join()
+  with pytest.raises(ValueError):
+    mailbox.task_done()
+  return
+
+def test_emptyFrameMerge():
+  """! Verifies a frame without objects replaces the frame still pending
+  from the same camera, so that objects that left are not tracked again.
+  """
+
+  tracking = Tracking.__new__(Tracking)
+  tracker = SimpleNamespace(queue=TrackerMailbox(POLICY_MERGE), ref_camera_frame_rate=None)
+  tracking.trackers = {'person': tracker}
+  person = SimpleNamespace(category='person')
+  tracking.trackObjects([person], [], 1.0, ['person'], None, 0, 0, 0, source="cam1")
+  tracking.trackObjects([], [], 2.0, ['person'], None, 0, 0, 0, source="cam1")
+  assert drain(tracker.queue) == [([], 2.0, [], STREAMING_MODE)]
+  return
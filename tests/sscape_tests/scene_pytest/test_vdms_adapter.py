@@ -0,0 +1,95 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import concurrent.futures
+import time
+
+import numpy as np
+import pytest
+
+from controller import vdms_adapter
+from controller.vdms_adapter import VDMSDatabase
+from tests.vdms_stub import VDMSStubServer
+
+LATENCY = 0.1
+DIMENSIONS = 8
+
+@pytest.fixture
+def stub():
+  with VDMSStubServer(latency=LATENCY) as server:
+    yield server
+  return
+
+def connectDatabase(stub, **kwargs):
+  database = VDMSDatabase(dimensions=DIMENSIONS, use_tls=False, **kwargs)
+  database.connect("127.0.0.1", stub.port)
+  return database
+
+def vectors(value, count):
+  return [np.full(DIMENSIONS, value, dtype=np.float32) for _ in range(count)]
+
+def test_pooledQueries(stub, monkeypatch):
+  """! Verifies concurrent similarity queries run in parallel over the
+  connection pool and their latency is recorded per operation.
+  """
+  recorded = []
+  monkeypatch.setattr(vdms_adapter.metrics, "record_reid_query",
+                      lambda duration, attributes: recorded.append(attributes["operation"]))
+  database = connectDatabase(stub, connections=4)
+  with concurrent.futures.ThreadPoolExecutor(4) as pool:
+    begin = time.monotonic()
+    results = list(pool.map(lambda _: database.findSimilarityScores("person", vectors(0, 2)),
+                            range(4)))
+    elapsed = time.monotonic() - begin
+  assert results == [[], [], [], []]
+  assert stub.max_active == 4
+  assert elapsed < 3 * LATENCY
+  assert recorded.count("find") == 4
+  return
+
+def test_writeBehind(stub):
+  """! Verifies the descriptors of several tracks are added in one request
+  once the batch is full, and are then found by similarity.
+  """
+  database = connectDatabase(stub, write_batch_size=10, write_flush_interval=60)
+  requests = len(stub.requests)
+  for track in range(3):
+    database.addEntry(f"uuid-{track}", track, "person", vectors(track, 4))
+  assert len(stub.requests) == requests + 1
+  assert stub.requests[-1] == ["AddDescriptor"] * 12
+  assert database.flush_timer is None
+
+  results = database.findSimilarityScores("person", vectors(2, 1))
+  assert results[0][0]['uuid'] == "uuid-2"
+  assert results[0][0]['rvid'] == "2"
+  return
+
+def test_flushInterval(stub):
+  """! Verifies buffered descriptors are added after the flush interval. """
+
+  database = connectDatabase(stub, write_batch_size=100, write_flush_interval=0.05)
+  database.addEntry("uuid-0", 0, "person", vectors(0, 2))
+  assert stub.addCount() == 0
+  time.sleep(0.05 + 3 * LATENCY)
+  assert stub.addCount() == 2
+  return
+
+def test_sharedPool(stub):
+  """! Verifies databases connecting to the same server share one pool. """
+
+  first = connectDatabase(stub, connections=2)
+  second = connectDatabase(stub, connections=4)
+  assert second.pool is first.pool
+  assert len(first.pool.connections) == 2
+  return
+
+def test_close(stub):
+  """! Verifies closing adds the buffered descriptors and stops the timer. """
+
+  database = connectDatabase(stub, write_batch_size=100, write_flush_interval=60)
+  database.addEntry("uuid-0", 0, "person", vectors(0, 2))
+  assert database.flush_timer is not None
+  database.close()
+  assert database.flush_timer is None
+  assert stub.addCount() == 2
+  return
@@ -1,6 +1,8 @@
 # SPDX-FileCopyrightText: (C) 2023 - 2025 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
+from datetime import datetime, timezone
+
 import pytest
 import numpy as np
 
@@ -53,3 +55,34 @@ def test_restored_epoch_time():
 
   assert np.isclose(epoch_time, restored_epoch_time, rtol=0.001)
   return
+
+@pytest.mark.parametrize("input_time",
+                        ["2023-03-15T23:47:50.869Z",
+                         "2023-03-15T23:47:50.8Z",
+                         "2023-03-15T23:47:50.869123Z",
+                         "2024-02-29T00:00:00.000Z"])
+def test_get_epoch_time_layouts(input_time):
+  """! Verifies get_epoch_time() matches strptime() for the fixed layout and
+  the other fraction lengths it accepts.
+
+  @param    input_time       Input time as string in ISO format
+  """
+  expected = datetime.strptime(input_time, "%Y-%m-%dT%H:%M:%S.%fZ") \
+    .replace(tzinfo=timezone.utc).timestamp()
+  assert get_epoch_time(input_time) == expected
+  return
+
+@pytest.mark.parametrize("input_time",
+                        ["2023-02-30T23:47:50.869Z",
+                         "2023-03-15T24:00:00.000Z",
+                         "2023-03-15 23:47:50.869Z",
+                         "2023-03-15T23:47:50.+69Z",
+                         "2023-03-15T23:47:50Z"])
+def test_get_epoch_time_invalid(input_time):
+  """! Verifies get_epoch_time() rejects malformed timestamps.
+
+  @param    input_time       Input time as string
+  """
+  with pytest.raises(ValueError):
+    get_epoch_time(input_time)
+  return
@@ -7,11 +7,12 @@ from unittest.mock import patch
 
 import cv2
 import numpy as np
+import open3d as o3d
 from scipy.spatial.transform import Rotation
 
 from scene_common.transform import (
-    CameraPose, getPoseMatrix, applyChildTransform, transform2DPoint,
-    convertToTransformMatrix, normalize, rotationToTarget
+    CameraPose, ChildTransform, MapRaycaster, getPoseMatrix, applyChildTransform, transform2DPoint,
+    convertToTransformMatrix, normalize, rotationToTarget, rotationsToTargets
 )
 from scene_common.geometry import Point, Rectangle
 from scene_common.transform import CameraIntrinsics
@@ -206,6 +207,162 @@ class TestCameraPose:
     assert len(shadow) == 4  # Four corner points
     assert isinstance(base_angle, (int, float))
 
+  @pytest.mark.parametrize("rotation", [[25, 0, 0], [0, 0, 0], [160, 10, 30]])
+  def test_camera_points_to_world_points(self, rotation):
+    """Test the batched projection matches projecting one point at a time,
+    for ground plane, horizon culled and 3D points"""
+    intrinsics = self.get_intrinsics()
+    pose = {'translation': [15.2, 25.8, 10.3], 'rotation': rotation, 'scale': [1, 1, 1]}
+    camera_pose = CameraPose(pose, intrinsics)
+    rng = np.random.default_rng(0)
+
+    for points in (rng.uniform(-1, 1, (50, 2)), rng.uniform(-5, 5, (50, 3))):
+      world = camera_pose.cameraPointsToWorldPoints(points)
+      assert world.shape == (len(points), 3)
+      for point, batched in zip(points, world):
+        expected = camera_pose.cameraPointToWorldPoint(Point(*point)).asNumpyCartesian
+        assert np.allclose(batched, expected, rtol=1e-9, atol=1e-6)
+
+    assert camera_pose.cameraPointsToWorldPoints(np.zeros((0, 2))).shape == (0, 3)
+
+  def test_project_bounds_batch(self):
+    """Test projectBoundsBatch matches projectBounds"""
+    intrinsics = self.get_intrinsics()
+    pose = {'translation': [0, 0, 5], 'rotation': [20, 0, 0], 'scale': [1, 1, 1]}
+    camera_pose = CameraPose(pose, intrinsics)
+    rects = [Rectangle(origin=Point(-0.1 + 0.05 * idx, -0.1), size=(0.2, 0.3)) for idx in range(4)]
+
+    for rect, (bounds, shadow, base_angle) in zip(rects, camera_pose.projectBoundsBatch(rects)):
+      expected_bounds, expected_shadow, expected_angle = camera_pose.projectBounds(rect)
+      assert math.isclose(bounds.width, expected_bounds.width, rel_tol=1e-9)
+      assert math.isclose(bounds.height, expected_bounds.height, rel_tol=1e-9)
+      assert math.isclose(base_angle, expected_angle, rel_tol=1e-9)
+      for corner, expected in zip(shadow, expected_shadow):
+        assert np.allclose(corner.asNumpyCartesian, expected.asNumpyCartesian)
+
+  @pytest.mark.parametrize("distortion", [None, [0.1, -0.05, 0.001, 0.002, 0.01]])
+  def test_project_estimated_bounds_batch(self, distortion):
+    """Test the batched world to pixel projection matches projecting one
+    object at a time, with and without lens distortion"""
+    intrinsics = CameraIntrinsics([1234.5, 1245.8, 960.3, 540.7], distortion)
+    pose = {'translation': [12.4, 18.9, 8.5], 'rotation': [-140, 5, 20], 'scale': [1, 1, 1]}
+    camera_pose = CameraPose(pose, intrinsics)
+    rng = np.random.default_rng(0)
+    points = np.hstack((rng.uniform(0, 20, (20, 2)), np.zeros((20, 1))))
+    sizes = rng.uniform(0.5, 2, (20, 2))
+
+    pixels = camera_pose.projectWorldPointsToCameraPixels(points)
+    batched = camera_pose.projectEstimatedBoundsToCameraPixelsBatch(points, sizes)
+    for point, size, pixel, bounds in zip(points, sizes, pixels, batched):
+      expected = camera_pose.projectWorldPointToCameraPixels(Point(*point))
+      assert np.allclose(pixel, (expected.x, expected.y), rtol=1e-9, atol=1e-6)
+      metric_size = type('Size', (), {'width': size[0], 'height': size[1]})()
+      expected = camera_pose.projectEstimatedBoundsToCameraPixels(Point(*point), metric_size)
+      assert np.allclose((bounds.x, bounds.y, bounds.width, bounds.height),
+                         (expected.x, expected.y, expected.width, expected.height),
+                         rtol=1e-9, atol=1e-6)
+    return
+
+  def test_project_to_map_batch(self):
+    """Test projecting to a map with a shared MapRaycaster matches casting
+    the rays against the map moved into camera coordinates"""
+    pose = {'translation': [1.0, -2.0, 6.0], 'rotation': [-140, 5, 20], 'scale': [1, 1, 1]}
+    camera_pose = CameraPose(pose, self.get_intrinsics())
+    xs, ys = np.meshgrid(np.linspace(-10, 10, 21), np.linspace(-10, 10, 21))
+    vertices = np.stack([xs.ravel(), ys.ravel(), 0.3 * np.sin(xs.ravel())], axis=1)
+    cells = np.arange(21 * 21).reshape(21, 21)[:-1, :-1].ravel()
+    triangles = np.concatenate([np.stack([cells, cells + 1, cells + 22], axis=1),
+                                np.stack([cells, cells + 22, cells + 21], axis=1)])
+    mesh = o3d.t.geometry.TriangleMesh.from_legacy(o3d.geometry.TriangleMesh(
+      o3d.utility.Vector3dVector(vertices), o3d.utility.Vector3iVector(triangles)))
+    map_T = [0.5, -0.3, 0.1]
+    map_R = [0.05, -0.02, 0.3]
+
+    rng = np.random.default_rng(3)
+    translations = np.hstack((rng.uniform(-1, 1, (10, 2)), rng.uniform(3, 8, (10, 1))))
+    # Pointing away from the map
+    translations[0] = [0, 0, -5]
+    rotations = Rotation.random(10, random_state=4).as_quat()
+    raycaster = MapRaycaster(mesh, map_T, map_R)
+    projected = camera_pose.projectToMapBatch(translations.tolist(), rotations.tolist(), raycaster)
+    assert len(projected) == len(translations)
+    assert projected[0][0] == translations[0].tolist()
+
+    cam_T = camera_pose.translation.asNumpyCartesian
+    cam_R = Rotation.from_quat(np.radians(camera_pose.quaternion_rotation)).as_matrix()
+    map_obj = camera_pose.transformObjectPoseInScene(
+      mesh.clone(), o3d.core.Tensor(map_T, dtype=o3d.core.Dtype.Float32),
+      o3d.geometry.get_rotation_matrix_from_xyz(map_R))
+    map_obj = camera_pose.transformSceneToCameraCoordinates(map_obj, cam_T, cam_R)
+    scene = o3d.t.geometry.RaycastingScene()
+    scene.add_triangles(map_obj)
+    rays = np.hstack((np.zeros_like(translations), translations))
+    rcast = scene.cast_rays(o3d.core.Tensor(rays, dtype=o3d.core.Dtype.Float32))
+    for idx, (obj_T, obj_R) in enumerate(projected):
+      t_hit = rcast['t_hit'].numpy()[idx]
+      if np.isinf(t_hit):
+        continue
+      assert np.allclose(obj_T, t_hit * translations[idx], atol=1e-4)
+      surface_z = Rotation.from_quat(obj_R).as_matrix()[:, 2]
+      assert np.allclose(surface_z, rcast['primitive_normals'].numpy()[idx], atol=1e-4)
+      single = camera_pose.projectToMap(translations[idx].tolist(), rotations[idx].tolist(), raycaster)
+      assert np.allclose(single[0], obj_T) and np.allclose(single[1], obj_R)
+    return
+
+  def test_child_transform(self):
+    """Test moving object dicts from a child scene matches transforming
+    one object at a time with the pose matrix"""
+    pose = {'translation': [12.4, -18.9, 0.5], 'rotation': [0, 0, 35], 'scale': [2, 2, 2]}
+    camera_pose = CameraPose(pose, None)
+    child_transform = camera_pose.childTransform
+    assert isinstance(child_transform, ChildTransform)
+    assert camera_pose.childTransform is child_transform
+
+    rng = np.random.default_rng(6)
+    objects = [{'translation': rng.uniform(-10, 10, 3).tolist(),
+                'velocity': rng.normal(0, 1, 3).tolist(),
+                'rotation': Rotation.random(random_state=idx).as_quat().tolist(),
+                'size': rng.uniform(0.5, 2, 3).tolist()} for idx in range(20)]
+    objects.append({'translation': [1.0, 2.0, 0.0]})
+    objects.append({'translation': [3.0, 1.0, 0.0], 'size': [1.0, 2.0, 3.0]})
+    expected = [dict(obj) for obj in objects]
+    child_transform.transformObjects(objects)
+
+    pose_mat = camera_pose.pose_mat
+    for obj, original in zip(objects, expected):
+      assert np.allclose(obj['translation'], (pose_mat @ np.hstack([original['translation'], 1]))[:3])
+      if 'velocity' not in original:
+        assert set(obj) == set(original)
+        if 'size' in original:
+          assert np.allclose(obj['size'], 2 * np.array(original['size']))
+        continue
+      assert np.allclose(obj['velocity'], pose_mat[:3, :3] @ original['velocity'])
+      rotation = Rotation.from_matrix(pose_mat[:3, :3] / 2) * Rotation.from_quat(original['rotation'])
+      assert np.allclose(Rotation.from_quat(obj['rotation']).as_matrix(), rotation.as_matrix())
+      assert np.allclose(obj['size'], 2 * np.array(original['size']))
+
+    camera_pose.setPose(np.identity(4))
+    assert camera_pose.childTransform is not child_transform
+    return
+
+  def test_child_transform_mirrored(self):
+    """Test boxes moved by a mirrored or flattened child transform keep a
+    proper rotation, and mirrored boxes span the transformed box"""
+    rotation = Rotation.from_euler('xyz', [0, 0, 35], degrees=True).as_matrix()
+    box = Rotation.random(random_state=3)
+    for linear in (rotation @ np.diag([-2, 2, 2]), rotation @ np.diag([2, 2, 0])):
+      pose_mat = np.identity(4)
+      pose_mat[:3, :3] = linear
+      obj = {'translation': [0, 0, 0], 'rotation': box.as_quat().tolist(), 'size': [1.0, 2.0, 3.0]}
+      ChildTransform(pose_mat).transformObjects([obj])
+      moved = Rotation.from_quat(obj['rotation']).as_matrix()
+      assert np.isclose(np.linalg.det(moved), 1)
+      assert np.isfinite(obj['size']).all()
+      if np.linalg.det(linear) < 0:
+        # Box edges are the same up to their direction
+        assert np.allclose(np.abs(moved * obj['size']), np.abs(linear @ box.as_matrix() * [1, 2, 3]))
+    return
+
   def test_as_dict_property(self):
     """Test asDict property returns correct format"""
     intrinsics = self.get_intrinsics()
@@ -705,6 +862,18 @@ class TestUtilityFunctions:
     dot_product = np.dot(normalize(rotated_v1), normalize(v2))
     assert math.isclose(dot_product, -1.0, abs_tol=1e-6)
 
+  def test_rotations_to_targets(self):
+    """Test the batched rotationsToTargets matches rotationToTarget"""
+    rng = np.random.default_rng(5)
+    v1 = rng.normal(size=(20, 3))
+    v2 = rng.normal(size=(20, 3))
+    v2[0] = 2 * v1[0]
+    v2[1] = 0
+    batched = rotationsToTargets(v1, v2).as_matrix()
+    for idx in range(len(v1)):
+      assert np.allclose(batched[idx], rotationToTarget(v1[idx], v2[idx]).as_matrix())
+    return
+
   def test_transform_2d_point(self):
     """Test 2D point transformation with pose"""
     point = (234.7, 567.8)
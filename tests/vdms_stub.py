@@ -0,0 +1,119 @@
+# SPDX-FileCopyrightText: (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+# Minimal VDMS server speaking the VDMS wire protocol, for testing the
+# controller Re-ID database without a VDMS container. Supports the descriptor
+# commands used by controller.vdms_adapter, without TLS.
+
+import json
+import socketserver
+import struct
+import threading
+import time
+
+import numpy as np
+from vdms import queryMessage_pb2
+
+class _Handler(socketserver.BaseRequestHandler):
+  def handle(self):
+    while True:
+      header = self._receive(4)
+      if header is None:
+        return
+      message = queryMessage_pb2.queryMessage()
+      message.ParseFromString(self._receive(struct.unpack("@I", header)[0]))
+      response = queryMessage_pb2.queryMessage()
+      response.json = json.dumps(self.server.stub.execute(json.loads(message.json),
+                                                          list(message.blobs)))
+      data = response.SerializeToString()
+      self.request.sendall(struct.pack("@I", len(data)) + data)
+
+  def _receive(self, size):
+    data = b""
+    while len(data) < size:
+      packet = self.request.recv(size - len(data))
+      if not packet:
+        return None
+      data += packet
+    return data
+
+class _Server(socketserver.ThreadingMixIn, socketserver.TCPServer):
+  daemon_threads = True
+  allow_reuse_address = True
+
+class VDMSStubServer:
+  """! VDMS stub listening on localhost.
+
+  @param   latency   Seconds each request takes, to emulate a remote server.
+  """
+
+  def __init__(self, latency=0.0):
+    self.latency = latency
+    self.sets = {}
+    self.requests = []
+    self.active = 0
+    self.max_active = 0
+    self.lock = threading.Lock()
+    self.server = _Server(("127.0.0.1", 0), _Handler)
+    self.server.stub = self
+    self.port = self.server.server_address[1]
+    self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+    return
+
+  def __enter__(self):
+    self.thread.start()
+    return self
+
+  def __exit__(self, *args):
+    self.server.shutdown()
+    self.server.server_close()
+    return
+
+  def execute(self, commands, blobs):
+    with self.lock:
+      self.active += 1
+      self.max_active = max(self.max_active, self.active)
+      self.requests.append([next(iter(command)) for command in commands])
+    try:
+      time.sleep(self.latency)
+      blobs = iter(blobs)
+      with self.lock:
+        return [self._command(command, blobs) for command in commands]
+    finally:
+      with self.lock:
+        self.active -= 1
+
+  def _command(self, command, blobs):
+    name, params = next(iter(command.items()))
+    if name == "AddDescriptorSet":
+      self.sets[params['name']] = []
+      result = {'status': 0}
+    elif name == "FindDescriptorSet":
+      result = {'status': 0, 'returned': int(params['set'] in self.sets)}
+    elif name == "AddDescriptor":
+      vector = np.frombuffer(next(blobs), dtype=np.float32)
+      self.sets.setdefault(params['set'], []).append((vector, params.get('properties', {})))
+      result = {'status': 0}
+    elif name == "FindDescriptor":
+      result = self._find(params, np.frombuffer(next(blobs), dtype=np.float32))
+    else:
+      result = {'status': -1, 'info': f"Unsupported command {name}"}
+    return {name: result}
+
+  def _find(self, params, query):
+    constraints = params.get('constraints', {})
+    matches = []
+    for vector, properties in self.sets.get(params['set'], []):
+      if all(properties.get(key) == value for key, (_, value) in constraints.items()):
+        matches.append((float(((vector - query) ** 2).sum()), properties))
+    matches.sort(key=lambda match: match[0])
+    fields = params.get('results', {}).get('list', [])
+    entities = [{field: distance if field == "_distance" else properties.get(field)
+                 for field in fields}
+                for distance, properties in matches[:params.get('k_neighbors', 1)]]
+    return {'status': 0, 'returned': len(entities), 'entities': entities}
+
+  def addCount(self):
+    """! Number of descriptors stored in all sets. """
+    with self.lock:
+      return sum(len(entries) for entries in self.sets.values())